@@ -0,0 +1,194 @@
+"""
+Cold-start and init-phase benchmark for the task handlers.
+
+Every run starts a fresh Python process that imports one handler and invokes it against a local
+DynamoDB stub, measuring the import time, the first call (which creates the DynamoDB client) and
+the warm latency of the following calls. The results are written as a JSON report and can be
+compared with a previous report to fail on regressions:
+
+    python -m benchmarks.cold_start --output report.json
+    python -m benchmarks.cold_start --baseline report.json --tolerance 0.25
+
+Use --wrapper to start the handlers under an instrumentation wrapper (e.g. opentelemetry-instrument)
+and quantify its overhead.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.stub_dynamodb import TASK_ID, StubDynamoDB
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TASK_BODY = json.dumps({'title': 'Task 1', 'description': 'This is task 1', 'status': 'pending'})
+
+# A representative successful event for every handler
+HANDLER_EVENTS = {
+    'create_task': {'body': TASK_BODY},
+    'get_task': {'pathParameters': {'taskId': TASK_ID}},
+    'update_task': {'pathParameters': {'taskId': TASK_ID}, 'body': TASK_BODY},
+    'delete_task': {'pathParameters': {'taskId': TASK_ID}},
+    'patch_task': {'pathParameters': {'taskId': TASK_ID}, 'body': '{"status": "completed"}'},
+    'list_tasks': {'queryStringParameters': {'status': 'pending', 'limit': '20'}},
+    'batch_create_task': {'body': '[' + ', '.join([TASK_BODY] * 25) + ']'},
+    'batch_get_task': {'body': json.dumps({'taskIds': [TASK_ID]})},
+    # The single function of the lambdalith deployment, serving GET /tasks/{taskId}
+    'router': {'httpMethod': 'GET', 'resource': '/tasks/{taskId}', 'pathParameters': {'taskId': TASK_ID}}
+}
+DEFAULT_HANDLERS = ['create_task', 'get_task', 'update_task', 'delete_task']
+
+# Metrics compared against the baseline
+METRICS = ('import_ms', 'first_call_ms', 'warm_p50_ms', 'warm_p99_ms')
+
+def percentile(values, pct):
+    """
+    Returns the nearest-rank percentile of a list of values.
+    """
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def measure_handler(name, iterations):
+    """
+    Runs inside the child process: imports and invokes one handler and returns its timings.
+    """
+    event = HANDLER_EVENTS[name]
+
+    start = time.perf_counter()
+    module = importlib.import_module(f'lambdas.{name}')
+    import_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    response = module.handler(event, None)
+    first_call_ms = (time.perf_counter() - start) * 1000
+    if response['statusCode'] >= 500:
+        raise RuntimeError(f'{name} failed: {response["body"]}')
+
+    # CPU time of the calling thread, the rest of the wall time is spent waiting on DynamoDB
+    warm_ms = []
+    warm_cpu_ms = []
+    for _ in range(iterations):
+        start, start_cpu = time.perf_counter(), time.thread_time()
+        module.handler(event, None)
+        warm_cpu_ms.append((time.thread_time() - start_cpu) * 1000)
+        warm_ms.append((time.perf_counter() - start) * 1000)
+
+    return {'import_ms': import_ms, 'first_call_ms': first_call_ms, 'warm_ms': warm_ms, 'warm_cpu_ms': warm_cpu_ms}
+
+def run_child(name, iterations, env, wrapper=None):
+    """
+    Measures one handler in a fresh interpreter, so nothing is already imported or initialized.
+    """
+    command = [sys.executable, '-m', 'benchmarks.cold_start', '--child', name, '--iterations', str(iterations)]
+    if wrapper:
+        command = shlex.split(wrapper) + command
+    result = subprocess.run(command, cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'Benchmark of {name} failed:\n{result.stderr}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def benchmark_env(endpoint_url):
+    """
+    Returns the environment of the handler processes: the DynamoDB stub and fake credentials, so nothing reaches AWS.
+    """
+    env = dict(os.environ)
+    env.update({
+        'AWS_ENDPOINT_URL_DYNAMODB': endpoint_url,
+        'AWS_ACCESS_KEY_ID': 'benchmark',
+        'AWS_SECRET_ACCESS_KEY': 'benchmark',
+        'AWS_DEFAULT_REGION': 'us-east-1',
+        'AWS_EC2_METADATA_DISABLED': 'true'
+    })
+    env.pop('AWS_PROFILE', None)
+    env.pop('AWS_SESSION_TOKEN', None)
+    return env
+
+def benchmark(handlers, runs, iterations, endpoint_url, wrapper=None):
+    """
+    Benchmarks every handler and returns the report.
+    Import and first call times are the median over the runs, warm latencies are pooled.
+    """
+    env = benchmark_env(endpoint_url)
+    results = {}
+    for name in handlers:
+        samples = [run_child(name, iterations, env, wrapper) for _ in range(runs)]
+        warm_ms = [value for sample in samples for value in sample['warm_ms']]
+        results[name] = {
+            'import_ms': round(statistics.median(s['import_ms'] for s in samples), 3),
+            'first_call_ms': round(statistics.median(s['first_call_ms'] for s in samples), 3),
+            'warm_p50_ms': round(percentile(warm_ms, 50), 3) if warm_ms else None,
+            'warm_p99_ms': round(percentile(warm_ms, 99), 3) if warm_ms else None,
+            'runs': runs,
+            'iterations': iterations
+        }
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'wrapper': wrapper,
+        'handlers': results
+    }
+
+def find_regressions(report, baseline, tolerance, min_delta_ms):
+    """
+    Compares a report with a baseline report.
+    A metric regresses when it is more than `tolerance` (relative) and `min_delta_ms` (absolute) slower,
+    the absolute floor keeps sub-millisecond noise from failing the run.
+    """
+    regressions = []
+    for name, metrics in report['handlers'].items():
+        previous = baseline.get('handlers', {}).get(name)
+        if not previous:
+            continue
+        for metric in METRICS:
+            current, before = metrics.get(metric), previous.get(metric)
+            if current is None or before is None:
+                continue
+            if current > before * (1 + tolerance) and current - before > min_delta_ms:
+                regressions.append(f'{name}.{metric}: {before:.3f} ms -> {current:.3f} ms')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start and init-phase benchmark for the task handlers.')
+    parser.add_argument('--handlers', nargs='+', choices=sorted(HANDLER_EVENTS), default=DEFAULT_HANDLERS)
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes per handler')
+    parser.add_argument('--iterations', type=int, default=200, help='Warm invocations per process')
+    parser.add_argument('--output', default='cold_start_report.json', help='Where to write the JSON report')
+    parser.add_argument('--baseline', help='Previous report to compare with, regressions fail the run')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='Ignore slowdowns smaller than this')
+    parser.add_argument('--wrapper', help='Command to start the handler processes with')
+    parser.add_argument('--child', choices=sorted(HANDLER_EVENTS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_handler(args.child, args.iterations)))
+        return 0
+
+    with StubDynamoDB() as stub:
+        report = benchmark(args.handlers, args.runs, args.iterations, stub.endpoint_url, args.wrapper)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    for name, metrics in report['handlers'].items():
+        print(f"{name:<20} import {metrics['import_ms']:>8.2f} ms  first call {metrics['first_call_ms']:>8.2f} ms  "
+              f"warm p50 {metrics['warm_p50_ms']:>6.2f} ms  p99 {metrics['warm_p99_ms']:>6.2f} ms")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(report, json.load(f), args.tolerance, args.min_delta_ms)
+        if regressions:
+            print('Regressions against the baseline:')
+            for regression in regressions:
+                print(f'  {regression}')
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Offline benchmark of the task export, against a local stand-in of the tasks table.
+
+Seeds the in-memory, SQLite or moto (in-memory DynamoDB) backend with generated tasks, then exports
+them to a temporary directory with every number of segments given, reporting the throughput and, with
+--trace-memory, the peak memory allocated during the export:
+
+    python -m benchmarks.export --backend sqlite --tasks 100000 --segments 1 2 4 8 --format jsonl
+
+The peak memory should stay flat when --tasks grows, since every worker only holds one scan page
+and the part it is writing.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import repository as repository_module
+from common.repository import InMemoryTaskRepository, new_task
+
+def create_repository(backend, directory):
+    """
+    Returns an empty task repository of a backend, with its files in directory.
+    """
+    if backend == 'memory':
+        return InMemoryTaskRepository()
+    if backend == 'sqlite':
+        from common.sqlite import SQLiteTaskRepository
+        return SQLiteTaskRepository(os.path.join(directory, 'tasks.db'))
+    from local.server import create_tables, start_moto
+    start_moto()
+    from common.dynamodb import TABLE_NAME, DynamoDBTaskRepository, get_client
+    create_tables(get_client(), TABLE_NAME)
+    return DynamoDBTaskRepository()
+
+def seed(repository, count, batch_size=1000):
+    """
+    Stores count generated tasks.
+    """
+    for start in range(0, count, batch_size):
+        repository.put_many([new_task({'title': f'Task {i}', 'description': f'Exported task number {i} ' * 4,
+                                       'status': ('pending', 'completed')[i % 2]},
+                                      '2024-01-01T00:00:00+00:00')
+                             for i in range(start, min(start + batch_size, count))])
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark of the task export.')
+    parser.add_argument('--backend', choices=['memory', 'sqlite', 'moto'], default='sqlite')
+    parser.add_argument('--tasks', type=int, default=50_000, help='Tasks seeded before exporting')
+    parser.add_argument('--segments', nargs='+', type=int, default=[1, 2, 4, 8])
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl')
+    parser.add_argument('--trace-memory', action='store_true', help='Report the peak memory, slows the export down')
+    parser.add_argument('--output', help='Where to write the JSON report')
+    args = parser.parse_args()
+
+    from lambdas.export_tasks import DirectorySink, export_tasks
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        repository = create_repository(args.backend, directory)
+        repository_module.set_repository(repository)
+        seed(repository, args.tasks)
+        for segments in args.segments:
+            output = os.path.join(directory, f'export-{segments}')
+            if args.trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            manifest = export_tasks(DirectorySink(output), args.format, segments, repository)
+            elapsed = time.perf_counter() - start
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024 if args.trace_memory else None
+            tracemalloc.stop()
+            size_mb = sum(os.path.getsize(os.path.join(output, part['name'])) for part in manifest['parts']) / 1024 / 1024
+            results.append({
+                'segments': segments,
+                'items': manifest['items'],
+                'seconds': round(elapsed, 3),
+                'items_per_second': round(manifest['items'] / elapsed),
+                'output_mb': round(size_mb, 3),
+                'peak_memory_mb': round(peak_mb, 3) if peak_mb is not None else None
+            })
+            print(f"{segments:>3} segments  {manifest['items']} tasks in {elapsed:.2f} s  "
+                  f"{manifest['items'] / elapsed:>10.0f} tasks/s  {size_mb:.2f} MB"
+                  + (f'  peak {peak_mb:.2f} MB' if peak_mb is not None else ''))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'backend': args.backend, 'format': args.format, 'tasks': args.tasks, 'results': results}, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Memory size tuning for the task handlers, against the local DynamoDB stub.
+
+Lambda gives a function CPU in proportion to its memory size, a full vCPU at 1769 MB. Every handler
+is measured once in a fresh process, splitting the wall time of each warm invocation into CPU time and
+time spent waiting on DynamoDB. The CPU part is then scaled to the CPU share of every memory size in
+the grid, and the cost of the invocations is estimated from the Lambda prices:
+
+    python -m benchmarks.power_tuning --memory-sizes 128 256 512 1024 --latency-target-ms 50
+
+The recommended setting of each handler is the cheapest one whose estimated p99 meets the latency
+target, or without a target the one with the lowest cost x latency. The recommendations are printed
+as the functionSettings context value of cdk.json.
+
+The local CPU is usually faster than the Lambda one: --cpu-factor scales the measured CPU time, and
+--extra-io-ms adds the DynamoDB round trip the stub does not have.
+"""
+import argparse
+import json
+import math
+import statistics
+import sys
+
+from benchmarks.cold_start import HANDLER_EVENTS, benchmark_env, percentile, run_child
+from benchmarks.stub_dynamodb import StubDynamoDB
+
+# Memory size at which a function gets a full vCPU, a single-threaded handler gains nothing above it
+FULL_VCPU_MEMORY_MB = 1769
+
+# Lambda prices in us-east-1, in USD
+PRICE_PER_GB_SECOND = {'x86_64': 0.0000166667, 'arm64': 0.0000133334}
+PRICE_PER_REQUEST = 0.0000002
+
+DEFAULT_MEMORY_SIZES = [128, 256, 512, 1024, 1769]
+DEFAULT_HANDLERS = [name for name in HANDLER_EVENTS if name != 'router']
+
+def estimate_duration_ms(wall_ms, cpu_ms, memory_mb, cpu_factor=1.0, extra_io_ms=0.0):
+    """
+    Estimates the duration of a measured invocation with the CPU share of a memory size.
+    Only the CPU time is scaled, the time waiting on I/O does not depend on the memory size.
+    """
+    cpu_share = min(1.0, memory_mb / FULL_VCPU_MEMORY_MB)
+    io_ms = max(0.0, wall_ms - cpu_ms) + extra_io_ms
+    return cpu_ms * cpu_factor / cpu_share + io_ms
+
+def invocation_cost(duration_ms, memory_mb, architecture):
+    """
+    Returns the cost of one invocation in USD, with the duration billed by the millisecond.
+    """
+    gb_seconds = math.ceil(duration_ms) / 1000 * memory_mb / 1024
+    return gb_seconds * PRICE_PER_GB_SECOND[architecture] + PRICE_PER_REQUEST
+
+def tune(sample, memory_sizes, architecture, cpu_factor=1.0, extra_io_ms=0.0, latency_target_ms=None):
+    """
+    Estimates the latency and cost of a handler for every memory size and picks the recommended one.
+
+    Parameters:
+    sample (dict): The 'warm_ms' and 'warm_cpu_ms' measured by benchmarks.cold_start.
+
+    Returns:
+    dict: One row per memory size and the 'recommended' memory size.
+    """
+    rows = []
+    for memory_mb in memory_sizes:
+        durations = [estimate_duration_ms(wall_ms, cpu_ms, memory_mb, cpu_factor, extra_io_ms)
+                     for wall_ms, cpu_ms in zip(sample['warm_ms'], sample['warm_cpu_ms'])]
+        cost = statistics.mean(invocation_cost(duration, memory_mb, architecture) for duration in durations)
+        p99_ms = percentile(durations, 99)
+        rows.append({
+            'memory_mb': memory_mb,
+            'p50_ms': round(percentile(durations, 50), 3),
+            'p99_ms': round(p99_ms, 3),
+            'cost_per_million_usd': round(cost * 1_000_000, 4),
+            'cost_x_latency': round(cost * 1_000_000 * p99_ms, 4)
+        })
+
+    meeting_target = [row for row in rows if latency_target_ms is None or row['p99_ms'] <= latency_target_ms]
+    if latency_target_ms is not None and meeting_target:
+        recommended = min(meeting_target, key=lambda row: (row['cost_per_million_usd'], row['p99_ms']))
+    elif latency_target_ms is not None:
+        # Nothing meets the target, the fastest setting gets closest
+        recommended = min(rows, key=lambda row: row['p99_ms'])
+    else:
+        recommended = min(rows, key=lambda row: row['cost_x_latency'])
+    return {
+        'cpu_ms_p50': round(percentile(sample['warm_cpu_ms'], 50), 3),
+        'wall_ms_p50': round(percentile(sample['warm_ms'], 50), 3),
+        'results': rows,
+        'recommended': recommended['memory_mb'],
+        'meets_target': latency_target_ms is None or recommended['p99_ms'] <= latency_target_ms
+    }
+
+def function_name(handler):
+    # The construct name of the function of a handler in the stack, e.g. batch_get_task -> BatchGetTask
+    return ''.join(part.title() for part in handler.split('_'))
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory size tuning for the task handlers.')
+    parser.add_argument('--handlers', nargs='+', choices=sorted(HANDLER_EVENTS), default=DEFAULT_HANDLERS)
+    parser.add_argument('--memory-sizes', nargs='+', type=int, default=DEFAULT_MEMORY_SIZES, help='Grid of memory sizes in MB')
+    parser.add_argument('--architecture', choices=sorted(PRICE_PER_GB_SECOND), default='x86_64', help='Prices to use')
+    parser.add_argument('--iterations', type=int, default=200, help='Warm invocations measured per handler')
+    parser.add_argument('--cpu-factor', type=float, default=1.0, help='How much slower the Lambda CPU is than this one')
+    parser.add_argument('--extra-io-ms', type=float, default=0.0, help='DynamoDB latency added to every invocation')
+    parser.add_argument('--latency-target-ms', type=float, help='p99 latency the recommended setting must meet')
+    parser.add_argument('--output', default='power_tuning_report.json', help='Where to write the JSON report')
+    args = parser.parse_args()
+
+    handlers = {}
+    with StubDynamoDB() as stub:
+        env = benchmark_env(stub.endpoint_url)
+        for name in args.handlers:
+            sample = run_child(name, args.iterations, env)
+            handlers[name] = tune(sample, args.memory_sizes, args.architecture, args.cpu_factor,
+                                  args.extra_io_ms, args.latency_target_ms)
+
+    report = {
+        'architecture': args.architecture,
+        'cpu_factor': args.cpu_factor,
+        'extra_io_ms': args.extra_io_ms,
+        'latency_target_ms': args.latency_target_ms,
+        'handlers': handlers
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, tuning in handlers.items():
+        print(f"{name} (CPU {tuning['cpu_ms_p50']} ms of {tuning['wall_ms_p50']} ms)")
+        for row in tuning['results']:
+            marker = '*' if row['memory_mb'] == tuning['recommended'] else ' '
+            print(f"  {marker} {row['memory_mb']:>5} MB  p50 {row['p50_ms']:>8.2f} ms  p99 {row['p99_ms']:>8.2f} ms  "
+                  f"${row['cost_per_million_usd']:>8.4f} per million")
+        if not tuning['meets_target']:
+            print(f"    no memory size meets the {args.latency_target_ms} ms target")
+
+    settings = {function_name(name): {'memorySize': tuning['recommended'], 'architecture': args.architecture}
+                for name, tuning in handlers.items()}
+    print('Recommended functionSettings for cdk.json:')
+    print(json.dumps(settings, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Microbenchmark of the JSON serialization of task responses.
+
+Serializes representative payloads (a single task, a list page and a batch get response, with the
+Decimal numbers and sets the DynamoDB deserializer returns) with every encoder available:
+
+- stdlib: json.dumps with the Decimal-aware default of common.serialization.
+- orjson: orjson.dumps with the same default, when orjson is installed.
+
+    python -m benchmarks.serialization --repeat 5 --number 200
+"""
+import argparse
+import json
+import sys
+import timeit
+import uuid
+from decimal import Decimal
+
+from common import serialization
+
+def task_item(index):
+    """
+    Returns a task item as read from DynamoDB.
+    """
+    return {
+        'taskId': str(uuid.UUID(int=index)),
+        'title': f'Task {index}',
+        'description': 'A representative task description of a few dozen words. ' * 3,
+        'status': 'pending',
+        'createdAt': '2024-01-01T00:00:00.000000+00:00',
+        'updatedAt': '2024-01-02T00:00:00.000000+00:00',
+        'version': index % 7 + 1,
+        'priority': Decimal('2.5'),
+        'tags': {'backend', 'urgent'}
+    }
+
+# The payloads of get_task, list_tasks (a page of 100) and batch_get_task (500 tasks)
+PAYLOADS = {
+    'task': task_item(1),
+    'list_page': {'tasks': [task_item(i) for i in range(100)], 'nextCursor': 'eyJ0YXNrSWQiOiAiMSJ9'},
+    'batch_get': {'tasks': [task_item(i) for i in range(500)]}
+}
+
+def encoders():
+    """
+    Returns the encoders to compare, by name.
+    """
+    found = {'stdlib': lambda value: serialization._stdlib_dumps(value, False)}
+    if serialization.orjson is not None:
+        orjson = serialization.orjson
+        found['orjson'] = lambda value: orjson.dumps(value, default=serialization.to_json_value).decode()
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark of the JSON serialization of task responses.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions, the best one is reported')
+    parser.add_argument('--number', type=int, default=200, help='Serializations per repetition')
+    parser.add_argument('--output', help='Where to write the JSON report')
+    args = parser.parse_args()
+
+    results = {}
+    for payload_name, payload in PAYLOADS.items():
+        results[payload_name] = {}
+        for encoder_name, encode in encoders().items():
+            size = len(encode(payload).encode())
+            best = min(timeit.repeat(lambda: encode(payload), repeat=args.repeat, number=args.number))
+            per_call_us = best / args.number * 1_000_000
+            results[payload_name][encoder_name] = {
+                'us_per_call': round(per_call_us, 3),
+                'mb_per_second': round(size / per_call_us, 3),
+                'bytes': size
+            }
+        baseline = results[payload_name]['stdlib']['us_per_call']
+        print(payload_name)
+        for encoder_name, result in results[payload_name].items():
+            print(f"  {encoder_name:<7} {result['us_per_call']:>10.2f} us  {result['mb_per_second']:>8.2f} MB/s  "
+                  f"x{baseline / result['us_per_call']:.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'repeat': args.repeat, 'number': args.number, 'payloads': results}, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TASK_ID = '0b4f4c5e-8a3b-4f37-9f5e-3c1d6a0f2b7e'
+
+TASK_ITEM = {
+    'taskId': {'S': TASK_ID},
+    'title': {'S': 'Task 1'},
+    'description': {'S': 'This is task 1'},
+    'status': {'S': 'pending'},
+    'createdAt': {'S': '2024-01-01T00:00:00+00:00'},
+    'version': {'N': '1'}
+}
+
+# Canned response for every DynamoDB operation used by the handlers, keyed by X-Amz-Target operation
+RESPONSES = {
+    'PutItem': {},
+    'GetItem': {'Item': TASK_ITEM},
+    'UpdateItem': {'Attributes': {**{k: TASK_ITEM[k] for k in ('title', 'description', 'status')}, 'version': {'N': '2'}}},
+    'DeleteItem': {},
+    'BatchWriteItem': {'UnprocessedItems': {}},
+    'BatchGetItem': {'Responses': {'TasksTable': [TASK_ITEM]}, 'UnprocessedKeys': {}},
+    'Query': {'Items': [TASK_ITEM], 'Count': 1, 'ScannedCount': 1}
+}
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, without this delayed ACKs add ~40 ms per call
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        operation = self.headers.get('X-Amz-Target', '').split('.')[-1]
+        if operation in RESPONSES:
+            status, body = 200, RESPONSES[operation]
+        else:
+            status, body = 400, {'__type': 'com.amazon.coral.validate#ValidationException',
+                                 'message': f'Operation not stubbed: {operation}'}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/x-amz-json-1.0')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+class StubDynamoDB:
+    """
+    Local HTTP endpoint answering DynamoDB API calls with canned responses.
+    Point a client at it with the AWS_ENDPOINT_URL_DYNAMODB environment variable, so the real
+    botocore client, serialization and connection handling are measured without touching AWS.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def endpoint_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,113 @@
+"""
+Tracing overhead benchmark for the task handlers, against the local DynamoDB stub.
+
+Every handler is measured in fresh processes, with and without instrumentation:
+
+- off: the plain handler.
+- adot: the handler started by opentelemetry-instrument, as the /opt/otel-instrument wrapper of the
+  ADOT layer does. Skipped when opentelemetry-instrument is not installed
+  (pip install opentelemetry-distro opentelemetry-instrumentation-botocore).
+
+The xray mode of the stack is not measured: Lambda active tracing records the segments outside the
+function and adds no code to it, so a local run has nothing to compare with off.
+
+    python -m benchmarks.tracing --handlers get_task create_task --runs 5
+
+The report has the init duration (import and first call) and the warm latencies of every mode, and
+their difference with the off mode. The ADOT collector extension also adds to the init duration in
+Lambda, which a local run does not show.
+"""
+import argparse
+import json
+import shutil
+import statistics
+import sys
+
+from benchmarks.cold_start import DEFAULT_HANDLERS, HANDLER_EVENTS, benchmark_env, percentile, run_child
+from benchmarks.stub_dynamodb import StubDynamoDB
+
+TRACE_HEADER = 'Root=1-5759e988-bd862e3fe1be46a994272793;Parent=53995c3f42cd8ad8;Sampled=1'
+
+# Wrapper command and extra environment of every mode
+MODES = {
+    'off': (None, {}),
+    'adot': ('opentelemetry-instrument', {
+        'OTEL_SERVICE_NAME': 'tasks-benchmark',
+        'OTEL_TRACES_EXPORTER': 'none',
+        'OTEL_METRICS_EXPORTER': 'none',
+        'OTEL_LOGS_EXPORTER': 'none',
+        'OTEL_PROPAGATORS': 'xray',
+        '_X_AMZN_TRACE_ID': TRACE_HEADER
+    })
+}
+
+def available_modes(modes):
+    """
+    Returns the modes whose wrapper is installed.
+    """
+    return [mode for mode in modes if MODES[mode][0] is None or shutil.which(MODES[mode][0])]
+
+def summarize(samples):
+    """
+    Returns the init duration and warm latencies of the samples of one handler and mode.
+    """
+    warm_ms = [value for sample in samples for value in sample['warm_ms']]
+    return {
+        'init_ms': round(statistics.median(s['import_ms'] + s['first_call_ms'] for s in samples), 3),
+        'import_ms': round(statistics.median(s['import_ms'] for s in samples), 3),
+        'first_call_ms': round(statistics.median(s['first_call_ms'] for s in samples), 3),
+        'warm_p50_ms': round(percentile(warm_ms, 50), 3),
+        'warm_p99_ms': round(percentile(warm_ms, 99), 3)
+    }
+
+def overhead(results, baseline='off'):
+    """
+    Adds to every mode its difference with the baseline mode, e.g. 'init_overhead_ms'.
+    """
+    for mode, metrics in results.items():
+        if mode == baseline or baseline not in results:
+            continue
+        for metric in ('init_ms', 'warm_p50_ms', 'warm_p99_ms'):
+            name = metric.replace('_ms', '_overhead_ms')
+            metrics[name] = round(metrics[metric] - results[baseline][metric], 3)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Tracing overhead benchmark for the task handlers.')
+    parser.add_argument('--handlers', nargs='+', choices=sorted(HANDLER_EVENTS), default=DEFAULT_HANDLERS)
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes per handler and mode')
+    parser.add_argument('--iterations', type=int, default=200, help='Warm invocations per process')
+    parser.add_argument('--output', default='tracing_report.json', help='Where to write the JSON report')
+    args = parser.parse_args()
+
+    modes = available_modes(args.modes)
+    for mode in set(args.modes) - set(modes):
+        print(f'Skipping {mode}: {MODES[mode][0]} is not installed')
+
+    handlers = {}
+    with StubDynamoDB() as stub:
+        env = benchmark_env(stub.endpoint_url)
+        for name in args.handlers:
+            results = {}
+            for mode in modes:
+                wrapper, mode_env = MODES[mode]
+                samples = [run_child(name, args.iterations, dict(env, **mode_env), wrapper) for _ in range(args.runs)]
+                results[mode] = summarize(samples)
+            handlers[name] = overhead(results)
+
+    report = {'runs': args.runs, 'iterations': args.iterations, 'handlers': handlers}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, results in handlers.items():
+        print(name)
+        for mode, metrics in results.items():
+            print(f"  {mode:<5} init {metrics['init_ms']:>8.2f} ms  "
+                  f"warm p50 {metrics['warm_p50_ms']:>6.2f} ms  p99 {metrics['warm_p99_ms']:>6.2f} ms"
+                  + (f"  (init {metrics['init_overhead_ms']:+.2f} ms, p50 {metrics['warm_p50_overhead_ms']:+.2f} ms)"
+                     if 'init_overhead_ms' in metrics else ''))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
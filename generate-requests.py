@@ -1,14 +1,20 @@
 import requests
+import argparse
+import csv
 import json
 import os
 import uuid
 import random
+import re
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-API_ENDPOINT = os.getenv("API_GATEWAY") + "/tasks"
+API_ENDPOINT = os.getenv("API_GATEWAY", "") + "/tasks"
 ID_TOKEN = os.getenv("ID_TOKEN")
 
-def create_task(task_number):
+def create_task(task_number, session=requests):
     task = {
         "title": f"Task {task_number}",
         "description": f"This is task number {task_number}",
@@ -18,17 +24,17 @@ def create_task(task_number):
         "Content-Type": "application/json",
         "Authorization": ID_TOKEN
     }
-    response = requests.post(API_ENDPOINT, headers=headers, data=json.dumps(task))
+    response = session.post(API_ENDPOINT, headers=headers, data=json.dumps(task))
     return response
 
-def get_task(task_id):
+def get_task(task_id, session=requests):
     headers = {
         "Authorization": ID_TOKEN
     }
-    response = requests.get(f"{API_ENDPOINT}/{task_id}", headers=headers)
+    response = session.get(f"{API_ENDPOINT}/{task_id}", headers=headers)
     return response
 
-def update_task(task_id):
+def update_task(task_id, session=requests):
     updated_task = {
         "title": "Updated Task",
         "description": "Updated description",
@@ -38,40 +44,40 @@ def update_task(task_id):
         "Content-Type": "application/json",
         "Authorization": ID_TOKEN
     }
-    response = requests.put(f"{API_ENDPOINT}/{task_id}", headers=headers, data=json.dumps(updated_task))
+    response = session.put(f"{API_ENDPOINT}/{task_id}", headers=headers, data=json.dumps(updated_task))
     return response
 
-def delete_task(task_id):
+def delete_task(task_id, session=requests):
     headers = {
         "Authorization": ID_TOKEN
     }
-    response = requests.delete(f"{API_ENDPOINT}/{task_id}", headers=headers)
+    response = session.delete(f"{API_ENDPOINT}/{task_id}", headers=headers)
     return response
 
-def create_invalid_task():
+def create_invalid_task(session=requests):
     # Missing required fields to trigger 400 Bad Request
     task = {
         "description": "This is an invalid task"
     }
-    response = requests.post(API_ENDPOINT, headers={"Content-Type": "application/json"}, data=json.dumps(task))
+    response = session.post(API_ENDPOINT, headers={"Content-Type": "application/json"}, data=json.dumps(task))
     return response
 
-def simulate_server_error():
+def simulate_server_error(session=requests):
     # Simulate a server error by sending invalid data that the server cannot process
     task = {
         "title": "Task",
         "description": "This will cause a server error",
         "status": "pending" * 3  # Exaggerated status to cause a server error
     }
-    response = requests.post(API_ENDPOINT, headers={"Content-Type": "application/json"}, data=json.dumps(task))
+    response = session.post(API_ENDPOINT, headers={"Content-Type": "application/json"}, data=json.dumps(task))
     return response
 
-def generate_traffic():
+def generate_traffic(session=requests):
     task_ids = []
 
     # Create tasks
     for i in range(15):
-        response = create_task(i + 1)
+        response = create_task(i + 1, session)
         if response.status_code == 201:
             task_id = response.json().get('taskId')
             task_ids.append(task_id)
@@ -82,30 +88,452 @@ def generate_traffic():
         action = random.choice(["get", "update", "delete", "invalid_get", "invalid_update", "invalid_delete", "invalid_create", "server_error"])
         if action == "get" and task_ids:
             task_id = random.choice(task_ids)
-            response = get_task(task_id)
+            response = get_task(task_id, session)
         elif action == "update" and task_ids:
             task_id = random.choice(task_ids)
-            response = update_task(task_id)
+            response = update_task(task_id, session)
         elif action == "delete" and task_ids:
             task_id = random.choice(task_ids)
-            response = delete_task(task_id)
+            response = delete_task(task_id, session)
             if response.status_code == 204:
                 task_ids.remove(task_id)
         elif action == "invalid_get":
-            response = get_task(str(uuid.uuid4()))
+            response = get_task(str(uuid.uuid4()), session)
         elif action == "invalid_update":
-            response = update_task(str(uuid.uuid4()))
+            response = update_task(str(uuid.uuid4()), session)
         elif action == "invalid_delete":
-            response = delete_task(str(uuid.uuid4()))
+            response = delete_task(str(uuid.uuid4()), session)
         elif action == "invalid_create":
-            response = create_invalid_task()
+            response = create_invalid_task(session)
         elif action == "server_error":
-            response = simulate_server_error()
+            response = simulate_server_error(session)
         else:
             continue
 
         print(f"{action.capitalize()} Task Response: {response.status_code}, {response.text}")
         time.sleep(random.uniform(0.1, 1.0))
 
+# Default weighted mix of operations of the load test
+DEFAULT_MIX = "create=1,get=6,update=2,delete=1"
+
+def parse_mix(mix):
+    """
+    Parses an operation mix such as "create=1,get=6" into a dict of operation weights.
+    """
+    weights = {}
+    for part in mix.split(","):
+        operation, _, weight = part.partition("=")
+        if operation.strip() not in ("create", "get", "update", "delete"):
+            raise ValueError(f"Unknown operation in mix: {operation}")
+        weights[operation.strip()] = float(weight or 1)
+    return weights
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+class TaskPool:
+    """
+    Thread-safe set of the task ids that exist, used to pick targets for get, update and delete.
+    """
+    def __init__(self):
+        self._task_ids = []
+        self._lock = threading.Lock()
+
+    def add(self, task_id):
+        with self._lock:
+            self._task_ids.append(task_id)
+
+    def pick(self):
+        with self._lock:
+            return random.choice(self._task_ids) if self._task_ids else None
+
+    def take(self):
+        with self._lock:
+            if not self._task_ids:
+                return None
+            index = random.randrange(len(self._task_ids))
+            self._task_ids[index], self._task_ids[-1] = self._task_ids[-1], self._task_ids[index]
+            return self._task_ids.pop()
+
+class LatencyStats:
+    """
+    Thread-safe latency samples per operation and status code.
+    """
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, operation, status, latency_ms):
+        with self._lock:
+            self._samples[(operation, str(status))].append(latency_ms)
+
+    def summary(self):
+        rows = []
+        with self._lock:
+            for (operation, status), latencies in sorted(self._samples.items()):
+                rows.append({
+                    "operation": operation,
+                    "status": status,
+                    "count": len(latencies),
+                    "p50_ms": round(percentile(latencies, 50), 2),
+                    "p90_ms": round(percentile(latencies, 90), 2),
+                    "p99_ms": round(percentile(latencies, 99), 2),
+                    "max_ms": round(max(latencies), 2)
+                })
+        return rows
+
+# Trace every request is recorded to, set with --record
+RECORDER = None
+
+_thread_local = threading.local()
+
+def thread_session():
+    """
+    Returns the requests session of the current worker thread, so every worker reuses its own kept-alive connection.
+    """
+    if not hasattr(_thread_local, "session"):
+        _thread_local.session = requests.Session()
+        if RECORDER:
+            _thread_local.session = RecordingSession(_thread_local.session, RECORDER)
+    return _thread_local.session
+
+class TraceRecorder:
+    """
+    Writes every request to a JSONL trace: its method, path, body, time offset since the start and the
+    status code it got. Task ids returned by creates are replaced in later paths with {task:N} references,
+    where N numbers the creates, so a replay can target the tasks it creates itself.
+    """
+    def __init__(self, path):
+        self._file = open(path, "w")
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._seq = 0
+        self._refs = {}
+
+    def offset(self):
+        return time.perf_counter() - self._start
+
+    def record(self, offset, method, url, body, response):
+        path = "/tasks" + url[len(API_ENDPOINT):]
+        with self._lock:
+            segments = path.split("/")
+            path = "/".join(f"{{task:{self._refs[s]}}}" if s in self._refs else s for s in segments)
+            entry = {
+                "seq": self._seq,
+                "offset_s": round(offset, 6),
+                "method": method,
+                "path": path,
+                "body": body,
+                "expected_status": response.status_code
+            }
+            if method == "POST" and path == "/tasks" and response.status_code == 201:
+                entry["creates"] = len(self._refs)
+                self._refs[response.json()["taskId"]] = len(self._refs)
+            self._seq += 1
+            self._file.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        self._file.close()
+
+class RecordingSession:
+    """
+    Wraps a requests session (or the requests module) and records every request it sends.
+    """
+    def __init__(self, session, recorder):
+        self._session = session
+        self._recorder = recorder
+
+    def request(self, method, url, headers=None, data=None):
+        offset = self._recorder.offset()
+        response = self._session.request(method, url, headers=headers, data=data)
+        self._recorder.record(offset, method, url, data, response)
+        return response
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+def read_trace(path):
+    """
+    Streams the entries of a trace one line at a time, so traces of any size can be replayed.
+    """
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+class TaskRefs:
+    """
+    Task ids created during a replay, by the {task:N} reference of the create that recorded them.
+    Requests wait for the create they depend on when it is still in flight.
+    """
+    REF = re.compile(r"\{task:(\d+)\}")
+
+    def __init__(self):
+        self._ids = {}
+        self._events = defaultdict(threading.Event)
+        self._lock = threading.Lock()
+
+    def _event(self, ref):
+        with self._lock:
+            return self._events[ref]
+
+    def set(self, ref, task_id):
+        self._ids[ref] = task_id
+        self._event(ref).set()
+
+    def resolve(self, path, timeout=30):
+        def replace(match):
+            ref = int(match.group(1))
+            self._event(ref).wait(timeout)
+            # Failed creates are replaced by a task that does not exist
+            return self._ids.get(ref) or str(uuid.uuid4())
+        return self.REF.sub(replace, path)
+
+def api_sender(method, path, body):
+    headers = {"Authorization": ID_TOKEN}
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    response = thread_session().request(method, API_ENDPOINT[:-len("/tasks")] + path, headers=headers, data=body)
+    return response.status_code, response.text
+
+def handler_sender(method, path, body):
+    from local.events import invoke
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    response = invoke(method, path, headers=headers, body=body)
+    return response["statusCode"], response.get("body")
+
+def replay(trace_path, speed=1.0, concurrency=16, target="api"):
+    """
+    Re-issues the requests of a trace with the original timing divided by `speed` (0 for as fast as
+    possible), against the deployed API or directly against the handler functions in this process.
+    """
+    if target == "handlers":
+        # The in-memory repository unless another one is asked for, e.g. TASK_REPOSITORY=dynamodb with
+        # AWS_ENDPOINT_URL_DYNAMODB for a local DynamoDB, so a replay never writes to the tasks table of the account
+        os.environ.setdefault("TASK_REPOSITORY", "memory")
+    from local.events import match_route
+    send = api_sender if target == "api" else handler_sender
+    task_refs = TaskRefs()
+    stats = LatencyStats()
+    mismatches = [0]
+    errors = []
+    lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(concurrency)
+
+    def record_error(entry, error):
+        with lock:
+            errors.append(f"{entry['method']} {entry['path']}: {error!r}")
+
+    def worker(entry):
+        created_task_id = None
+        try:
+            path = task_refs.resolve(entry["path"])
+            route = match_route(entry["method"], entry["path"].replace("{", "").replace("}", ""))
+            operation = f"{entry['method']} {route[0] if route else entry['path']}"
+            start = time.perf_counter()
+            try:
+                status, body = send(entry["method"], path, entry["body"])
+                if "creates" in entry and status == 201:
+                    created_task_id = json.loads(body)["taskId"]
+            except Exception as e:
+                # Connection errors, handlers raising and creates answering without a task id
+                status = "error"
+                record_error(entry, e)
+            stats.record(operation, status, (time.perf_counter() - start) * 1000)
+            if status != entry["expected_status"]:
+                with lock:
+                    mismatches[0] += 1
+        finally:
+            # Always set, or the requests on the task would wait for it until their timeout
+            if "creates" in entry:
+                task_refs.set(entry["creates"], created_task_id)
+            in_flight.release()
+
+    def check(future, entry):
+        if future.exception() is not None:
+            record_error(entry, future.exception())
+
+    sent = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for entry in read_trace(trace_path):
+            if speed:
+                delay = start + entry["offset_s"] / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            in_flight.acquire()
+            executor.submit(worker, entry).add_done_callback(lambda future, entry=entry: check(future, entry))
+            sent += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "trace": trace_path,
+        "target": target,
+        "speed": speed,
+        "duration_s": round(elapsed, 2),
+        "requests": sent,
+        "achieved_rps": round(sent / elapsed, 2) if elapsed else 0,
+        "status_mismatches": mismatches[0],
+        "errors": len(errors),
+        "first_errors": errors[:10],
+        "results": stats.summary()
+    }
+
+def run_operation(operation, task_pool):
+    """
+    Runs one operation of the load test and returns its status code.
+    Operations on existing tasks fall back to a random task id (404) when there are no tasks yet.
+    """
+    session = thread_session()
+    if operation == "create":
+        response = create_task(random.randint(1, 1_000_000), session)
+        if response.status_code == 201:
+            task_pool.add(response.json()["taskId"])
+    elif operation == "get":
+        response = get_task(task_pool.pick() or str(uuid.uuid4()), session)
+    elif operation == "update":
+        response = update_task(task_pool.pick() or str(uuid.uuid4()), session)
+    else:
+        task_id = task_pool.take() or str(uuid.uuid4())
+        response = delete_task(task_id, session)
+        # Keep the task as a target if it was not deleted for another reason than not existing
+        if response.status_code not in (204, 404):
+            task_pool.add(task_id)
+    return response.status_code
+
+def load_test(rps, concurrency, duration, mix, seed_tasks=20):
+    """
+    Sends a weighted mix of operations at a target rate for a fixed duration.
+    At most `concurrency` requests are in flight, when all of them are busy the generator waits,
+    so the achieved rate in the report shows when the API cannot keep up with the target.
+    """
+    task_pool = TaskPool()
+    stats = LatencyStats()
+    operations, weights = zip(*mix.items())
+    in_flight = threading.BoundedSemaphore(concurrency)
+
+    def worker(operation, record=True):
+        try:
+            start = time.perf_counter()
+            try:
+                status = run_operation(operation, task_pool)
+            except requests.RequestException:
+                status = "error"
+            if record:
+                stats.record(operation, status, (time.perf_counter() - start) * 1000)
+        finally:
+            in_flight.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Create the first targets for get, update and delete, they are not part of the results
+        seeds = []
+        for _ in range(seed_tasks):
+            in_flight.acquire()
+            seeds.append(executor.submit(worker, "create", False))
+        for seed in seeds:
+            seed.result()
+
+        sent = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            if rps:
+                delay = start + sent / rps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            in_flight.acquire()
+            executor.submit(worker, random.choices(operations, weights)[0])
+            sent += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "target_rps": rps,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": sent,
+        "achieved_rps": round(sent / elapsed, 2) if elapsed else 0,
+        "mix": mix,
+        "results": stats.summary()
+    }
+
+def write_report(report, path):
+    """
+    Writes the load test report as CSV (one row per operation and status code) or JSON, depending on the extension.
+    """
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["operation", "status", "count", "p50_ms", "p90_ms", "p99_ms", "max_ms"])
+            writer.writeheader()
+            writer.writerows(report["results"])
+    else:
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+def print_report(report):
+    print(f"{report['requests']} requests in {report['duration_s']} s ({report['achieved_rps']} req/s)")
+    for row in report["results"]:
+        print(f"{row['operation']:<24} {row['status']:<6} n={row['count']:<7} p50={row['p50_ms']:>8} ms  "
+              f"p90={row['p90_ms']:>8} ms  p99={row['p99_ms']:>8} ms  max={row['max_ms']:>8} ms")
+
+def main():
+    global API_ENDPOINT, RECORDER
+    parser = argparse.ArgumentParser(description="Generate traffic to the Tasks API.")
+    parser.add_argument("--endpoint", help="Base URL of the API, defaults to the API_GATEWAY environment variable")
+    parser.add_argument("--record", metavar="TRACE", help="Record every request of traffic or load-test to a JSONL trace")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("traffic", help="Send a small random mix of valid and invalid requests (default)")
+    load = subparsers.add_parser("load-test", help="Send a weighted mix of operations at a target rate")
+    load.add_argument("--rps", type=float, default=50, help="Target requests per second, 0 for as fast as possible")
+    load.add_argument("--concurrency", type=int, default=16, help="Maximum requests in flight")
+    load.add_argument("--duration", type=float, default=60, help="Duration in seconds")
+    load.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operation mix, e.g. create=1,get=6,update=2,delete=1")
+    load.add_argument("--seed-tasks", type=int, default=20, help="Tasks created before the test starts")
+    load.add_argument("--output", default="load-test-report.json", help="Report file, .json or .csv")
+    replay_parser = subparsers.add_parser("replay", help="Re-issue the requests of a recorded trace")
+    replay_parser.add_argument("trace", help="JSONL trace recorded with --record")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="Speed factor of the original timing, 0 for as fast as possible")
+    replay_parser.add_argument("--concurrency", type=int, default=16, help="Maximum requests in flight")
+    replay_parser.add_argument("--target", choices=["api", "handlers"], default="api",
+                               help="Send the requests to the API or invoke the handler functions in this process")
+    replay_parser.add_argument("--output", default="replay-report.json", help="Report file, .json or .csv")
+    args = parser.parse_args()
+
+    if args.endpoint:
+        API_ENDPOINT = args.endpoint.rstrip("/") + "/tasks"
+
+    if args.command == "replay":
+        report = replay(args.trace, args.speed, args.concurrency, args.target)
+        write_report(report, args.output)
+        print_report(report)
+        print(f"{report['status_mismatches']} responses with a different status code than recorded")
+        for error in report["first_errors"]:
+            print(f"Error: {error}")
+        if report["errors"] > len(report["first_errors"]):
+            print(f"... {report['errors'] - len(report['first_errors'])} more errors")
+        return
+
+    if args.record:
+        RECORDER = TraceRecorder(args.record)
+    try:
+        if args.command == "load-test":
+            report = load_test(args.rps, args.concurrency, args.duration, parse_mix(args.mix), args.seed_tasks)
+            write_report(report, args.output)
+            print_report(report)
+        else:
+            generate_traffic(RecordingSession(requests, RECORDER) if RECORDER else requests)
+    finally:
+        if RECORDER:
+            RECORDER.close()
+
 if __name__ == "__main__":
-    generate_traffic()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+import json
+from datetime import datetime, timezone
+from common.metrics import instrument, phase
+from common.repository import get_repository, new_task
+from common.schemas import BATCH_CREATE_SCHEMA, TASK_SCHEMA, schema_error
+
+@instrument
+def handler(event, context):
+    """
+    Lambda function handler to create several tasks in the DynamoDB table with a single request.
+
+    Parameters:
+    event (dict): The event dictionary containing the HTTP request details.
+                  Expected to have a 'body' key with a JSON array of tasks, each one containing
+                  'title', 'description', and 'status'.
+    context (object): The context in which the Lambda function is called.
+
+    Returns:
+    dict: A dictionary containing the HTTP response with a status code and a body.
+          The body contains 'taskIds' (one entry per submitted task, null when it was not created)
+          and 'errors' (a list of objects with the 'index' of the failed task and an 'error' message).
+          - 201: All the tasks were created.
+          - 207: Some of the tasks could not be created.
+          - 400: If the body is not a non-empty array or it has too many tasks.
+          - 500: On general error, the body contains an error message with the exception details.
+    """
+    try:
+        # Parse the request body
+        with phase('parse'):
+            tasks = json.loads(event.get('body') or '[]')
+        error = schema_error(tasks, BATCH_CREATE_SCHEMA)
+        if error:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': error})
+            }
+
+        created_at = datetime.now(timezone.utc).isoformat()
+        task_ids = [None] * len(tasks)
+        errors = []
+        pending = []
+        # Validate every task the same way create_task does
+        for index, task in enumerate(tasks):
+            error = schema_error(task, TASK_SCHEMA, 'Task')
+            if error:
+                errors.append({'index': index, 'error': error})
+                continue
+            pending.append((index, new_task(task, created_at)))
+
+        # Insert the items into the task repository, DynamoDB writes them in chunks
+        with phase('store'):
+            unprocessed = {item['taskId'] for item in get_repository().put_many([item for _, item in pending])}
+        for index, item in pending:
+            if item['taskId'] in unprocessed:
+                errors.append({'index': index, 'error': 'Task was not written, retry later'})
+            else:
+                task_ids[index] = item['taskId']
+
+        errors.sort(key=lambda error: error['index'])
+        return {
+            'statusCode': 207 if errors else 201,
+            'body': json.dumps({'taskIds': task_ids, 'errors': errors})
+        }
+    except json.JSONDecodeError:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': 'Body must be a non-empty JSON array of tasks'})
+        }
+    except Exception as e:
+        return {
+            # Return a 500 status code and an error message with the exception details
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
@@ -0,0 +1,66 @@
+import json
+from common.metrics import instrument, phase
+from common.repository import get_repository
+from common.schemas import BATCH_GET_SCHEMA, schema_error
+from common.serialization import dumps
+
+@instrument
+def handler(event, context):
+    """
+    Lambda function handler to retrieve several tasks by their taskId with a single request.
+
+    Parameters:
+    event (dict): The event dictionary containing request data. Expected to have a 'body' key with a JSON
+                  string containing 'taskIds' (a list of task ids) and optionally 'attributes'
+                  (a list of attribute names to return for each task).
+    context (object): The context in which the Lambda function is called.
+
+    Returns:
+    dict: A dictionary containing the HTTP status code and the response body.
+        - 200: The body contains 'tasks', one entry per requested taskId in request order
+               (null if the task was not found).
+        - 400: Missing or invalid taskIds or attributes.
+        - 500: Internal server error.
+    """
+
+    try:
+        with phase('parse'):
+            body = json.loads(event.get('body') or '{}')
+
+        # The taskIds are required and must be UUIDs, the attributes names, see BATCH_GET_SCHEMA
+        with phase('validate'):
+            error = schema_error(body, BATCH_GET_SCHEMA)
+        if error:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': error})
+            }
+        task_ids = body['taskIds']
+        attributes = body.get('attributes')
+
+        # BatchGetItem rejects duplicated keys, so read every task only once
+        unique_ids = list(dict.fromkeys(task_ids))
+        # The taskId is always projected to match the items back to the request
+        if attributes:
+            attributes = ['taskId'] + [a for a in attributes if a != 'taskId']
+        with phase('store'):
+            items = {item['taskId']: item for item in get_repository().get_many(unique_ids, attributes)}
+
+        with phase('serialize'):
+            body = dumps({'tasks': [items.get(task_id) for task_id in task_ids]})
+        return {
+            # Return a 200 status code and the task items in request order
+            'statusCode': 200,
+            'body': body
+        }
+
+    except json.JSONDecodeError:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': 'Invalid JSON body'})
+        }
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
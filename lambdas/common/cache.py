@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from common.metrics import METRICS_MODE, METRICS_NAMESPACE
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after a fixed time to live.
+    A ttl_seconds of 0 disables the cache: nothing is stored and every lookup is a miss.
+    """
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, key):
+        """
+        Returns the cached value for key, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        Stores a value, evicting the least recently used entries beyond max_size.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+def emit_cache_metrics(name, hit):
+    """
+    Prints the outcome of one cache lookup in CloudWatch Embedded Metric Format, so the hit ratio
+    can be graphed per cache without any API call. Nothing is printed when METRICS_MODE is 'off'.
+    """
+    if METRICS_MODE == 'off':
+        return
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['Cache']],
+                'Metrics': [{'Name': 'CacheHit', 'Unit': 'Count'}, {'Name': 'CacheMiss', 'Unit': 'Count'}]
+            }]
+        },
+        'Cache': name,
+        'CacheHit': int(hit),
+        'CacheMiss': int(not hit)
+    }))
+
+# Task items cached by get_task in this container, disabled unless TASK_CACHE_TTL_SECONDS is set
+task_cache = TTLCache(
+    max_size=int(os.environ.get('TASK_CACHE_SIZE', '1000')),
+    ttl_seconds=float(os.environ.get('TASK_CACHE_TTL_SECONDS', '0'))
+)
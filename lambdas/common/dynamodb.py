@@ -0,0 +1,320 @@
+import os
+import random
+import time
+from base64 import b64decode
+from decimal import Decimal
+from common.metrics import return_consumed_capacity, record_consumed_capacity
+from common.repository import TaskRepository, TaskNotFound, VersionConflict
+
+TABLE_NAME = os.environ.get('TABLE_NAME', 'TasksTable')
+STATUS_INDEX_NAME = 'StatusIndex'
+
+# BatchWriteItem accepts at most 25 requests and BatchGetItem at most 100 keys per call
+BATCH_WRITE_SIZE = 25
+BATCH_GET_SIZE = 100
+MAX_BATCH_RETRIES = 5
+BASE_BACKOFF_SECONDS = 0.05
+
+_client = None
+
+def get_client():
+    """
+    Returns the DynamoDB client shared by every handler in the container.
+    The client (and boto3 itself) is only created on first use, so importing a handler stays cheap.
+    """
+    global _client
+    if _client is None:
+        import boto3
+        from botocore.config import Config
+
+        # Short timeouts fail fast inside the Lambda timeout, standard retry mode adds jittered backoff on
+        # throttling, and a kept-alive connection pool avoids a TLS handshake per request in warm containers
+        config = Config(
+            connect_timeout=float(os.environ.get('DYNAMODB_CONNECT_TIMEOUT', '2')),
+            read_timeout=float(os.environ.get('DYNAMODB_READ_TIMEOUT', '5')),
+            retries={'max_attempts': int(os.environ.get('DYNAMODB_MAX_ATTEMPTS', '3')), 'mode': 'standard'},
+            max_pool_connections=int(os.environ.get('DYNAMODB_MAX_POOL_CONNECTIONS', '10')),
+            tcp_keepalive=True
+        )
+        _client = boto3.client('dynamodb', config=config)
+    return _client
+
+def set_client(client):
+    """
+    Replaces the shared DynamoDB client, e.g. with a local stand-in. Passing None resets it.
+    """
+    global _client
+    _client = client
+
+def serialize_value(value):
+    """
+    Converts a Python value into a DynamoDB AttributeValue.
+    """
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, (int, float, Decimal)):
+        return {'N': str(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {'B': bytes(value)}
+    if isinstance(value, dict):
+        return {'M': {k: serialize_value(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {'L': [serialize_value(v) for v in value]}
+    if isinstance(value, (set, frozenset)):
+        if all(isinstance(v, str) for v in value):
+            return {'SS': sorted(value)}
+        if all(isinstance(v, (int, float, Decimal)) and not isinstance(v, bool) for v in value):
+            return {'NS': [str(v) for v in value]}
+        if all(isinstance(v, (bytes, bytearray)) for v in value):
+            return {'BS': [bytes(v) for v in value]}
+    raise TypeError(f'Unsupported type for DynamoDB: {type(value).__name__}')
+
+def _number(text):
+    # Integral numbers become int so they serialize to JSON directly, the others keep their precision
+    number = Decimal(text)
+    return int(number) if number == number.to_integral_value() else number
+
+def deserialize_value(attribute):
+    """
+    Converts a DynamoDB AttributeValue into a Python value.
+    """
+    (kind, value), = attribute.items()
+    if kind == 'S':
+        return value
+    if kind == 'N':
+        return _number(value)
+    if kind == 'BOOL':
+        return value
+    if kind == 'NULL':
+        return None
+    if kind == 'M':
+        return {k: deserialize_value(v) for k, v in value.items()}
+    if kind == 'L':
+        return [deserialize_value(v) for v in value]
+    if kind == 'SS':
+        return set(value)
+    if kind == 'NS':
+        return {_number(v) for v in value}
+    if kind == 'B':
+        return value if isinstance(value, bytes) else b64decode(value)
+    if kind == 'BS':
+        return {v if isinstance(v, bytes) else b64decode(v) for v in value}
+    raise TypeError(f'Unsupported DynamoDB type: {kind}')
+
+def serialize(item):
+    """
+    Converts a Python dict into a DynamoDB item.
+    """
+    return {key: serialize_value(value) for key, value in item.items()}
+
+def deserialize(item):
+    """
+    Converts a DynamoDB item into a Python dict.
+    """
+    return {key: deserialize_value(value) for key, value in item.items()}
+
+def _backoff(attempt):
+    # Exponential backoff with full jitter
+    time.sleep(random.uniform(0, BASE_BACKOFF_SECONDS * (2 ** attempt)))
+
+def batch_write(items, table_name=TABLE_NAME):
+    """
+    Puts up to BATCH_WRITE_SIZE items with BatchWriteItem, retrying UnprocessedItems with backoff.
+
+    Parameters:
+    items (list): The Python dicts to put into the table.
+    table_name (str): The table to write to.
+
+    Returns:
+    list: The items (as Python dicts) that were still unprocessed after the last retry.
+    """
+    request_items = {table_name: [{'PutRequest': {'Item': serialize(item)}} for item in items]}
+    for attempt in range(MAX_BATCH_RETRIES + 1):
+        response = get_client().batch_write_item(RequestItems=request_items,
+                                                 ReturnConsumedCapacity=return_consumed_capacity())
+        record_consumed_capacity(response)
+        request_items = response.get('UnprocessedItems') or {}
+        if not request_items:
+            return []
+        if attempt < MAX_BATCH_RETRIES:
+            _backoff(attempt)
+    return [deserialize(request['PutRequest']['Item']) for request in request_items.get(table_name, [])]
+
+def batch_get(keys, attributes=None, table_name=TABLE_NAME):
+    """
+    Reads up to BATCH_GET_SIZE items with BatchGetItem, retrying UnprocessedKeys with backoff.
+
+    Parameters:
+    keys (list): The unique keys to read, as Python dicts.
+    attributes (list): Optional attribute names to project. The key attributes should be included
+                       to match the items back to their keys.
+    table_name (str): The table to read from.
+
+    Returns:
+    list: The found items as Python dicts, in no particular order.
+    """
+    keys_and_attributes = {'Keys': [serialize(key) for key in keys]}
+    if attributes:
+        names = {f'#p{i}': name for i, name in enumerate(attributes)}
+        keys_and_attributes['ProjectionExpression'] = ', '.join(names)
+        keys_and_attributes['ExpressionAttributeNames'] = names
+
+    items = []
+    request_items = {table_name: keys_and_attributes}
+    for attempt in range(MAX_BATCH_RETRIES + 1):
+        response = get_client().batch_get_item(RequestItems=request_items,
+                                               ReturnConsumedCapacity=return_consumed_capacity())
+        record_consumed_capacity(response)
+        items.extend(deserialize(item) for item in response.get('Responses', {}).get(table_name, []))
+        request_items = response.get('UnprocessedKeys') or {}
+        if not request_items:
+            return items
+        if attempt < MAX_BATCH_RETRIES:
+            _backoff(attempt)
+    raise RuntimeError('Could not read every item, retry later')
+
+def _update_expression(changes):
+    # Fields set to None are removed, the others are set, and the version of the task is bumped
+    set_actions = []
+    remove_actions = []
+    names = {}
+    values = {':one': 1}
+    for i, (field, value) in enumerate(changes.items()):
+        names[f'#f{i}'] = field
+        if value is None:
+            remove_actions.append(f'#f{i}')
+        else:
+            values[f':v{i}'] = value
+            set_actions.append(f'#f{i}=:v{i}')
+
+    clauses = []
+    if set_actions:
+        clauses.append('SET ' + ', '.join(set_actions))
+    if remove_actions:
+        clauses.append('REMOVE ' + ', '.join(remove_actions))
+    clauses.append('ADD version :one')
+    return ' '.join(clauses), names, values
+
+def _version_condition(expected_version):
+    # The condition makes the existence and version checks part of the write
+    if expected_version is None:
+        return 'attribute_exists(taskId)', {}
+    return 'attribute_exists(taskId) AND version = :expected_version', {':expected_version': expected_version}
+
+class DynamoDBTaskRepository(TaskRepository):
+    """
+    Repository storing the items in the DynamoDB table, with the status index for listing.
+    """
+
+    def __init__(self, table_name=TABLE_NAME, status_index_name=STATUS_INDEX_NAME):
+        self.table_name = table_name
+        self.status_index_name = status_index_name
+
+    def _condition_failed(self, error):
+        # The old item is only returned when the task exists, so the version did not match
+        return VersionConflict() if 'Item' in error.response else TaskNotFound()
+
+    def put(self, item):
+        response = get_client().put_item(TableName=self.table_name, Item=serialize(item),
+                                         ReturnConsumedCapacity=return_consumed_capacity())
+        record_consumed_capacity(response)
+
+    def get(self, task_id):
+        response = get_client().get_item(TableName=self.table_name, Key={'taskId': {'S': task_id}},
+                                         ReturnConsumedCapacity=return_consumed_capacity())
+        record_consumed_capacity(response)
+        return deserialize(response['Item']) if 'Item' in response else None
+
+    def update(self, task_id, changes, expected_version=None):
+        update_expression, names, values = _update_expression(changes)
+        condition_expression, condition_values = _version_condition(expected_version)
+        values.update(condition_values)
+        client = get_client()
+        try:
+            response = client.update_item(
+                TableName=self.table_name,
+                Key={'taskId': {'S': task_id}},
+                UpdateExpression=update_expression,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=serialize(values),
+                ConditionExpression=condition_expression,
+                ReturnValues='UPDATED_NEW',
+                ReturnValuesOnConditionCheckFailure='ALL_OLD',
+                ReturnConsumedCapacity=return_consumed_capacity()
+            )
+        except client.exceptions.ConditionalCheckFailedException as e:
+            raise self._condition_failed(e) from None
+        record_consumed_capacity(response)
+        return deserialize(response['Attributes'])
+
+    def delete(self, task_id, expected_version=None):
+        condition_expression, values = _version_condition(expected_version)
+        delete_kwargs = {
+            'TableName': self.table_name,
+            'Key': {'taskId': {'S': task_id}},
+            'ConditionExpression': condition_expression,
+            'ReturnValuesOnConditionCheckFailure': 'ALL_OLD',
+            'ReturnConsumedCapacity': return_consumed_capacity()
+        }
+        if values:
+            delete_kwargs['ExpressionAttributeValues'] = serialize(values)
+        client = get_client()
+        try:
+            response = client.delete_item(**delete_kwargs)
+        except client.exceptions.ConditionalCheckFailedException as e:
+            raise self._condition_failed(e) from None
+        record_consumed_capacity(response)
+
+    def put_many(self, items):
+        unprocessed = []
+        for start in range(0, len(items), BATCH_WRITE_SIZE):
+            unprocessed.extend(batch_write(items[start:start + BATCH_WRITE_SIZE], self.table_name))
+        return unprocessed
+
+    def get_many(self, task_ids, attributes=None):
+        items = []
+        for start in range(0, len(task_ids), BATCH_GET_SIZE):
+            keys = [{'taskId': task_id} for task_id in task_ids[start:start + BATCH_GET_SIZE]]
+            items.extend(batch_get(keys, attributes, self.table_name))
+        return items
+
+    def list_by_status(self, status, limit, start_key=None):
+        query_kwargs = {
+            'TableName': self.table_name,
+            'IndexName': self.status_index_name,
+            'KeyConditionExpression': '#s = :s',
+            'ExpressionAttributeNames': {'#s': 'status'},
+            'ExpressionAttributeValues': {':s': {'S': status}},
+            'ScanIndexForward': False,
+            'Limit': limit,
+            'ReturnConsumedCapacity': return_consumed_capacity()
+        }
+        if start_key:
+            query_kwargs['ExclusiveStartKey'] = serialize(start_key)
+        response = get_client().query(**query_kwargs)
+        record_consumed_capacity(response)
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        items = [deserialize(item) for item in response.get('Items', [])]
+        return items, deserialize(last_evaluated_key) if last_evaluated_key else None
+
+    def scan(self, segment=0, total_segments=1, limit=None, start_key=None):
+        # DynamoDB splits the table itself, so the segments can be scanned in parallel
+        scan_kwargs = {
+            'TableName': self.table_name,
+            'Segment': segment,
+            'TotalSegments': total_segments,
+            'ReturnConsumedCapacity': return_consumed_capacity()
+        }
+        if limit:
+            scan_kwargs['Limit'] = limit
+        if start_key:
+            scan_kwargs['ExclusiveStartKey'] = serialize(start_key)
+        response = get_client().scan(**scan_kwargs)
+        record_consumed_capacity(response)
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        items = [deserialize(item) for item in response.get('Items', [])]
+        return items, deserialize(last_evaluated_key) if last_evaluated_key else None
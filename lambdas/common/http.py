@@ -0,0 +1,68 @@
+import hashlib
+import os
+import re
+
+VERSION_ETAG = re.compile(r'^(?:W/)?"v(\d+)"$')
+
+# Seconds clients may reuse a task without revalidating it, 0 means they always revalidate with the ETag
+CACHE_CONTROL_MAX_AGE = int(os.environ.get('CACHE_CONTROL_MAX_AGE', '0'))
+
+def get_header(event, name):
+    """
+    Returns a request header from an API Gateway proxy event, ignoring the case of its name.
+    """
+    headers = event.get('headers') or {}
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+def compute_etag(body, version=None):
+    """
+    Returns a strong ETag for a response body.
+    When the item has a stored version the ETag is derived from it, which avoids hashing the body;
+    items written before versioning fall back to a hash of the body.
+    """
+    if version is not None:
+        return f'"v{version}"'
+    return '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+
+def cache_control():
+    """
+    Returns the Cache-Control header value for task responses.
+    """
+    if CACHE_CONTROL_MAX_AGE > 0:
+        return f'private, max-age={CACHE_CONTROL_MAX_AGE}'
+    return 'no-cache'
+
+def etag_matches(header, etag):
+    """
+    Checks an If-None-Match or If-Match header value against an ETag.
+    The header can list several ETags, weak ones included, or be '*'.
+    """
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = (candidate.strip() for candidate in header.split(','))
+    return etag in (candidate[2:] if candidate.startswith('W/') else candidate for candidate in candidates)
+
+def if_match_version(event):
+    """
+    Returns the version a write is conditioned on by the request's If-Match header, so the write only
+    succeeds if the task is still at the version the client read.
+
+    Returns:
+    int: The expected version, or None when any existing version can be written ('*' or no header).
+
+    Raises:
+    ValueError: If the If-Match header is not '*' or an ETag returned by this API.
+    """
+    header = get_header(event, 'If-Match')
+    if not header or header.strip() == '*':
+        return None
+    match = VERSION_ETAG.match(header.strip())
+    if not match:
+        raise ValueError('If-Match must be an ETag returned by this API')
+    return int(match.group(1))
@@ -0,0 +1,187 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+IDEMPOTENCY_TABLE_NAME = os.environ.get('IDEMPOTENCY_TABLE_NAME', 'IdempotencyTable')
+# How long a completed request is replayed to the retries with the same key
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+# How long a request in progress holds its key, after that a retry takes over (e.g. when the first one timed out)
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', '10'))
+MAX_KEY_LENGTH = 255
+
+IN_PROGRESS = 'in_progress'
+COMPLETED = 'completed'
+
+def fingerprint(body):
+    """
+    Returns the hash of a request body, to tell a retry from another request reusing the same key.
+    """
+    return hashlib.sha256((body or '').encode()).hexdigest()
+
+def new_lock_token():
+    """
+    Returns the token of a request holding a key, it tells the request from a retry that took the key over.
+    """
+    return uuid.uuid4().hex
+
+def new_record(key, request_fingerprint, lock_token, now):
+    return {
+        'idempotencyKey': key,
+        'fingerprint': request_fingerprint,
+        'status': IN_PROGRESS,
+        'lockToken': lock_token,
+        'lockExpiresAt': now + IDEMPOTENCY_LOCK_SECONDS,
+        # Epoch seconds, the TTL attribute of the table
+        'expiresAt': now + IDEMPOTENCY_TTL_SECONDS
+    }
+
+def can_take_over(record, now):
+    # Records are only deleted by the TTL some time after they expire, so expired ones are ignored here
+    return record['expiresAt'] < now or (record['status'] == IN_PROGRESS and record['lockExpiresAt'] < now)
+
+def holds_lock(record, lock_token):
+    return record is not None and record['status'] == IN_PROGRESS and record.get('lockToken') == lock_token
+
+class IdempotencyStore:
+    """
+    Records of the requests made with an Idempotency-Key header, so their retries get the same response.
+    """
+
+    def start(self, key, request_fingerprint, lock_token):
+        """
+        Records a request with a key as in progress, holding the key with lock_token (see new_lock_token),
+        unless the key is already used.
+
+        Returns:
+        dict: The record of the earlier request with the key, or None if this request got the key.
+        """
+        raise NotImplementedError
+
+    def complete(self, key, lock_token, response):
+        """
+        Stores the response of the request holding a key, to be replayed to its retries.
+
+        Returns:
+        bool: False if the request no longer holds the key, e.g. a retry took it over once the lock expired,
+              then the response of that retry is kept.
+        """
+        raise NotImplementedError
+
+    def release(self, key, lock_token):
+        """
+        Frees a key whose request failed, so a retry runs again. Does nothing if the request no longer holds it.
+        """
+        raise NotImplementedError
+
+class DynamoDBIdempotencyStore(IdempotencyStore):
+    """
+    Store in the idempotency table, where the conditional put makes concurrent requests with the same key
+    agree on a single one.
+    """
+
+    def __init__(self, table_name=IDEMPOTENCY_TABLE_NAME):
+        self.table_name = table_name
+
+    def start(self, key, request_fingerprint, lock_token):
+        from common.dynamodb import get_client, serialize, deserialize
+        now = int(time.time())
+        client = get_client()
+        try:
+            client.put_item(
+                TableName=self.table_name,
+                Item=serialize(new_record(key, request_fingerprint, lock_token, now)),
+                ConditionExpression=('attribute_not_exists(idempotencyKey) OR expiresAt < :now '
+                                     'OR (#s = :in_progress AND lockExpiresAt < :now)'),
+                ExpressionAttributeNames={'#s': 'status'},
+                ExpressionAttributeValues=serialize({':now': now, ':in_progress': IN_PROGRESS}),
+                ReturnValuesOnConditionCheckFailure='ALL_OLD'
+            )
+        except client.exceptions.ConditionalCheckFailedException as e:
+            return deserialize(e.response['Item'])
+        return None
+
+    def complete(self, key, lock_token, response):
+        from common.dynamodb import get_client
+        client = get_client()
+        try:
+            client.update_item(
+                TableName=self.table_name,
+                Key={'idempotencyKey': {'S': key}},
+                UpdateExpression='SET #s = :completed, #r = :response',
+                ConditionExpression='#s = :in_progress AND lockToken = :token',
+                ExpressionAttributeNames={'#s': 'status', '#r': 'response'},
+                ExpressionAttributeValues={':completed': {'S': COMPLETED}, ':response': {'S': response},
+                                           ':in_progress': {'S': IN_PROGRESS}, ':token': {'S': lock_token}}
+            )
+        except client.exceptions.ConditionalCheckFailedException:
+            return False
+        return True
+
+    def release(self, key, lock_token):
+        from common.dynamodb import get_client
+        client = get_client()
+        try:
+            client.delete_item(
+                TableName=self.table_name,
+                Key={'idempotencyKey': {'S': key}},
+                ConditionExpression='#s = :in_progress AND lockToken = :token',
+                ExpressionAttributeNames={'#s': 'status'},
+                ExpressionAttributeValues={':in_progress': {'S': IN_PROGRESS}, ':token': {'S': lock_token}}
+            )
+        except client.exceptions.ConditionalCheckFailedException:
+            pass
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """
+    Thread-safe store in a dict of this process, used with the in-memory and SQLite task repositories.
+    """
+
+    def __init__(self):
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def start(self, key, request_fingerprint, lock_token):
+        now = int(time.time())
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None and not can_take_over(record, now):
+                return dict(record)
+            self._records[key] = new_record(key, request_fingerprint, lock_token, now)
+            return None
+
+    def complete(self, key, lock_token, response):
+        with self._lock:
+            record = self._records.get(key)
+            if not holds_lock(record, lock_token):
+                return False
+            record.update(status=COMPLETED, response=response)
+            return True
+
+    def release(self, key, lock_token):
+        with self._lock:
+            if holds_lock(self._records.get(key), lock_token):
+                del self._records[key]
+
+_store = None
+
+def get_idempotency_store():
+    """
+    Returns the idempotency store shared by the handlers of the container: the idempotency table with the
+    DynamoDB task repository, a dict of the process with the local ones (see TASK_REPOSITORY).
+    """
+    global _store
+    if _store is None:
+        if os.environ.get('TASK_REPOSITORY', 'dynamodb') == 'dynamodb':
+            _store = DynamoDBIdempotencyStore()
+        else:
+            _store = InMemoryIdempotencyStore()
+    return _store
+
+def set_idempotency_store(store):
+    """
+    Replaces the shared idempotency store. Passing None resets it.
+    """
+    global _store
+    _store = store
@@ -0,0 +1,111 @@
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'ServerlessCrudApi')
+
+# 'emf' prints the metrics of every request in CloudWatch Embedded Metric Format, 'off' disables them
+METRICS_MODE = os.environ.get('METRICS_MODE', 'off')
+
+# Metrics of the request being handled, a context variable so concurrent requests of a local server do not mix
+_current = ContextVar('request_metrics', default=None)
+
+class RequestMetrics:
+    """
+    Phase timings and DynamoDB consumed capacity of one request.
+    """
+
+    def __init__(self, handler_name):
+        self.handler_name = handler_name
+        self.phases = {}
+        self.consumed_capacity = 0.0
+
+    def add_phase(self, name, elapsed_ms):
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed_ms
+
+    def emit(self, latency_ms, status_code, request_id=None):
+        """
+        Prints the metrics in CloudWatch Embedded Metric Format, with the handler as dimension.
+        """
+        metrics = {'LatencyMs': latency_ms, 'ConsumedCapacity': self.consumed_capacity}
+        metrics.update((f'{name.title()}Ms', elapsed_ms) for name, elapsed_ms in self.phases.items())
+        record = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['Handler']],
+                    'Metrics': [{'Name': name, 'Unit': 'Count' if name == 'ConsumedCapacity' else 'Milliseconds'}
+                                for name in metrics]
+                }]
+            },
+            'Handler': self.handler_name,
+            'StatusCode': status_code,
+            'requestId': request_id
+        }
+        record.update((name, round(value, 3)) for name, value in metrics.items())
+        print(json.dumps(record))
+
+def instrument(handler):
+    """
+    Decorates a Lambda handler to time the request and its phases and emit them as EMF.
+    When METRICS_MODE is not 'emf' the handler is returned unchanged, so it costs nothing.
+    """
+    if METRICS_MODE != 'emf':
+        return handler
+    handler_name = handler.__module__.rsplit('.', 1)[-1]
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if _current.get() is not None:
+            # Already recorded by an outer instrumented handler
+            return handler(event, context)
+        metrics = RequestMetrics(handler_name)
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = handler(event, context)
+            return response
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            _current.reset(token)
+            status_code = response.get('statusCode') if isinstance(response, dict) else None
+            metrics.emit(latency_ms, status_code, getattr(context, 'aws_request_id', None))
+    return wrapper
+
+@contextmanager
+def phase(name):
+    """
+    Times a phase of the current request ('parse', 'validate', 'store', 'serialize'...).
+    Outside an instrumented request it does nothing.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_phase(name, (time.perf_counter() - start) * 1000)
+
+def return_consumed_capacity():
+    """
+    Returns the ReturnConsumedCapacity value of DynamoDB calls: 'TOTAL' when the current request records metrics.
+    """
+    return 'TOTAL' if _current.get() is not None else 'NONE'
+
+def record_consumed_capacity(response):
+    """
+    Adds the ConsumedCapacity of a DynamoDB response (a dict, or a list for batch operations) to the current request.
+    """
+    metrics = _current.get()
+    consumed = response.get('ConsumedCapacity')
+    if metrics is None or not consumed:
+        return
+    for capacity in consumed if isinstance(consumed, list) else [consumed]:
+        metrics.consumed_capacity += capacity.get('CapacityUnits', 0.0)
@@ -0,0 +1,267 @@
+import bisect
+import copy
+import os
+import threading
+import uuid
+import zlib
+
+class TaskNotFound(Exception):
+    """
+    Raised when a task does not exist.
+    """
+
+class VersionConflict(Exception):
+    """
+    Raised when a task exists but is not at the version the caller expected.
+    """
+
+class TaskRepository:
+    """
+    Storage of the task items used by the handlers. Items are plain Python dicts keyed by 'taskId',
+    and writes bump their 'version' attribute.
+    """
+
+    def put(self, item):
+        """
+        Stores an item, replacing any item with the same taskId.
+        """
+        raise NotImplementedError
+
+    def get(self, task_id):
+        """
+        Returns the item of a task, or None if it does not exist.
+        """
+        raise NotImplementedError
+
+    def update(self, task_id, changes, expected_version=None):
+        """
+        Sets the fields in changes (a value of None removes the field) and increments the version of an
+        existing task, optionally only if it is still at expected_version.
+
+        Returns:
+        dict: The fields that were set and the new 'version'.
+
+        Raises:
+        TaskNotFound: If the task does not exist.
+        VersionConflict: If the task is not at expected_version.
+        """
+        raise NotImplementedError
+
+    def delete(self, task_id, expected_version=None):
+        """
+        Deletes an existing task, optionally only if it is still at expected_version.
+
+        Raises:
+        TaskNotFound: If the task does not exist.
+        VersionConflict: If the task is not at expected_version.
+        """
+        raise NotImplementedError
+
+    def put_many(self, items):
+        """
+        Stores several items.
+
+        Returns:
+        list: The items that could not be stored.
+        """
+        raise NotImplementedError
+
+    def get_many(self, task_ids, attributes=None):
+        """
+        Returns the items of the tasks that exist among unique task_ids, in no particular order,
+        with only the given attributes when there are some.
+        """
+        raise NotImplementedError
+
+    def list_by_status(self, status, limit, start_key=None):
+        """
+        Returns a page of the tasks with a status, newest first.
+
+        Parameters:
+        status (str): The status of the tasks.
+        limit (int): The maximum number of tasks in the page.
+        start_key (dict): The key returned with the previous page, to resume after it.
+
+        Returns:
+        tuple: The items of the page and the key of its last item ('taskId', 'status' and 'createdAt'),
+               or None when there are no more tasks.
+        """
+        raise NotImplementedError
+
+    def scan(self, segment=0, total_segments=1, limit=None, start_key=None):
+        """
+        Returns a page of the tasks of one segment of the store, in no particular order. The segments split
+        the tasks into total_segments disjoint parts, so each one can be read by its own worker.
+
+        Parameters:
+        segment (int): The segment to read, from 0 to total_segments - 1.
+        total_segments (int): The number of segments.
+        limit (int): The maximum number of tasks in the page, None for no limit.
+        start_key (dict): The key returned with the previous page, to resume after it.
+
+        Returns:
+        tuple: The items of the page and the key to resume after it, or None when the segment has no more tasks.
+        """
+        raise NotImplementedError
+
+def new_task(fields, now, task_id=None):
+    """
+    Builds the item of a new task from the fields of a request, the validation shared by every way of creating tasks.
+
+    Raises:
+    KeyError: If 'title', 'description' or 'status' is missing.
+    TypeError: If the fields are not a JSON object.
+    """
+    return {
+        'taskId': task_id or str(uuid.uuid4()),
+        'title': fields['title'],
+        'description': fields['description'],
+        'status': fields['status'],
+        'createdAt': now,
+        'updatedAt': now,
+        'version': 1
+    }
+
+def check_version(item, expected_version):
+    """
+    Raises TaskNotFound or VersionConflict when a write to the stored item must not happen.
+    """
+    if item is None:
+        raise TaskNotFound()
+    if expected_version is not None and item.get('version') != expected_version:
+        raise VersionConflict()
+
+def apply_changes(item, changes):
+    """
+    Applies the changes of an update to an item in place, and returns the fields that were set and the new version.
+    """
+    attributes = {}
+    for field, value in changes.items():
+        if value is None:
+            item.pop(field, None)
+        else:
+            item[field] = attributes[field] = value
+    item['version'] = attributes['version'] = item.get('version', 0) + 1
+    return attributes
+
+def scan_hash(task_id):
+    # A stable 32-bit hash, unlike hash() which changes with every process
+    return zlib.crc32(task_id.encode())
+
+def scan_key(task_id):
+    # The order of the scans, a page resumes after the key of the last task of the previous one
+    return scan_hash(task_id), task_id
+
+def segment_range(segment, total_segments):
+    """
+    Returns the first scan hash of a segment and the first one after it. The segments split the hashes into
+    contiguous ranges, so a segment is read with a range on the hashes instead of filtering all the tasks.
+    """
+    return -(-(segment << 32) // total_segments), -(-((segment + 1) << 32) // total_segments)
+
+def project(item, attributes):
+    return {name: item[name] for name in attributes if name in item} if attributes else item
+
+def list_key(item):
+    return {'taskId': item['taskId'], 'status': item['status'], 'createdAt': item['createdAt']}
+
+class InMemoryTaskRepository(TaskRepository):
+    """
+    Thread-safe repository keeping the items in a dict of this process, for local tests and profiling
+    the handlers without any store latency.
+    """
+
+    def __init__(self):
+        self._items = {}
+        # The scan keys of the tasks, kept sorted so a scan page starts with a bisection
+        self._scan_keys = []
+        self._lock = threading.Lock()
+
+    def put(self, item):
+        with self._lock:
+            if item['taskId'] not in self._items:
+                bisect.insort(self._scan_keys, scan_key(item['taskId']))
+            self._items[item['taskId']] = copy.deepcopy(item)
+
+    def get(self, task_id):
+        with self._lock:
+            item = self._items.get(task_id)
+            return copy.deepcopy(item) if item is not None else None
+
+    def update(self, task_id, changes, expected_version=None):
+        with self._lock:
+            item = self._items.get(task_id)
+            check_version(item, expected_version)
+            return copy.deepcopy(apply_changes(item, changes))
+
+    def delete(self, task_id, expected_version=None):
+        with self._lock:
+            check_version(self._items.get(task_id), expected_version)
+            del self._items[task_id]
+            del self._scan_keys[bisect.bisect_left(self._scan_keys, scan_key(task_id))]
+
+    def put_many(self, items):
+        for item in items:
+            self.put(item)
+        return []
+
+    def get_many(self, task_ids, attributes=None):
+        with self._lock:
+            found = [self._items[task_id] for task_id in task_ids if task_id in self._items]
+            return [copy.deepcopy(project(item, attributes)) for item in found]
+
+    def list_by_status(self, status, limit, start_key=None):
+        with self._lock:
+            # Same order as the status index, with the taskId breaking ties between equal createdAt
+            matches = sorted((item for item in self._items.values() if item.get('status') == status),
+                             key=lambda item: (item['createdAt'], item['taskId']), reverse=True)
+            if start_key:
+                start = (start_key['createdAt'], start_key['taskId'])
+                matches = [item for item in matches if (item['createdAt'], item['taskId']) < start]
+            page = copy.deepcopy(matches[:limit])
+        return page, list_key(page[-1]) if len(matches) > limit else None
+
+    def scan(self, segment=0, total_segments=1, limit=None, start_key=None):
+        start, end = segment_range(segment, total_segments)
+        with self._lock:
+            if start_key:
+                position = bisect.bisect_right(self._scan_keys, scan_key(start_key['taskId']))
+            else:
+                position = bisect.bisect_left(self._scan_keys, (start,))
+            stop = bisect.bisect_left(self._scan_keys, (end,))
+            if limit is not None and position + limit < stop:
+                keys = self._scan_keys[position:position + limit]
+                last_key = {'taskId': keys[-1][1]}
+            else:
+                keys, last_key = self._scan_keys[position:stop], None
+            return [copy.deepcopy(self._items[task_id]) for _, task_id in keys], last_key
+
+_repository = None
+
+def get_repository():
+    """
+    Returns the task repository shared by every handler in the container, selected with the
+    TASK_REPOSITORY environment variable: 'dynamodb' (the default), 'memory' or 'sqlite'
+    (stored in the SQLITE_PATH file, /tmp/tasks.db by default).
+    """
+    global _repository
+    if _repository is None:
+        kind = os.environ.get('TASK_REPOSITORY', 'dynamodb')
+        if kind == 'dynamodb':
+            from common.dynamodb import DynamoDBTaskRepository
+            _repository = DynamoDBTaskRepository()
+        elif kind == 'memory':
+            _repository = InMemoryTaskRepository()
+        elif kind == 'sqlite':
+            from common.sqlite import SQLiteTaskRepository
+            _repository = SQLiteTaskRepository(os.environ.get('SQLITE_PATH', '/tmp/tasks.db'))
+        else:
+            raise ValueError(f'Unknown TASK_REPOSITORY: {kind}')
+    return _repository
+
+def set_repository(repository):
+    """
+    Replaces the shared task repository. Passing None resets it.
+    """
+    global _repository
+    _repository = repository
@@ -0,0 +1,27 @@
+import os
+
+_client = None
+
+def get_client():
+    """
+    Returns the S3 client shared by the functions of the container, created on first use like the DynamoDB one.
+    """
+    global _client
+    if _client is None:
+        import boto3
+        from botocore.config import Config
+
+        config = Config(
+            connect_timeout=float(os.environ.get('S3_CONNECT_TIMEOUT', '2')),
+            read_timeout=float(os.environ.get('S3_READ_TIMEOUT', '30')),
+            retries={'max_attempts': int(os.environ.get('S3_MAX_ATTEMPTS', '5')), 'mode': 'standard'}
+        )
+        _client = boto3.client('s3', config=config)
+    return _client
+
+def set_client(client):
+    """
+    Replaces the shared S3 client, e.g. with a local stand-in. Passing None resets it.
+    """
+    global _client
+    _client = client
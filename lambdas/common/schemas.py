@@ -0,0 +1,129 @@
+import re
+
+# The JSON Schema (draft 4) of the request bodies. The stack deploys them as API Gateway models, so malformed
+# requests are rejected before a function is invoked, and the handlers check the same schemas with schema_error.
+
+# The format of the taskIds the API generates; API Gateway cannot check path parameters, the handlers do
+TASK_ID_PATTERN = '^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$'
+# Upper bound on tasks per batch create, keeps a single invocation well inside the Lambda timeout
+MAX_BATCH_TASKS = 1000
+# Upper bound on task ids per batch get, keeps the response well under the Lambda payload limit
+MAX_BATCH_TASK_IDS = 500
+
+TITLE = {'type': 'string', 'minLength': 1, 'maxLength': 256}
+DESCRIPTION = {'type': 'string', 'maxLength': 4096}
+STATUS = {'type': 'string', 'minLength': 1, 'maxLength': 64}
+
+# The body of POST /tasks and PUT /tasks/{taskId}
+TASK_SCHEMA = {
+    'title': 'Task',
+    'type': 'object',
+    'properties': {'title': TITLE, 'description': DESCRIPTION, 'status': STATUS},
+    'required': ['title', 'description', 'status'],
+    'additionalProperties': False
+}
+
+# The body of PATCH /tasks/{taskId}: any of the fields, the description can be removed with null
+TASK_PATCH_SCHEMA = {
+    'title': 'TaskPatch',
+    'type': 'object',
+    'properties': {'title': TITLE, 'description': dict(DESCRIPTION, type=['string', 'null']), 'status': STATUS},
+    'minProperties': 1,
+    'additionalProperties': False
+}
+
+# The body of POST /tasks/batch. The tasks themselves are validated one by one, an invalid task is
+# reported in the 207 response instead of failing the whole batch.
+BATCH_CREATE_SCHEMA = {
+    'title': 'TaskBatch',
+    'type': 'array',
+    'minItems': 1,
+    'maxItems': MAX_BATCH_TASKS
+}
+
+# The body of POST /tasks/batchGet
+BATCH_GET_SCHEMA = {
+    'title': 'TaskBatchGet',
+    'type': 'object',
+    'properties': {
+        'taskIds': {
+            'type': 'array',
+            'minItems': 1,
+            'maxItems': MAX_BATCH_TASK_IDS,
+            'items': {'type': 'string', 'pattern': TASK_ID_PATTERN}
+        },
+        'attributes': {'type': 'array', 'items': {'type': 'string', 'minLength': 1}}
+    },
+    'required': ['taskIds']
+}
+
+_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'number': (int, float),
+    'integer': int,
+    'boolean': bool,
+    'null': type(None)
+}
+
+def _is_type(value, name):
+    # bool is an int in Python, not in JSON
+    if name in ('number', 'integer') and isinstance(value, bool):
+        return False
+    return isinstance(value, _TYPES[name])
+
+def schema_error(value, schema, path='Body'):
+    """
+    Checks a parsed request body against one of the schemas of this module. Only the keywords they use are
+    supported: type, properties, required, additionalProperties, minProperties, items, minItems, maxItems,
+    minLength, maxLength and pattern.
+
+    Returns:
+    str: The first error found, or None if the value is valid.
+    """
+    types = schema.get('type')
+    if types is not None:
+        types = [types] if isinstance(types, str) else types
+        if not any(_is_type(value, name) for name in types):
+            return f"{path} must be of type {' or '.join(types)}"
+    if isinstance(value, dict):
+        for name in schema.get('required', []):
+            if name not in value:
+                return f"Missing key: '{name}'"
+        properties = schema.get('properties', {})
+        if schema.get('additionalProperties', True) is False:
+            unknown = sorted(set(value) - set(properties))
+            if unknown:
+                return f"Unknown fields: {', '.join(unknown)}"
+        if len(value) < schema.get('minProperties', 0):
+            return f"{path} must have at least {schema['minProperties']} field(s)"
+        for name, property_schema in properties.items():
+            if name in value:
+                error = schema_error(value[name], property_schema, name)
+                if error:
+                    return error
+    elif isinstance(value, list):
+        if len(value) < schema.get('minItems', 0):
+            return f"{path} must have at least {schema['minItems']} item(s)"
+        if 'maxItems' in schema and len(value) > schema['maxItems']:
+            return f"{path} must have at most {schema['maxItems']} items"
+        if 'items' in schema:
+            for index, item in enumerate(value):
+                error = schema_error(item, schema['items'], f'{path}[{index}]')
+                if error:
+                    return error
+    elif isinstance(value, str):
+        if len(value) < schema.get('minLength', 0):
+            return f"{path} must have at least {schema['minLength']} character(s)"
+        if 'maxLength' in schema and len(value) > schema['maxLength']:
+            return f"{path} must have at most {schema['maxLength']} characters"
+        if 'pattern' in schema and not re.search(schema['pattern'], value):
+            return f"{path} has an invalid format: {value}"
+    return None
+
+def is_task_id(value):
+    """
+    Tells if a path parameter is a taskId, with the same pattern as the taskIds in the batch get schema.
+    """
+    return isinstance(value, str) and re.search(TASK_ID_PATTERN, value) is not None
@@ -0,0 +1,42 @@
+import base64
+import json
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # The common layer bundles it, local runs only have it when it is installed
+    orjson = None
+
+def to_json_value(value):
+    """
+    Converts the values of a task item JSON has no type for: integral Decimals become int and the others float,
+    so a number attribute is a JSON number whatever its value. A float keeps 15 to 17 significant digits of the
+    up to 38 of a DynamoDB number. Sets become sorted lists and binary values base64 strings.
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return [to_json_value(v) if isinstance(v, (bytes, bytearray, Decimal)) else v for v in sorted(value)]
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def _stdlib_dumps(value, sort_keys):
+    # Compact separators and raw UTF-8 like orjson, so the body (and its hashed ETag) is the same with either
+    # encoder. Floats that need an exponent are the exception: the same number, written 1e-07 instead of 1e-7.
+    return json.dumps(value, default=to_json_value, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False)
+
+def dumps(value, sort_keys=False):
+    """
+    Serializes a value, e.g. a task item read from DynamoDB, to a JSON string.
+    Uses orjson when it is installed, which is several times faster on large list and batch responses.
+    The common layer bundles it for the runtime and architecture of every function.
+    """
+    if orjson is None:
+        return _stdlib_dumps(value, sort_keys)
+    try:
+        return orjson.dumps(value, default=to_json_value,
+                            option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode()
+    except orjson.JSONEncodeError:
+        # orjson rejects what the standard library accepts, e.g. integers over 64 bits or non-string keys
+        return _stdlib_dumps(value, sort_keys)
@@ -0,0 +1,128 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from common.repository import (TaskRepository, check_version, apply_changes, project, list_key, scan_hash, scan_key,
+                               segment_range)
+from common.serialization import dumps
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    status TEXT,
+    created_at TEXT,
+    version INTEGER,
+    scan_hash INTEGER,
+    item TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, created_at, task_id);
+CREATE INDEX IF NOT EXISTS tasks_by_scan_hash ON tasks (scan_hash, task_id);
+"""
+
+# Fixed statements with parameters, so every connection prepares each one once and reuses it from its cache
+PUT_TASK = ('INSERT OR REPLACE INTO tasks (task_id, status, created_at, version, scan_hash, item) '
+            'VALUES (?, ?, ?, ?, ?, ?)')
+GET_TASK = 'SELECT item FROM tasks WHERE task_id = ?'
+DELETE_TASK = 'DELETE FROM tasks WHERE task_id = ?'
+LIST_TASKS = ('SELECT item FROM tasks WHERE status = ? '
+              'ORDER BY created_at DESC, task_id DESC LIMIT ?')
+LIST_TASKS_AFTER = ('SELECT item FROM tasks WHERE status = ? AND (created_at, task_id) < (?, ?) '
+                    'ORDER BY created_at DESC, task_id DESC LIMIT ?')
+# A segment is a range of scan hashes, read on the tasks_by_scan_hash index (see segment_range)
+SCAN_TASKS = ('SELECT item FROM tasks WHERE scan_hash >= ? AND scan_hash < ? '
+              'ORDER BY scan_hash, task_id LIMIT ?')
+SCAN_TASKS_AFTER = ('SELECT item FROM tasks WHERE (scan_hash, task_id) > (?, ?) AND scan_hash < ? '
+                    'ORDER BY scan_hash, task_id LIMIT ?')
+
+def _row(item):
+    return (item['taskId'], item.get('status'), item.get('createdAt'), item.get('version'),
+            scan_hash(item['taskId']), dumps(item))
+
+class SQLiteTaskRepository(TaskRepository):
+    """
+    Repository storing the items as JSON in a SQLite database, for high-volume local soak tests.
+    Every thread gets its own connection; the database is in WAL mode so readers do not block the writer.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Autocommit mode, writes that read first open their own transaction
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so the read and the write of an update cannot interleave
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _get(self, connection, task_id):
+        row = connection.execute(GET_TASK, (task_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, item):
+        self._connection().execute(PUT_TASK, _row(item))
+
+    def get(self, task_id):
+        return self._get(self._connection(), task_id)
+
+    def update(self, task_id, changes, expected_version=None):
+        with self._transaction() as connection:
+            item = self._get(connection, task_id)
+            check_version(item, expected_version)
+            attributes = apply_changes(item, changes)
+            connection.execute(PUT_TASK, _row(item))
+        return attributes
+
+    def delete(self, task_id, expected_version=None):
+        with self._transaction() as connection:
+            check_version(self._get(connection, task_id), expected_version)
+            connection.execute(DELETE_TASK, (task_id,))
+
+    def put_many(self, items):
+        # A single transaction, instead of one commit per item
+        with self._transaction() as connection:
+            connection.executemany(PUT_TASK, [_row(item) for item in items])
+        return []
+
+    def get_many(self, task_ids, attributes=None):
+        connection = self._connection()
+        items = (self._get(connection, task_id) for task_id in task_ids)
+        return [project(item, attributes) for item in items if item is not None]
+
+    def list_by_status(self, status, limit, start_key=None):
+        # One more row than the page tells if there is a next page
+        if start_key:
+            parameters = (status, start_key['createdAt'], start_key['taskId'], limit + 1)
+            rows = self._connection().execute(LIST_TASKS_AFTER, parameters).fetchall()
+        else:
+            rows = self._connection().execute(LIST_TASKS, (status, limit + 1)).fetchall()
+        page = [json.loads(row[0]) for row in rows[:limit]]
+        return page, list_key(page[-1]) if len(rows) > limit else None
+
+    def scan(self, segment=0, total_segments=1, limit=None, start_key=None):
+        start, end = segment_range(segment, total_segments)
+        # One more row than the page tells if there is a next page, a negative LIMIT is no limit
+        row_limit = limit + 1 if limit is not None else -1
+        if start_key:
+            parameters = scan_key(start_key['taskId']) + (end, row_limit)
+            rows = self._connection().execute(SCAN_TASKS_AFTER, parameters).fetchall()
+        else:
+            rows = self._connection().execute(SCAN_TASKS, (start, end, row_limit)).fetchall()
+        page = [json.loads(row[0]) for row in rows[:limit]]
+        return page, {'taskId': page[-1]['taskId']} if limit is not None and len(rows) > limit else None
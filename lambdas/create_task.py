@@ -1,10 +1,33 @@
 import json
-import boto3
-import uuid
+from datetime import datetime, timezone
+from common.repository import get_repository, new_task
+from common.http import compute_etag, get_header
+from common.idempotency import MAX_KEY_LENGTH, COMPLETED, fingerprint, get_idempotency_store, new_lock_token
+from common.metrics import instrument, phase
+from common.schemas import TASK_SCHEMA, schema_error
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('TasksTable')
+def replay(record, request_fingerprint):
+    """
+    Returns the response to a request whose Idempotency-Key was already used.
+    """
+    if record['fingerprint'] != request_fingerprint:
+        return {
+            # The key was used for another request body
+            'statusCode': 422,
+            'body': json.dumps({'error': 'Idempotency-Key was already used with a different request'})
+        }
+    if record['status'] != COMPLETED:
+        return {
+            # The first request with the key is still running, the client retries once it is done
+            'statusCode': 409,
+            'headers': {'Retry-After': '1'},
+            'body': json.dumps({'error': 'A request with this Idempotency-Key is in progress'})
+        }
+    response = json.loads(record['response'])
+    response['headers'] = dict(response.get('headers', {}), **{'Idempotent-Replayed': 'true'})
+    return response
 
+@instrument
 def handler(event, context):
     """
     Lambda function handler to create a new task in the DynamoDB table.
@@ -12,31 +35,83 @@ def handler(event, context):
     Parameters:
     event (dict): The event dictionary containing the HTTP request details.
                   Expected to have a 'body' key with a JSON string containing 'title', 'description', and 'status'.
+                  An optional Idempotency-Key header makes retries with the same key and body return the
+                  original response without creating another task.
     context (object): The context in which the Lambda function is called.
 
     Returns:
     dict: A dictionary containing the HTTP response with a status code and a body.
-          - 201: On success, the body contains the 'taskId' of the created task.
-          - 400: If missing key or invalid.
+          - 201: On success, the body contains the 'taskId' of the created task and the ETag header its version.
+          - 201: On a retry with the same Idempotency-Key, the original response with an Idempotent-Replayed header.
+          - 400: If missing key or invalid (see TASK_SCHEMA in common.schemas), or if the Idempotency-Key header is empty or too long.
+          - 409: If a request with the same Idempotency-Key is still in progress.
+          - 422: If the Idempotency-Key was already used with a different body.
           - 500: On general error, the body contains an error message with the exception details.
     """
     try:
         # Parse the request body
-        body = json.loads(event.get('body', '{}'))
-        task_id = str(uuid.uuid4())
-        item = {
-            'taskId': task_id,
-            'title': body['title'],
-            'description': body['description'],
-            'status': body['status']
-        }
-        # Insert the item into the DynamoDB table
-        table.put_item(Item=item)
+        with phase('parse'):
+            body = json.loads(event.get('body', '{}'))
+        with phase('validate'):
+            error = schema_error(body, TASK_SCHEMA)
+        if error:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': error})
+            }
+        item = new_task(body, datetime.now(timezone.utc).isoformat())
+        idempotency_key = get_header(event, 'Idempotency-Key')
+        if idempotency_key is not None:
+            if not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': f'Idempotency-Key must have 1 to {MAX_KEY_LENGTH} characters'})
+                }
+            # Conditional put of the key, only one of the requests with a key gets to create the task
+            request_fingerprint = fingerprint(event.get('body'))
+            lock_token = new_lock_token()
+            try:
+                with phase('idempotency'):
+                    record = get_idempotency_store().start(idempotency_key, request_fingerprint, lock_token)
+            except Exception as e:
+                # Kept apart from the KeyError of a missing field, which is a 400
+                return {
+                    'statusCode': 500,
+                    'body': json.dumps({'error': f'Idempotency store error: {e}'})
+                }
+            if record is not None:
+                return replay(record, request_fingerprint)
+        # Insert the item into the task repository
+        try:
+            with phase('store'):
+                get_repository().put(item)
+        except Exception:
+            if idempotency_key is not None:
+                # Frees the key so a retry creates the task
+                try:
+                    get_idempotency_store().release(idempotency_key, lock_token)
+                except Exception as e:
+                    # The key expires with its lock, the error of the write is the one returned
+                    print(json.dumps({'idempotencyKey': idempotency_key, 'error': f'Release failed: {e}'}))
+            raise
         # Return the task ID in the response and a 201 status code
-        return {
+        response = {
             'statusCode': 201,
-            'body': json.dumps({'taskId': task_id})
+            'headers': {'ETag': compute_etag('', item['version'])},
+            'body': json.dumps({'taskId': item['taskId']})
         }
+        if idempotency_key is not None:
+            # Kept for the retries until the TTL of the key expires. The task is written whatever happens here,
+            # so a failure is only logged: a retry then gets a 409 until the lock expires, or the response of
+            # the retry that took the key over.
+            try:
+                with phase('idempotency'):
+                    stored = get_idempotency_store().complete(idempotency_key, lock_token, json.dumps(response))
+                if not stored:
+                    print(json.dumps({'idempotencyKey': idempotency_key, 'error': 'Key was taken over by a retry'}))
+            except Exception as e:
+                print(json.dumps({'idempotencyKey': idempotency_key, 'error': f'Complete failed: {e}'}))
+        return response
     # Handle missing key errors
     except KeyError as e:
         return {
@@ -1,22 +1,24 @@
 import json
-import boto3
-import uuid
-from botocore.exceptions import ClientError
-
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('TasksTable')
+from common.cache import task_cache
+from common.http import if_match_version
+from common.metrics import instrument, phase
+from common.schemas import is_task_id
+from common.repository import get_repository, TaskNotFound, VersionConflict
 
+@instrument
 def handler(event, context):
     """
     Lambda function to handle the deletion of a task from a DynamoDB table.
     Parameters:
-    event (dict): The event dictionary containing the request data. It must include 'pathParameters' with 'taskId'.
+    event (dict): The event dictionary containing the request data. It must include 'pathParameters' with 'taskId',
+                  and optionally an 'If-Match' header with the ETag of the task to only delete it if it was not modified since.
     context (object): The context in which the Lambda function is called.
     Returns:
     dict: A dictionary containing the HTTP status code and a response body.
         - 400: If 'taskId' is missing or invalid.
         - 204: If the task was successfully deleted.
         - 404: If the task was not found.
+        - 412: If the task was modified since the ETag in If-Match.
         - 500: If an internal server error occurred.
     """
 
@@ -32,45 +34,45 @@ def handler(event, context):
         # If taskId is provided, extract it
         task_id = event['pathParameters']['taskId']
         # Validate taskId format (assuming UUID format)
+        with phase('validate'):
+            if not is_task_id(task_id):
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'Invalid taskId format'})
+                }
+
+        # The existence and version checks are part of the delete
         try:
-            uuid.UUID(task_id)
-        except ValueError:
+            expected_version = if_match_version(event)
+        except ValueError as e:
             return {
-                'statusCode': 400,
-                'body': json.dumps({'error': 'Invalid taskId format'})
+                'statusCode': 412,
+                'body': json.dumps({'error': str(e)})
             }
 
-        # Delete item from DynamoDB
-        response = table.delete_item(
-            Key={'taskId': task_id},
-            ConditionExpression="attribute_exists(taskId)"
-        )
+        # Drop the cached copy of the task served by get_task in this container
+        task_cache.invalidate(task_id)
 
-        # Check if the item was deleted
-        if response.get('ResponseMetadata', {}).get('HTTPStatusCode') == 200:
-            return {
-                # Return a 204 status code if the item was deleted
-                'statusCode': 204,
-                'body': ''
-            }
-        else:
-            return {
-                # Return a 404 status code if the item was not found
-                'statusCode': 404,
-                'body': json.dumps({'error': 'Task not found'})
-            }
+        # Delete the task from the repository
+        with phase('store'):
+            get_repository().delete(task_id, expected_version)
+        return {
+            # Return a 204 status code if the item was deleted
+            'statusCode': 204,
+            'body': ''
+        }
 
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'error': 'Task not found'})
-            }
-        else:
-            return {
-                'statusCode': 500,
-                'body': json.dumps({'error': str(e)})
-            }
+    except TaskNotFound:
+        return {
+            # Return a 404 status code if the item was not found
+            'statusCode': 404,
+            'body': json.dumps({'error': 'Task not found'})
+        }
+    except VersionConflict:
+        return {
+            'statusCode': 412,
+            'body': json.dumps({'error': 'Task was modified, get it again'})
+        }
 
     except Exception as e:
         return {
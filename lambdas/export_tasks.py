@@ -0,0 +1,260 @@
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from common import s3
+from common.repository import get_repository
+from common.serialization import dumps
+
+EXPORT_BUCKET_NAME = os.environ.get('EXPORT_BUCKET_NAME')
+EXPORT_PREFIX = os.environ.get('EXPORT_PREFIX', 'exports/')
+
+# Parallel scan workers, each one reads its own segment of the table and writes its own parts
+DEFAULT_SEGMENTS = 4
+# Items per Scan page, a worker only holds one page at a time
+SCAN_PAGE_SIZE = 1000
+# A part is closed once this many (compressed) bytes are written to it and the worker starts the next one
+MAX_PART_BYTES = 128 * 1024 * 1024
+# S3 multipart uploads need parts of at least 5 MB, except the last one
+UPLOAD_PART_BYTES = 8 * 1024 * 1024
+# Rows per Parquet row group
+PARQUET_ROW_GROUP_SIZE = 10_000
+
+# The attributes every task has, the Parquet columns; any other attribute goes to the JSON 'attributes' column
+TASK_COLUMNS = ('taskId', 'title', 'description', 'status', 'createdAt', 'updatedAt', 'version')
+
+class MultipartUpload:
+    """
+    Writable stream uploading an S3 object with a multipart upload, so it only holds one part in memory.
+    """
+
+    def __init__(self, bucket, key, content_type=None, part_bytes=UPLOAD_PART_BYTES):
+        self.bucket = bucket
+        self.key = key
+        self.part_bytes = part_bytes
+        self._client = s3.get_client()
+        create_kwargs = {'ContentType': content_type} if content_type else {}
+        self._upload_id = self._client.create_multipart_upload(Bucket=bucket, Key=key, **create_kwargs)['UploadId']
+        self._buffer = bytearray()
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        if len(self._buffer) >= self.part_bytes:
+            self._upload_part()
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def _upload_part(self):
+        number = len(self._parts) + 1
+        response = self._client.upload_part(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                                            PartNumber=number, Body=bytes(self._buffer))
+        self._parts.append({'PartNumber': number, 'ETag': response['ETag']})
+        self._buffer.clear()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._buffer or not self._parts:
+            self._upload_part()
+        self._client.complete_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                                               MultipartUpload={'Parts': self._parts})
+
+    def abort(self):
+        self.closed = True
+        self._client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+
+class DirectorySink:
+    """
+    Writes the parts of an export as files of a local directory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def location(self, name):
+        return os.path.join(self.path, name)
+
+    def open(self, name, content_type=None):
+        return open(self.location(name), 'wb')
+
+    def abort(self, stream):
+        stream.close()
+        os.remove(stream.name)
+
+class S3Sink:
+    """
+    Writes the parts of an export as objects under an S3 prefix, with multipart uploads.
+    """
+
+    def __init__(self, bucket, prefix):
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def location(self, name):
+        return f's3://{self.bucket}/{self.prefix}{name}'
+
+    def open(self, name, content_type=None):
+        return MultipartUpload(self.bucket, f'{self.prefix}{name}', content_type)
+
+    def abort(self, stream):
+        stream.abort()
+
+class JsonlWriter:
+    """
+    Writes the tasks as gzip-compressed JSON lines.
+    """
+    extension = '.jsonl.gz'
+    content_type = 'application/gzip'
+
+    def __init__(self, stream):
+        self._gzip = gzip.GzipFile(fileobj=stream, mode='wb')
+
+    def write(self, items):
+        self._gzip.write(''.join(dumps(item) + '\n' for item in items).encode())
+
+    def close(self):
+        # Writes the gzip trailer, the stream itself is closed by the caller
+        self._gzip.close()
+
+class ParquetWriter:
+    """
+    Writes the tasks as Parquet row groups, with a column per task attribute.
+    Needs pyarrow, which is not part of the common layer.
+    """
+    extension = '.parquet'
+    content_type = 'application/vnd.apache.parquet'
+
+    def __init__(self, stream):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError('The parquet format needs pyarrow, install it with: pip install pyarrow') from None
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([(column, pyarrow.int64() if column == 'version' else pyarrow.string())
+                                       for column in TASK_COLUMNS] + [('attributes', pyarrow.string())])
+        self._writer = pyarrow.parquet.ParquetWriter(stream, self._schema, compression='snappy')
+        self._rows = []
+
+    def write(self, items):
+        for item in items:
+            row = {column: item.get(column) for column in TASK_COLUMNS}
+            extra = {name: value for name, value in item.items() if name not in TASK_COLUMNS}
+            row['attributes'] = dumps(extra) if extra else None
+            self._rows.append(row)
+        if len(self._rows) >= PARQUET_ROW_GROUP_SIZE:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        self._writer.write_table(self._pyarrow.Table.from_pylist(self._rows, schema=self._schema))
+        self._rows = []
+
+    def close(self):
+        if self._rows:
+            self._write_row_group()
+        self._writer.close()
+
+WRITERS = {'jsonl': JsonlWriter, 'parquet': ParquetWriter}
+
+def export_segment(repository, sink, writer_class, segment, total_segments, max_part_bytes=MAX_PART_BYTES,
+                   page_size=SCAN_PAGE_SIZE):
+    """
+    Scans one segment of the task repository and writes its tasks to one or more parts.
+
+    Returns:
+    list: The parts written, each one with its 'name', 'location' and number of 'items'.
+    """
+    parts = []
+    stream = writer = None
+    start_key = None
+    try:
+        while True:
+            items, start_key = repository.scan(segment, total_segments, page_size, start_key)
+            if items:
+                if writer is None:
+                    name = f'part-{segment:05d}-{len(parts):05d}{writer_class.extension}'
+                    stream = sink.open(name, writer_class.content_type)
+                    writer = writer_class(stream)
+                    parts.append({'name': name, 'location': sink.location(name), 'items': 0})
+                writer.write(items)
+                parts[-1]['items'] += len(items)
+                if stream.tell() >= max_part_bytes:
+                    writer.close()
+                    stream.close()
+                    stream = writer = None
+            if not start_key:
+                break
+        if writer is not None:
+            writer.close()
+            stream.close()
+    except BaseException:
+        if stream is not None:
+            sink.abort(stream)
+            parts.pop()
+        raise
+    return parts
+
+def export_tasks(sink, file_format='jsonl', segments=DEFAULT_SEGMENTS, repository=None,
+                 max_part_bytes=MAX_PART_BYTES, page_size=SCAN_PAGE_SIZE):
+    """
+    Exports every task with a parallel scan, one worker thread per segment, and writes a manifest.json
+    listing the parts. The memory used does not depend on the size of the table: each worker holds one
+    scan page and the buffer of the part it writes.
+
+    Parameters:
+    sink (DirectorySink or S3Sink): Where the parts are written.
+    file_format (str): 'jsonl' (gzip-compressed JSON lines) or 'parquet'.
+    segments (int): The number of segments scanned in parallel.
+    repository (TaskRepository): The tasks to export, the shared task repository by default.
+
+    Returns:
+    dict: The manifest of the export.
+    """
+    writer_class = WRITERS[file_format]
+    repository = repository or get_repository()
+    started_at = datetime.now(timezone.utc).isoformat()
+    with ThreadPoolExecutor(max_workers=segments, thread_name_prefix='export') as pool:
+        futures = [pool.submit(export_segment, repository, sink, writer_class, segment, segments,
+                               max_part_bytes, page_size)
+                   for segment in range(segments)]
+        parts = [part for future in futures for part in future.result()]
+    manifest = {
+        'format': file_format,
+        'segments': segments,
+        'items': sum(part['items'] for part in parts),
+        'parts': parts,
+        'startedAt': started_at,
+        'completedAt': datetime.now(timezone.utc).isoformat()
+    }
+    stream = sink.open('manifest.json', 'application/json')
+    stream.write(json.dumps(manifest, indent=2).encode())
+    stream.close()
+    return manifest
+
+def handler(event, context):
+    """
+    Lambda function handler exporting the tasks table to the export bucket, under
+    exports/<timestamp>/ unless a 'prefix' is given.
+    Parameters:
+    event (dict): Optional 'format' ('jsonl', the default, or 'parquet'), 'segments' (4 by default) and 'prefix'.
+    context (object): The context in which the Lambda function is called.
+    Returns:
+    dict: The manifest of the export, with the location and number of items of every part.
+    """
+    prefix = event.get('prefix') or f"{EXPORT_PREFIX}{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}/"
+    if not prefix.endswith('/'):
+        prefix += '/'
+    return export_tasks(S3Sink(EXPORT_BUCKET_NAME, prefix), event.get('format', 'jsonl'),
+                        int(event.get('segments', DEFAULT_SEGMENTS)))
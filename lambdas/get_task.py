@@ -1,19 +1,26 @@
 import json
-import boto3
-import uuid
-
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('TasksTable')
+from common.cache import task_cache, emit_cache_metrics
+from common.repository import get_repository
+from common.serialization import dumps
+from common.http import get_header, compute_etag, etag_matches, cache_control
+from common.metrics import instrument, phase
+from common.schemas import is_task_id
 
+@instrument
 def handler(event, context):
     """
     Lambda function handler to retrieve a task by its taskId from a DynamoDB table.
+    Items are kept in the container's task cache when it is enabled (TASK_CACHE_TTL_SECONDS), and
+    clients sending the current ETag in If-None-Match get a 304 without body.
     Parameters:
-    event (dict): The event dictionary containing request data. Expected to have 'pathParameters' with 'taskId'.
+    event (dict): The event dictionary containing request data. Expected to have 'pathParameters' with 'taskId'
+                  and optionally an 'If-None-Match' header.
     context (object): The context in which the Lambda function is called.
     Returns:
     dict: A dictionary containing the HTTP status code and the response body.
-        - 200: Task found, returns the task item.
+        - 200: Task found, returns the task item with its ETag (derived from the 'version' attribute)
+               and Cache-Control headers.
+        - 304: Task not modified since the ETag in If-None-Match.
         - 400: Missing or invalid taskId in path parameters.
         - 404: Task not found.
         - 500: Internal server error.
@@ -30,25 +37,43 @@ def handler(event, context):
         task_id = event['pathParameters']['taskId']
 
         # Validate taskId format (assuming UUID format)
-        try:
-            uuid.UUID(task_id)
-        except ValueError:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'error': 'Invalid taskId format'})
-            }
+        with phase('validate'):
+            if not is_task_id(task_id):
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'Invalid taskId format'})
+                }
+
+        # Read through the cache, it keeps the serialized body and its ETag
+        cached = task_cache.get(task_id) if task_cache.enabled else None
+        if task_cache.enabled:
+            emit_cache_metrics('task', cached is not None)
+        if cached is None:
+            with phase('store'):
+                item = get_repository().get(task_id)
+            if item is None:
+                return {
+                    'statusCode': 404,
+                    'body': json.dumps({'error': 'Task not found'})
+                }
+            with phase('serialize'):
+                body = dumps(item, sort_keys=True)
+                cached = (body, compute_etag(body, item.get('version')))
+            task_cache.put(task_id, cached)
+        body, etag = cached
 
-        response = table.get_item(Key={'taskId': task_id})
-        item = response.get('Item')
-        if not item:
+        # The client already has the current version of the task
+        if etag_matches(get_header(event, 'If-None-Match'), etag):
             return {
-                'statusCode': 404,
-                'body': json.dumps({'error': 'Task not found'})
+                'statusCode': 304,
+                'headers': {'ETag': etag, 'Cache-Control': cache_control()},
+                'body': ''
             }
         return {
             # Return a 200 status code and the task item
             'statusCode': 200,
-            'body': json.dumps(item)
+            'headers': {'ETag': etag, 'Cache-Control': cache_control()},
+            'body': body
         }
 
     except Exception as e:
@@ -0,0 +1,289 @@
+import csv
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import unquote_plus
+from common import s3
+from common.dynamodb import get_client, serialize, deserialize
+from common.repository import get_repository, new_task
+from common.schemas import TASK_SCHEMA, schema_error
+from common.serialization import dumps
+
+IMPORT_JOBS_TABLE_NAME = os.environ.get('IMPORT_JOBS_TABLE_NAME', 'ImportJobsTable')
+IMPORT_QUEUE_URL = os.environ.get('IMPORT_QUEUE_URL')
+IMPORT_ERROR_PREFIX = os.environ.get('IMPORT_ERROR_PREFIX', 'import-errors/')
+
+# File formats by extension of the uploaded object
+FORMATS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv'}
+
+# Valid rows written per put_many call, the DynamoDB repository splits them into BatchWriteItem chunks of 25
+WRITE_BATCH_SIZE = 100
+# Lines between checkpoints of the job; a resumed job rewrites at most this many rows, with the same taskIds
+CHECKPOINT_LINES = 5000
+# Time left in the invocation when the rest of the file is handed over to a new one
+STOP_MARGIN_MS = 60_000
+READ_CHUNK_SIZE = 1024 * 1024
+
+_sqs = None
+
+def iter_lines(chunks, offset=0):
+    """
+    Splits a stream of byte chunks into lines without reading it whole.
+
+    Parameters:
+    chunks (iterable): The bytes of the file, starting at offset.
+    offset (int): The position of the first chunk in the file.
+
+    Returns:
+    generator: (line, end) tuples, the line without its line ending and the offset right after it.
+    """
+    buffer = b''
+    for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b'\n', start)
+            if end < 0:
+                break
+            offset += end + 1 - start
+            yield buffer[start:end].rstrip(b'\r'), offset
+            start = end + 1
+        buffer = buffer[start:]
+    if buffer:
+        yield buffer.rstrip(b'\r'), offset + len(buffer)
+
+def parse_row(text, file_format, header=None):
+    """
+    Returns the fields of a task from a line of a JSONL or CSV file (with the CSV header columns).
+    Quoted CSV values cannot span several lines.
+
+    Raises:
+    ValueError: If the line is not valid JSON or does not have one value per CSV column.
+    """
+    if file_format == 'jsonl':
+        return json.loads(text)
+    values = next(csv.reader([text]))
+    if len(values) != len(header):
+        raise ValueError(f'Expected {len(header)} columns, got {len(values)}')
+    return dict(zip(header, values))
+
+def import_lines(lines, job, repository, checkpoint, should_stop=lambda: False):
+    """
+    Validates the lines of a file like create_task does and writes the valid tasks to the repository.
+    Every task gets a taskId derived from the job and its line number, so importing a line again overwrites it.
+
+    Parameters:
+    lines (iterable): The (line, end) tuples of the rest of the file, as returned by iter_lines.
+    job (dict): The status record of the job. Its 'lines', 'offset', 'imported' and 'failed' counters,
+                and the 'header' of a CSV file, are updated as the lines are imported.
+    repository (TaskRepository): Where the tasks are written.
+    checkpoint (callable): Called with the job and the rows that failed since the previous call, once the
+                           tasks of the lines before job['offset'] are written.
+    should_stop (callable): Tells when to stop before the end of the file, e.g. when the invocation runs out of time.
+
+    Returns:
+    bool: True if the whole file was imported, False if it stopped before.
+    """
+    pending = []
+    errors = []
+    job_uuid = uuid.UUID(job['jobId'])
+    since_checkpoint = 0
+
+    def fail(line_number, error, text):
+        job['failed'] += 1
+        errors.append({'line': line_number, 'error': error, 'row': text})
+
+    def flush():
+        unprocessed = {item['taskId'] for item in repository.put_many([item for _, item, _ in pending])}
+        for line_number, item, text in pending:
+            if item['taskId'] in unprocessed:
+                fail(line_number, 'Task was not written, import it again', text)
+            else:
+                job['imported'] += 1
+        pending.clear()
+
+    def save():
+        nonlocal errors, since_checkpoint
+        flush()
+        checkpoint(job, errors)
+        errors = []
+        since_checkpoint = 0
+
+    for line, end in lines:
+        if should_stop():
+            save()
+            return False
+        job['lines'] += 1
+        since_checkpoint += 1
+        line_number = job['lines']
+        try:
+            # utf-8-sig drops the byte order mark some tools write at the start of the file
+            text = line.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+        except UnicodeDecodeError:
+            fail(line_number, 'Line is not valid UTF-8', line.decode('utf-8', 'replace'))
+            text = None
+        if text is not None and text.strip():
+            if job['format'] == 'csv' and not job.get('header'):
+                job['header'] = next(csv.reader([text]))
+            else:
+                try:
+                    row = parse_row(text, job['format'], job.get('header'))
+                except ValueError as e:
+                    fail(line_number, f'Invalid row: {e}', text)
+                else:
+                    # The rules of POST /tasks, see TASK_SCHEMA
+                    error = schema_error(row, TASK_SCHEMA, 'Row')
+                    if error:
+                        fail(line_number, error, text)
+                    else:
+                        task_id = str(uuid.uuid5(job_uuid, str(line_number)))
+                        pending.append((line_number, new_task(row, job['startedAt'], task_id), text))
+        job['offset'] = end
+        if len(pending) >= WRITE_BATCH_SIZE:
+            flush()
+        if since_checkpoint >= CHECKPOINT_LINES:
+            save()
+    save()
+    return True
+
+def job_id(bucket, key, etag):
+    """
+    Returns the id of the import job of an uploaded object. Redelivered notifications of the same upload
+    get the same job, a new upload of the same key gets a new one.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f's3://{bucket}/{key}?etag={etag}'))
+
+def get_job(job_id):
+    """
+    Returns the status record of an import job, or None if it does not exist.
+    """
+    response = get_client().get_item(TableName=IMPORT_JOBS_TABLE_NAME, Key={'jobId': {'S': job_id}},
+                                     ConsistentRead=True)
+    return deserialize(response['Item']) if 'Item' in response else None
+
+def save_job(job):
+    job['updatedAt'] = datetime.now(timezone.utc).isoformat()
+    get_client().put_item(TableName=IMPORT_JOBS_TABLE_NAME, Item=serialize(job))
+
+def start_job(bucket, key, etag):
+    """
+    Returns the status record of the import of an object, creating it on the first notification.
+    """
+    import_id = job_id(bucket, key, etag)
+    job = get_job(import_id)
+    if job is not None:
+        return job
+    extension = os.path.splitext(key)[1].lower()
+    job = {
+        'jobId': import_id,
+        'bucket': bucket,
+        'key': key,
+        'etag': etag,
+        'format': FORMATS.get(extension),
+        'status': 'running',
+        'lines': 0,
+        'offset': 0,
+        'imported': 0,
+        'failed': 0,
+        'errorPrefix': f'{IMPORT_ERROR_PREFIX}{import_id}/',
+        'startedAt': datetime.now(timezone.utc).isoformat()
+    }
+    if job['format'] is None:
+        job['status'] = 'failed'
+        job['error'] = f"Unsupported file type, expected one of {', '.join(sorted(FORMATS))}"
+    save_job(job)
+    return job
+
+def save_progress(job, errors):
+    """
+    Checkpoints a job: uploads the rows that failed since the previous checkpoint as a JSONL error file,
+    then saves the status record.
+    """
+    if errors:
+        s3.get_client().put_object(
+            Bucket=job['bucket'],
+            Key=f"{job['errorPrefix']}{errors[0]['line']:010d}.jsonl",
+            Body=''.join(dumps(error) + '\n' for error in errors).encode(),
+            ContentType='application/x-ndjson'
+        )
+    save_job(job)
+
+def continue_later(bucket, key, etag):
+    """
+    Queues the rest of an import for a new invocation.
+    """
+    global _sqs
+    if _sqs is None:
+        import boto3
+        _sqs = boto3.client('sqs')
+    message = {'continueImport': {'bucket': bucket, 'key': key, 'etag': etag}}
+    _sqs.send_message(QueueUrl=IMPORT_QUEUE_URL, MessageBody=json.dumps(message))
+
+def run_import(bucket, key, etag, context=None):
+    """
+    Imports an uploaded object, or the rest of it when the job was already started.
+
+    Returns:
+    dict: The status record of the job.
+    """
+    job = start_job(bucket, key, etag)
+    if job['status'] != 'running':
+        return job
+
+    # IfMatch fails the import rather than mixing two uploads of the same key
+    get_kwargs = {'Bucket': bucket, 'Key': key, 'IfMatch': etag} if etag else {'Bucket': bucket, 'Key': key}
+    if job['offset']:
+        get_kwargs['Range'] = f"bytes={job['offset']}-"
+    body = s3.get_client().get_object(**get_kwargs)['Body']
+    remaining_ms = getattr(context, 'get_remaining_time_in_millis', None)
+    should_stop = (lambda: remaining_ms() < STOP_MARGIN_MS) if remaining_ms else (lambda: False)
+    try:
+        done = import_lines(iter_lines(body.iter_chunks(READ_CHUNK_SIZE), job['offset']), job,
+                            get_repository(), save_progress, should_stop)
+    finally:
+        body.close()
+
+    if done:
+        job['status'] = 'completed'
+        job['completedAt'] = datetime.now(timezone.utc).isoformat()
+        save_job(job)
+    else:
+        continue_later(bucket, key, etag)
+    return job
+
+def import_requests(message):
+    """
+    Returns the (bucket, key, etag) of the objects to import from a queue message: an S3 event notification
+    or the continuation of an import.
+    """
+    if 'continueImport' in message:
+        request = message['continueImport']
+        return [(request['bucket'], request['key'], request['etag'])]
+    # The s3:TestEvent sent when the notification is configured has no records
+    return [(record['s3']['bucket']['name'], unquote_plus(record['s3']['object']['key']),
+             record['s3']['object'].get('eTag', ''))
+            for record in message.get('Records', []) if record.get('eventName', '').startswith('ObjectCreated')]
+
+def handler(event, context):
+    """
+    Lambda function handler importing the task files uploaded to the import bucket, from the SQS queue of
+    the bucket notifications. Each file is read line by line, valid rows are written with BatchWriteItem,
+    failed rows go to JSONL error files and the progress is kept in the status record of the job.
+    Parameters:
+    event (dict): The SQS event, each message an S3 event notification or the continuation of an import.
+    context (object): The context in which the Lambda function is called, its remaining time decides when
+                      the rest of a file is handed over to a new invocation.
+    Returns:
+    dict: The 'batchItemFailures' with the messages to retry.
+    """
+    failures = []
+    for record in event.get('Records', []):
+        try:
+            for bucket, key, etag in import_requests(json.loads(record['body'])):
+                job = run_import(bucket, key, etag, context)
+                print(json.dumps({k: job.get(k) for k in ('jobId', 'key', 'status', 'lines', 'imported', 'failed')}))
+        except Exception as e:
+            print(json.dumps({'messageId': record['messageId'], 'error': str(e)}))
+            failures.append({'itemIdentifier': record['messageId']})
+    return {'batchItemFailures': failures}
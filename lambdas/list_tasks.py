@@ -0,0 +1,104 @@
+import base64
+import binascii
+import json
+from common.metrics import instrument, phase
+from common.repository import get_repository
+from common.serialization import dumps
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+def encode_cursor(last_key):
+    """
+    Encodes the key of the last task of a page as an opaque, URL-safe cursor.
+    """
+    return base64.urlsafe_b64encode(json.dumps(last_key).encode()).decode()
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor created by encode_cursor back into the key to resume after.
+    Raises ValueError if the cursor is not valid.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if (not isinstance(key, dict) or set(key) != {'taskId', 'status', 'createdAt'}
+            or not all(isinstance(value, str) for value in key.values())):
+        raise ValueError('Invalid cursor')
+    return key
+
+@instrument
+def handler(event, context):
+    """
+    Lambda function handler to list the tasks with a given status, newest first, one page at a time.
+    The tasks are read from the status global secondary index, so the cost of a request depends on
+    the page size and not on the size of the table.
+    Parameters:
+    event (dict): The event dictionary containing request data. Expected to have 'queryStringParameters' with
+                  'status', and optionally 'limit' (1 to 100, 20 by default) and 'cursor' (the 'nextCursor'
+                  returned by the previous page).
+    context (object): The context in which the Lambda function is called.
+    Returns:
+    dict: A dictionary containing the HTTP status code and the response body.
+        - 200: The body contains the 'tasks' of the page and 'nextCursor' (null on the last page).
+        - 400: Missing status or invalid limit or cursor.
+        - 500: Internal server error.
+    """
+
+    try:
+        params = event.get('queryStringParameters') or {}
+
+        # Check if status is provided
+        status = params.get('status')
+        if not status:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': 'Missing status in query string parameters'})
+            }
+
+        # Validate limit
+        try:
+            limit = int(params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_LIMIT:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': f'limit must be an integer between 1 and {MAX_LIMIT}'})
+            }
+
+        # Validate cursor and resume from it
+        start_key = None
+        if params.get('cursor'):
+            try:
+                start_key = decode_cursor(params['cursor'])
+            except ValueError:
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'Invalid cursor'})
+                }
+            if start_key['status'] != status:
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'Invalid cursor'})
+                }
+
+        with phase('store'):
+            tasks, last_key = get_repository().list_by_status(status, limit, start_key)
+        with phase('serialize'):
+            body = dumps({
+                'tasks': tasks,
+                'nextCursor': encode_cursor(last_key) if last_key else None
+            })
+        return {
+            # Return a 200 status code and the page of tasks
+            'statusCode': 200,
+            'body': body
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
@@ -0,0 +1,100 @@
+import json
+from common.cache import task_cache
+from datetime import datetime, timezone
+from common.http import compute_etag, if_match_version
+from common.metrics import instrument, phase
+from common.repository import get_repository, TaskNotFound, VersionConflict
+from common.schemas import TASK_PATCH_SCHEMA, is_task_id, schema_error
+from common.serialization import dumps
+
+@instrument
+def handler(event, context):
+    """
+    Lambda function to partially update a task in a DynamoDB table.
+    Only the fields present in the body are written, so the cost of the write follows the size of the change.
+    Parameters:
+    event (dict): The event dictionary containing the request data.
+        - pathParameters (dict): Dictionary containing path parameters.
+            - taskId (str): The ID of the task to be updated.
+        - body (str): JSON string containing any of 'title', 'description' and 'status'.
+            A field set to null is removed from the task ('title' and 'status' cannot be removed).
+        - headers (dict): Optionally 'If-Match' with the ETag of the task, to only update it if it was not modified since.
+    context (object): The context in which the function is called.
+    Returns:
+    dict: A dictionary containing the status code and response body.
+        - 200: If the task was successfully updated, the body contains only the changed attributes.
+        - 400: If the body has no fields, unknown fields or removes a required field, or the taskId is invalid.
+        - 404: If the task was not found.
+        - 412: If the task was modified since the ETag in If-Match.
+        - 500: If an internal server error occurred.
+    """
+
+    try:
+        # Check if taskId is provided
+        if 'pathParameters' not in event or 'taskId' not in event['pathParameters']:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': 'Missing taskId in path parameters'})
+            }
+
+        task_id = event['pathParameters']['taskId']
+
+        # Validate taskId format (assuming UUID format)
+        with phase('validate'):
+            if not is_task_id(task_id):
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'Invalid taskId format'})
+                }
+
+        with phase('parse'):
+            body = json.loads(event.get('body') or '{}')
+        # Only known fields, and only the description can be removed, see TASK_PATCH_SCHEMA
+        with phase('validate'):
+            error = schema_error(body, TASK_PATCH_SCHEMA)
+        if error:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': error})
+            }
+
+        # The existence and version checks are part of the update
+        try:
+            expected_version = if_match_version(event)
+        except ValueError as e:
+            return {
+                'statusCode': 412,
+                'body': json.dumps({'error': str(e)})
+            }
+
+        # Update only the fields present in the body, fields set to null are removed
+        changes = dict(body, updatedAt=datetime.now(timezone.utc).isoformat())
+        # Drop the cached copy of the task served by get_task in this container
+        task_cache.invalidate(task_id)
+        with phase('store'):
+            attributes = get_repository().update(task_id, changes, expected_version)
+        return {
+            'statusCode': 200,
+            'headers': {'ETag': compute_etag('', attributes['version'])},
+            'body': dumps(attributes)
+        }
+    except json.JSONDecodeError:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': 'Invalid JSON body'})
+        }
+    except TaskNotFound:
+        return {
+            'statusCode': 404,
+            'body': json.dumps({'error': 'Task not found'})
+        }
+    except VersionConflict:
+        return {
+            'statusCode': 412,
+            'body': json.dumps({'error': 'Task was modified, get it again'})
+        }
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
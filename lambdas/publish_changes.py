@@ -0,0 +1,147 @@
+import json
+import os
+from datetime import datetime, timezone
+from common.dynamodb import deserialize
+from common.serialization import dumps
+
+# Where the change events go: 'eventbridge' (the EVENT_BUS_NAME bus) or 'sns' (the CHANGES_TOPIC_ARN topic)
+CHANGE_EVENTS_TARGET = os.environ.get('CHANGE_EVENTS_TARGET', 'eventbridge')
+EVENT_BUS_NAME = os.environ.get('EVENT_BUS_NAME', 'default')
+CHANGES_TOPIC_ARN = os.environ.get('CHANGES_TOPIC_ARN')
+EVENT_SOURCE = os.environ.get('CHANGE_EVENT_SOURCE', 'serverless-crud-api.tasks')
+
+# Entries per PutEvents and PublishBatch call, the most both APIs accept
+PUBLISH_BATCH_SIZE = 10
+
+EVENT_TYPES = {'INSERT': 'TaskCreated', 'MODIFY': 'TaskUpdated', 'REMOVE': 'TaskDeleted'}
+# Attributes every write changes, left out of changedFields
+BOOKKEEPING_FIELDS = ('updatedAt', 'version')
+
+def change_event(record):
+    """
+    Builds the compact change event of a stream record: what happened to which task, its version and status,
+    and the names of the fields that changed, without the task itself. Consumers that need it read it with
+    get_task, with the version as If-None-Match.
+    """
+    stream_record = record['dynamodb']
+    new_image = deserialize(stream_record.get('NewImage', {}))
+    old_image = deserialize(stream_record.get('OldImage', {}))
+    image = new_image or old_image
+    event = {
+        'eventId': record['eventID'],
+        'type': EVENT_TYPES[record['eventName']],
+        'taskId': image.get('taskId') or deserialize(stream_record['Keys'])['taskId'],
+        'version': image.get('version'),
+        'status': image.get('status'),
+        'occurredAt': datetime.fromtimestamp(stream_record['ApproximateCreationDateTime'], timezone.utc).isoformat()
+    }
+    if record['eventName'] == 'MODIFY':
+        fields = (set(new_image) | set(old_image)) - set(BOOKKEEPING_FIELDS)
+        event['changedFields'] = sorted(field for field in fields if new_image.get(field) != old_image.get(field))
+        if old_image.get('status') != new_image.get('status'):
+            event['previousStatus'] = old_image.get('status')
+    return event
+
+class EventBridgePublisher:
+    """
+    Puts the change events on an EventBridge bus, with the event type as detail-type so rules can match it.
+    """
+
+    def __init__(self, bus_name=EVENT_BUS_NAME, source=EVENT_SOURCE, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client('events')
+        self.bus_name = bus_name
+        self.source = source
+        self._client = client
+
+    def publish(self, events):
+        """
+        Returns:
+        list: The indexes of the events that were not published.
+        """
+        response = self._client.put_events(Entries=[{
+            'EventBusName': self.bus_name,
+            'Source': self.source,
+            'DetailType': event['type'],
+            'Detail': dumps(event)
+        } for event in events])
+        if not response.get('FailedEntryCount'):
+            return []
+        # The entries of the response are in the order of the request, the failed ones have an ErrorCode
+        return [index for index, entry in enumerate(response['Entries']) if entry.get('ErrorCode')]
+
+class SnsPublisher:
+    """
+    Publishes the change events to an SNS topic, with the event type and the status as message attributes
+    so subscriptions can filter on them.
+    """
+
+    def __init__(self, topic_arn=CHANGES_TOPIC_ARN, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client('sns')
+        self.topic_arn = topic_arn
+        self._client = client
+
+    def publish(self, events):
+        """
+        Returns:
+        list: The indexes of the events that were not published.
+        """
+        entries = []
+        for index, event in enumerate(events):
+            attributes = {'type': {'DataType': 'String', 'StringValue': event['type']}}
+            if event['status'] is not None:
+                attributes['status'] = {'DataType': 'String', 'StringValue': str(event['status'])}
+            entries.append({'Id': str(index), 'Message': dumps(event), 'MessageAttributes': attributes})
+        response = self._client.publish_batch(TopicArn=self.topic_arn, PublishBatchRequestEntries=entries)
+        return sorted(int(failure['Id']) for failure in response.get('Failed', []))
+
+PUBLISHERS = {'eventbridge': EventBridgePublisher, 'sns': SnsPublisher}
+
+_publisher = None
+
+def get_publisher():
+    """
+    Returns the publisher of CHANGE_EVENTS_TARGET shared by the invocations of the container.
+    """
+    global _publisher
+    if _publisher is None:
+        _publisher = PUBLISHERS[CHANGE_EVENTS_TARGET]()
+    return _publisher
+
+def publish_records(records, publisher):
+    """
+    Publishes the change events of stream records in order, PUBLISH_BATCH_SIZE at a time.
+
+    Returns:
+    str: The sequence number of the first record that was not published, or None if they all were.
+    """
+    for start in range(0, len(records), PUBLISH_BATCH_SIZE):
+        chunk = records[start:start + PUBLISH_BATCH_SIZE]
+        try:
+            failed = publisher.publish([change_event(record) for record in chunk])
+        except Exception as e:
+            print(json.dumps({'sequenceNumber': chunk[0]['dynamodb']['SequenceNumber'], 'error': str(e)}))
+            failed = [0]
+        if failed:
+            # The records after the first failure are published again with the retry, consumers dedupe on eventId
+            return chunk[failed[0]]['dynamodb']['SequenceNumber']
+    return None
+
+def handler(event, context):
+    """
+    Lambda function handler publishing the changes of the tasks table, from its DynamoDB stream, as compact
+    change events to EventBridge or SNS.
+    Parameters:
+    event (dict): The batch of stream records, in the order of the changes.
+    context (object): The context in which the Lambda function is called.
+    Returns:
+    dict: The 'batchItemFailures' with the first record that was not published, Lambda retries the batch
+          from it (and bisects it when it keeps failing).
+    """
+    failed_sequence_number = publish_records(event.get('Records', []), get_publisher())
+    if failed_sequence_number is None:
+        return {'batchItemFailures': []}
+    return {'batchItemFailures': [{'itemIdentifier': failed_sequence_number}]}
@@ -0,0 +1,47 @@
+import importlib
+import json
+
+# API Gateway resources and the handler module serving each one, as deployed by ServerlessCrudApiStack
+ROUTES = [
+    ('POST', '/tasks', 'create_task'),
+    ('GET', '/tasks', 'list_tasks'),
+    ('POST', '/tasks/batch', 'batch_create_task'),
+    ('POST', '/tasks/batchGet', 'batch_get_task'),
+    ('GET', '/tasks/{taskId}', 'get_task'),
+    ('PUT', '/tasks/{taskId}', 'update_task'),
+    ('PATCH', '/tasks/{taskId}', 'patch_task'),
+    ('DELETE', '/tasks/{taskId}', 'delete_task')
+]
+
+_MODULES = {(method, resource): module for method, resource, module in ROUTES}
+
+def get_route_handler(method, resource):
+    """
+    Returns the handler function of a route, or None if there is no such route.
+    The handler module is only imported the first time its route is called.
+    """
+    module_name = _MODULES.get((method, resource))
+    if module_name is None:
+        return None
+    # The handlers are top-level modules in Lambda and part of the lambdas package locally
+    module = importlib.import_module(f'{__package__}.{module_name}' if __package__ else module_name)
+    return module.handler
+
+def handler(event, context):
+    """
+    Lambda function handler serving every route of the API from a single function ("lambdalith"),
+    so all the routes share the same warm containers.
+    Parameters:
+    event (dict): The API Gateway proxy event, dispatched on its 'httpMethod' and 'resource'.
+    context (object): The context in which the Lambda function is called.
+    Returns:
+    dict: The response of the handler of the route.
+        - 404: If no handler serves the method and resource.
+    """
+    route_handler = get_route_handler(event.get('httpMethod'), event.get('resource'))
+    if route_handler is None:
+        return {
+            'statusCode': 404,
+            'body': json.dumps({'error': 'Route not found'})
+        }
+    return route_handler(event, context)
@@ -1,11 +1,13 @@
 import json
-import boto3
-import uuid
-from botocore.exceptions import ClientError
-
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('TasksTable')
+from common.cache import task_cache
+from datetime import datetime, timezone
+from common.http import compute_etag, if_match_version
+from common.metrics import instrument, phase
+from common.repository import get_repository, TaskNotFound, VersionConflict
+from common.schemas import TASK_SCHEMA, is_task_id, schema_error
+from common.serialization import dumps
 
+@instrument
 def handler(event, context):
     """
     Lambda function to update a task in a DynamoDB table.
@@ -17,12 +19,14 @@ def handler(event, context):
             - title (str): The new title of the task.
             - description (str): The new description of the task.
             - status (str): The new status of the task.
+        - headers (dict): Optionally 'If-Match' with the ETag of the task, to only update it if it was not modified since.
     context (object): The context in which the function is called.
     Returns:
     dict: A dictionary containing the status code and response body.
-        - 200: If the task was successfully updated.
-        - 400: If missing key or invalid.
+        - 200: If the task was successfully updated, with the ETag of the new version.
+        - 400: If missing key or invalid, see TASK_SCHEMA in common.schemas.
         - 404: If the task was not found.
+        - 412: If the task was modified since the ETag in If-Match.
         - 500: If an internal server error occurred.
     """
 
@@ -35,55 +39,62 @@ def handler(event, context):
             }
 
         task_id = event['pathParameters']['taskId']
-        body = json.loads(event['body'])
+        with phase('parse'):
+            body = json.loads(event['body'])
 
         # Validate taskId format (assuming UUID format)
-        try:
-            uuid.UUID(task_id)
-        except ValueError:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'error': 'Invalid taskId format'})
-            }
+        with phase('validate'):
+            if not is_task_id(task_id):
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': 'Invalid taskId format'})
+                }
+            error = schema_error(body, TASK_SCHEMA)
+            if error:
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': error})
+                }
 
-        # Check if the task exists
-        response = table.get_item(Key={'taskId': task_id})
-        if 'Item' not in response:
+        # The existence and version checks are part of the update
+        try:
+            expected_version = if_match_version(event)
+        except ValueError as e:
             return {
-                'statusCode': 404,
-                'body': json.dumps({'error': 'Task not found'})
+                'statusCode': 412,
+                'body': json.dumps({'error': str(e)})
             }
 
-        # Update the task
-        update_expression = "set title=:t, description=:d, #s=:s"
-        expression_attribute_values = {
-            ':t': body['title'],
-            ':d': body['description'],
-            ':s': body['status']
-        }
-        expression_attribute_names = {
-            '#s': 'status'
+        # Update the task and bump its version
+        changes = {
+            'title': body['title'],
+            'description': body['description'],
+            'status': body['status'],
+            'updatedAt': datetime.now(timezone.utc).isoformat()
         }
-        response = table.update_item(
-            Key={'taskId': task_id},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_attribute_values,
-            ExpressionAttributeNames=expression_attribute_names,
-            ReturnValues="UPDATED_NEW"
-        )
+        # Drop the cached copy of the task served by get_task in this container
+        task_cache.invalidate(task_id)
+        with phase('store'):
+            attributes = get_repository().update(task_id, changes, expected_version)
         return {
             'statusCode': 200,
-            'body': json.dumps(response['Attributes'])
+            'headers': {'ETag': compute_etag('', attributes['version'])},
+            'body': dumps(attributes)
         }
     except KeyError as e:
         return {
             'statusCode': 400,
             'body': json.dumps({'error': f'Missing key: {e}'})
         }
-    except ClientError as e:
+    except TaskNotFound:
         return {
-            'statusCode': 500,
-            'body': json.dumps({'error': e.response['Error']['Message']})
+            'statusCode': 404,
+            'body': json.dumps({'error': 'Task not found'})
+        }
+    except VersionConflict:
+        return {
+            'statusCode': 412,
+            'body': json.dumps({'error': 'Task was modified, get it again'})
         }
     except Exception as e:
         return {
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# In Lambda the handlers are top-level modules and the shared ``common`` package comes from a layer.
+# Mirror that layout for the handlers imported locally as ``lambdas.<handler>``: the local tools, the
+# benchmarks and the tests import this package first.
+LAMBDAS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lambdas')
+if LAMBDAS_DIR not in sys.path:
+    sys.path.insert(0, LAMBDAS_DIR)
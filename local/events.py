@@ -0,0 +1,65 @@
+import importlib
+import json
+import re
+import uuid
+from lambdas.router import ROUTES
+
+def _resource_pattern(resource):
+    return re.compile('^' + re.sub(r'\\\{(\w+)\\\}', r'(?P<\1>[^/]+)', re.escape(resource)) + '$')
+
+# Static resources are matched before {taskId}, like in API Gateway
+_RESOURCES = sorted({resource for _, resource, _ in ROUTES}, key=lambda resource: '{' in resource)
+_PATTERNS = [(resource, _resource_pattern(resource)) for resource in _RESOURCES]
+_HANDLERS = {(method, resource): module for method, resource, module in ROUTES}
+
+def match_route(method, path):
+    """
+    Finds the route of a request.
+
+    Returns:
+    tuple: The resource, the handler module name and the path parameters, or None if no route matches.
+    """
+    for resource, pattern in _PATTERNS:
+        match = pattern.match(path)
+        if match:
+            module = _HANDLERS.get((method, resource))
+            return (resource, module, match.groupdict() or None) if module else None
+    return None
+
+def build_event(method, path, resource, path_parameters=None, query=None, headers=None, body=None):
+    """
+    Builds an API Gateway REST proxy integration event.
+    """
+    return {
+        'resource': resource,
+        'path': path,
+        'httpMethod': method,
+        'headers': headers or {},
+        'multiValueHeaders': {k: [v] for k, v in (headers or {}).items()},
+        'queryStringParameters': query or None,
+        'multiValueQueryStringParameters': {k: [v] for k, v in query.items()} if query else None,
+        'pathParameters': path_parameters,
+        'stageVariables': None,
+        'requestContext': {
+            'resourcePath': resource,
+            'httpMethod': method,
+            'path': path,
+            'stage': 'local',
+            'requestId': str(uuid.uuid4())
+        },
+        'body': body,
+        'isBase64Encoded': False
+    }
+
+def invoke(method, path, query=None, headers=None, body=None):
+    """
+    Invokes the handler serving a request in-process and returns its proxy response.
+    Unknown routes get the 403 Missing Authentication Token response of API Gateway.
+    """
+    route = match_route(method, path)
+    if route is None:
+        return {'statusCode': 403, 'body': json.dumps({'message': 'Missing Authentication Token'})}
+    resource, module_name, path_parameters = route
+    module = importlib.import_module(f'lambdas.{module_name}')
+    event = build_event(method, path, resource, path_parameters, query, headers, body)
+    return module.handler(event, None)
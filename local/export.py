@@ -0,0 +1,33 @@
+import argparse
+import json
+import os
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the tasks to compressed JSONL or Parquet parts.")
+    parser.add_argument("output", help="A local directory, or an S3 location as s3://bucket/prefix/")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--segments", type=int, default=4, help="Segments scanned in parallel, one thread each")
+    parser.add_argument("--backend", choices=["dynamodb", "sqlite"], default="dynamodb",
+                        help="The tasks table of the AWS account (or AWS_ENDPOINT_URL_DYNAMODB), "
+                             "or the SQLite task repository (SQLITE_PATH)")
+    args = parser.parse_args()
+
+    os.environ['TASK_REPOSITORY'] = args.backend
+    # Every segment keeps a connection busy
+    os.environ.setdefault('DYNAMODB_MAX_POOL_CONNECTIONS', str(max(10, args.segments)))
+
+    # Imported once the backend is set up
+    from lambdas.export_tasks import DirectorySink, S3Sink, export_tasks
+    if args.output.startswith("s3://"):
+        bucket, _, prefix = args.output[len("s3://"):].partition("/")
+        sink = S3Sink(bucket, prefix if not prefix or prefix.endswith("/") else prefix + "/")
+    else:
+        sink = DirectorySink(args.output)
+
+    manifest = export_tasks(sink, args.format, args.segments)
+    print(json.dumps({k: manifest[k] for k in ("format", "segments", "items")}))
+    for part in manifest["parts"]:
+        print(f"{part['location']}: {part['items']} tasks")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from local.events import invoke
+
+STATUS_INDEX_NAME = 'StatusIndex'
+IMPORT_JOBS_TABLE_NAME = 'ImportJobsTable'
+IDEMPOTENCY_TABLE_NAME = 'IdempotencyTable'
+
+def table_definitions(table_name):
+    """
+    Returns the CreateTable requests of the tables deployed by ServerlessCrudApiStack.
+    """
+    return [{
+        'TableName': table_name,
+        'KeySchema': [{'AttributeName': 'taskId', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [
+            {'AttributeName': 'taskId', 'AttributeType': 'S'},
+            {'AttributeName': 'status', 'AttributeType': 'S'},
+            {'AttributeName': 'createdAt', 'AttributeType': 'S'}
+        ],
+        'GlobalSecondaryIndexes': [{
+            'IndexName': STATUS_INDEX_NAME,
+            'KeySchema': [
+                {'AttributeName': 'status', 'KeyType': 'HASH'},
+                {'AttributeName': 'createdAt', 'KeyType': 'RANGE'}
+            ],
+            'Projection': {'ProjectionType': 'ALL'}
+        }],
+        'BillingMode': 'PAY_PER_REQUEST'
+    }, {
+        'TableName': IMPORT_JOBS_TABLE_NAME,
+        'KeySchema': [{'AttributeName': 'jobId', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [{'AttributeName': 'jobId', 'AttributeType': 'S'}],
+        'BillingMode': 'PAY_PER_REQUEST'
+    }, {
+        'TableName': IDEMPOTENCY_TABLE_NAME,
+        'KeySchema': [{'AttributeName': 'idempotencyKey', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [{'AttributeName': 'idempotencyKey', 'AttributeType': 'S'}],
+        'BillingMode': 'PAY_PER_REQUEST'
+    }]
+
+def create_tables(client, table_name):
+    """
+    Creates the stack's tables that do not exist yet.
+    """
+    existing = set(client.list_tables()['TableNames'])
+    for definition in table_definitions(table_name):
+        if definition['TableName'] not in existing:
+            client.create_table(**definition)
+
+def start_moto():
+    """
+    Replaces DynamoDB with moto's in-memory implementation for this process.
+    moto is a development dependency, see requirements-dev.txt.
+    """
+    try:
+        from moto import mock_aws
+    except ImportError:
+        raise SystemExit('The moto backend needs moto, install it with: pip install -r requirements-dev.txt')
+    # moto never checks credentials, but botocore needs some to sign the requests
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'local')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'local')
+    mock = mock_aws()
+    mock.start()
+    return mock
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length).decode() if length else None
+        try:
+            response = invoke(self.command, url.path, dict(parse_qsl(url.query)) or None, dict(self.headers), body)
+        except Exception as e:
+            # A handler raising is a failed invocation, which API Gateway turns into a 502
+            self.log_error('Handler error: %r', e)
+            response = {'statusCode': 502, 'body': json.dumps({'message': 'Internal server error'})}
+        headers = {'Content-Type': 'application/json', **(response.get('headers') or {})}
+        payload = (response.get('body') or '').encode()
+        self.send_response(response['statusCode'])
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class LocalApi:
+    """
+    Local HTTP server serving the API routes with the Lambda handlers in this process, through
+    API Gateway proxy events. There is no authorizer, stage prefix or API Gateway cache.
+    The handlers use the task repository the process is configured for (TASK_REPOSITORY), and with
+    DynamoDB whatever endpoint it is configured for: moto, or one set with AWS_ENDPOINT_URL_DYNAMODB.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, verbose=False):
+        self._server = ThreadingHTTPServer((host, port), _ApiHandler)
+        self._server.daemon_threads = True
+        self._server.verbose = verbose
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def endpoint_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def serve(self):
+        """
+        Serves requests in the calling thread until interrupted.
+        """
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Tasks API locally with the Lambda handlers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--backend", choices=["moto", "endpoint", "memory", "sqlite"], default="moto",
+                        help="In-memory DynamoDB from moto, the DynamoDB at AWS_ENDPOINT_URL_DYNAMODB, "
+                             "or the in-memory or SQLite task repository (SQLITE_PATH)")
+    parser.add_argument("--max-pool-connections", type=int, default=50,
+                        help="DynamoDB connections shared by the concurrent requests")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    os.environ['DYNAMODB_MAX_POOL_CONNECTIONS'] = str(args.max_pool_connections)
+    if args.backend in ("memory", "sqlite"):
+        # The handlers use the repository without DynamoDB
+        os.environ['TASK_REPOSITORY'] = args.backend
+    elif args.backend == "moto":
+        start_moto()
+    elif not os.environ.get('AWS_ENDPOINT_URL_DYNAMODB'):
+        raise SystemExit('The endpoint backend needs AWS_ENDPOINT_URL_DYNAMODB, e.g. http://localhost:8000')
+
+    # Imported once the backend is set up
+    from common.repository import get_repository
+    if args.backend in ("moto", "endpoint"):
+        from common.dynamodb import TABLE_NAME, get_client
+        create_tables(get_client(), TABLE_NAME)
+    get_repository()
+
+    api = LocalApi(args.host, args.port, args.verbose)
+    print(f"Serving the Tasks API on {api.endpoint_url}/tasks ({args.backend} backend)")
+    try:
+        api.serve()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,164 @@
 from aws_cdk import (
+    BundlingOptions,
+    ILocalBundling,
     Stack,
     aws_dynamodb as dynamodb_,
     aws_lambda as lambda_,
     aws_iam as iam_,
     aws_apigateway as apigw_,
+    aws_applicationautoscaling as appscaling_,
+    aws_xray as xray_,
     aws_s3 as s3,
     aws_s3_deployment as s3_deployment,
+    aws_s3_notifications as s3_notifications,
+    aws_sqs as sqs_,
+    aws_sns as sns_,
+    aws_events as events_,
+    aws_lambda_event_sources as lambda_event_sources,
     aws_iam as iam,
     aws_cognito as cognito_,
     Duration,
     RemovalPolicy,
 )
 from constructs import Construct
+import importlib.util
 import json
+import jsii
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
 
 TABLE_NAME = "TasksTable"
+STATUS_INDEX_NAME = "StatusIndex"
+COMMON_LAYER_PATH = os.path.join("lambdas", "common")
+# Compiled dependencies of the common layer (orjson), installed for the runtime and architecture of the functions
+COMMON_LAYER_REQUIREMENTS = "requirements.txt"
+PIP_PLATFORMS = {"x86_64": "manylinux2014_x86_64", "arm64": "manylinux2014_aarch64"}
+
+# Function per route: construct name, handler module, table access and timeout in seconds (None for the default)
+HANDLER_FUNCTIONS = [
+    ("CreateTask", "create_task", "write", None),
+    ("BatchCreateTask", "batch_create_task", "write", 30),
+    ("GetTask", "get_task", "read", None),
+    ("BatchGetTask", "batch_get_task", "read", 30),
+    ("ListTasks", "list_tasks", "read", None),
+    ("UpdateTask", "update_task", "write", None),
+    ("PatchTask", "patch_task", "write", None),
+    ("DeleteTask", "delete_task", "write", None),
+]
+# The single function serving every route with -c lambdalith=true
+ROUTER_FUNCTION = ("Router", "router", "read_write", 30)
+# The function importing the task files uploaded under IMPORT_PREFIX, with the longest timeout Lambda allows
+IMPORT_FUNCTION = ("ImportTasks", "import_tasks", "write", 900)
+IMPORT_JOBS_TABLE_NAME = "ImportJobsTable"
+# The Idempotency-Key records of create_task
+IDEMPOTENCY_TABLE_NAME = "IdempotencyTable"
+IMPORT_PREFIX = "imports/"
+IMPORT_SUFFIXES = (".jsonl", ".ndjson", ".csv")
+# The function exporting the tasks table to the export bucket, invoked on demand
+EXPORT_FUNCTION = ("ExportTasks", "export_tasks", "read", 900)
+# The function publishing the changes of the tasks table from its stream
+CHANGES_FUNCTION = ("PublishChanges", "publish_changes", "stream", 60)
+# Target and stream batching of the change events, overridden with -c changeEvents='{"target": "sns", "batchSize": 500}'
+DEFAULT_CHANGE_EVENTS_SETTINGS = {"target": "eventbridge", "batchSize": 100, "maxBatchingWindowSeconds": 1,
+                                  "parallelizationFactor": 1, "retryAttempts": 10, "maxRecordAgeHours": 24}
+CHANGE_EVENTS_TARGETS = ("eventbridge", "sns")
+
+# Settings of every function, unless the functionSettings context overrides them
+DEFAULT_FUNCTION_SETTINGS = {"memorySize": 128, "architecture": "x86_64", "runtime": "python3.9", "timeout": 3,
+                             "tracing": "adot"}
+ARCHITECTURES = {"x86_64": lambda_.Architecture.X86_64, "arm64": lambda_.Architecture.ARM_64}
+# "adot": OpenTelemetry auto-instrumentation layer, "xray": Lambda active tracing without any layer, "off": no tracing
+TRACING_MODES = ("adot", "xray", "off")
+
+
+def resolve_function_settings(function_settings, name, timeout=None):
+    """
+    Returns the settings of a function: DEFAULT_FUNCTION_SETTINGS, its own timeout, and then the "defaults"
+    and "<name>" entries of the functionSettings context, each one overriding the previous ones.
+    """
+    settings = dict(DEFAULT_FUNCTION_SETTINGS)
+    if timeout:
+        settings["timeout"] = timeout
+    settings.update(function_settings.get("defaults", {}))
+    settings.update(function_settings.get(name, {}))
+    unknown_settings = set(settings) - set(DEFAULT_FUNCTION_SETTINGS)
+    if unknown_settings:
+        raise ValueError(f"Unknown settings for {name}: {', '.join(sorted(unknown_settings))}")
+    if settings["architecture"] not in ARCHITECTURES:
+        raise ValueError(f"Architecture of {name} must be one of {', '.join(ARCHITECTURES)}")
+    if not str(settings["runtime"]).startswith("python3."):
+        raise ValueError(f"Runtime of {name} must be a Python 3 runtime, e.g. python3.12")
+    if not 128 <= int(settings["memorySize"]) <= 10240:
+        raise ValueError(f"Memory size of {name} must be between 128 and 10240 MB")
+    if settings["tracing"] not in TRACING_MODES:
+        raise ValueError(f"Tracing of {name} must be one of {', '.join(TRACING_MODES)}")
+    return settings
+
+
+def load_layer_module(name):
+    """
+    Loads a module of the common layer from its file, without importing the handlers' package.
+    The request models are built from the same schemas the handlers validate with.
+    """
+    spec = importlib.util.spec_from_file_location(f"common_layer.{name}", os.path.join(COMMON_LAYER_PATH, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def model_schema(schema):
+    """
+    Returns the API Gateway model schema of one of the JSON Schemas of common.schemas, the ones the handlers check.
+    """
+    properties = {}
+    for keyword, value in schema.items():
+        if keyword == "type":
+            value = ([apigw_.JsonSchemaType[name.upper()] for name in value] if isinstance(value, list)
+                     else apigw_.JsonSchemaType[value.upper()])
+        elif keyword == "properties":
+            value = {name: model_schema(property_schema) for name, property_schema in value.items()}
+        elif keyword == "items":
+            value = model_schema(value)
+        # minLength -> min_length
+        properties[re.sub(r"(?<!^)(?=[A-Z])", "_", keyword).lower()] = value
+    return apigw_.JsonSchema(**properties)
+
+
+def pip_install_arguments(runtime, architecture, requirements, target):
+    """
+    Returns the arguments of the pip install of the layer requirements: the wheels of the runtime and architecture
+    of the functions, whatever the machine building the layer.
+    """
+    return ["install", "--quiet", "--requirement", requirements, "--target", target,
+            "--platform", PIP_PLATFORMS[architecture], "--implementation", "cp",
+            "--python-version", runtime[len("python"):], "--only-binary=:all:"]
+
+
+@jsii.implements(ILocalBundling)
+class CommonLayerBundling:
+    """
+    Builds the common layer without Docker, with the requirements installed to python/ and the shared package
+    copied to python/common, the directory Lambda adds to sys.path for Python layers.
+    """
+    def __init__(self, runtime, architecture):
+        self.runtime = runtime
+        self.architecture = architecture
+
+    def try_bundle(self, output_dir, *, image, **kwargs):
+        target = os.path.join(output_dir, "python")
+        requirements = os.path.join(COMMON_LAYER_PATH, COMMON_LAYER_REQUIREMENTS)
+        command = [sys.executable, "-m", "pip"] + pip_install_arguments(self.runtime, self.architecture, requirements, target)
+        if subprocess.run(command).returncode != 0:
+            # Build it with Docker instead
+            return False
+        shutil.copytree(COMMON_LAYER_PATH, os.path.join(target, "common"),
+                        ignore=shutil.ignore_patterns("__pycache__", "*.pyc", COMMON_LAYER_REQUIREMENTS))
+        return True
+
 
 class ServerlessCrudApiStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
@@ -28,6 +172,30 @@ class ServerlessCrudApiStack(Stack):
             partition_key=dynamodb_.Attribute(
                 name="taskId", type=dynamodb_.AttributeType.STRING),
             billing_mode=dynamodb_.BillingMode.PAY_PER_REQUEST,
+            # Every change, with the task before and after it, for the change events
+            stream=dynamodb_.StreamViewType.NEW_AND_OLD_IMAGES,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        # Index used to list the tasks by status, newest first, without scanning the table
+        tasks_table.add_global_secondary_index(
+            index_name=STATUS_INDEX_NAME,
+            partition_key=dynamodb_.Attribute(
+                name="status", type=dynamodb_.AttributeType.STRING),
+            sort_key=dynamodb_.Attribute(
+                name="createdAt", type=dynamodb_.AttributeType.STRING),
+            projection_type=dynamodb_.ProjectionType.ALL
+        )
+
+        # Idempotency-Key records of create_task, deleted by DynamoDB once their expiresAt (epoch seconds) has passed
+        idempotency_table = dynamodb_.Table(
+            self,
+            "IdempotencyTable",
+            table_name=IDEMPOTENCY_TABLE_NAME,
+            partition_key=dynamodb_.Attribute(
+                name="idempotencyKey", type=dynamodb_.AttributeType.STRING),
+            time_to_live_attribute="expiresAt",
+            billing_mode=dynamodb_.BillingMode.PAY_PER_REQUEST,
             removal_policy=RemovalPolicy.DESTROY
         )
 
@@ -41,97 +209,183 @@ class ServerlessCrudApiStack(Stack):
             ]
         )
 
-        # Create Task Lambda Function
-        create_task_lambda = lambda_.Function(
-            self, "CreateTaskFunction",
-            runtime=lambda_.Runtime.PYTHON_3_9,
-            handler="create_task.handler",
-            code=lambda_.Code.from_asset("lambdas"),
-            role=lambda_role,
-            adot_instrumentation=lambda_.AdotInstrumentationConfig(
-                layer_version=lambda_.AdotLayerVersion.from_python_sdk_layer_version(lambda_.AdotLambdaLayerPythonSdkVersion.LATEST),
-                exec_wrapper=lambda_.AdotLambdaExecWrapper.INSTRUMENT_HANDLER
-            )
-        )
-        tasks_table.grant_write_data(create_task_lambda)
+        # A single router function serving every route with -c lambdalith=true, otherwise one function per route
+        lambdalith = str(self.node.try_get_context("lambdalith")).lower() == "true"
+        deployed_functions = [ROUTER_FUNCTION] if lambdalith else HANDLER_FUNCTIONS
+        function_names = {name for name, *_ in HANDLER_FUNCTIONS + [ROUTER_FUNCTION, IMPORT_FUNCTION, EXPORT_FUNCTION,
+                                                            CHANGES_FUNCTION]}
 
-        create_task_lambda_version = create_task_lambda.current_version
+        # Provisioned concurrency of the aliases by function name, e.g. -c provisionedConcurrency='{"GetTask": {"min": 2}}'
+        provisioned_concurrency = self.get_json_context("provisionedConcurrency")
+        unknown_functions = set(provisioned_concurrency) - function_names
+        if unknown_functions:
+            raise ValueError(f"Unknown functions in provisionedConcurrency: {', '.join(sorted(unknown_functions))}")
 
-        # Create Task Lambda Function Alias
-        create_task_lambda_alias = lambda_.Alias(
-            self, "CreateTaskFunctionAlias",
-            alias_name="CreateTaskFunctionProd",
-            version=create_task_lambda_version
-        )
+        # Memory size, architecture, runtime, timeout and tracing by function name, e.g. {"GetTask": {"memorySize": 512}}
+        function_settings = self.get_json_context("functionSettings")
+        unknown_functions = set(function_settings) - function_names - {"defaults"}
+        if unknown_functions:
+            raise ValueError(f"Unknown functions in functionSettings: {', '.join(sorted(unknown_functions))}")
+        settings = {name: resolve_function_settings(function_settings, name, timeout)
+                    for name, _, _, timeout in deployed_functions + [IMPORT_FUNCTION, EXPORT_FUNCTION, CHANGES_FUNCTION]}
 
-        # Get Task Lambda Function
-        get_task_lambda = lambda_.Function(
-            self, "GetTaskFunction",
-            runtime=lambda_.Runtime.PYTHON_3_9,
-            handler="get_task.handler",
-            code=lambda_.Code.from_asset("lambdas"),
-            role=lambda_role,
-            adot_instrumentation=lambda_.AdotInstrumentationConfig(
-                layer_version=lambda_.AdotLayerVersion.from_python_sdk_layer_version(lambda_.AdotLambdaLayerPythonSdkVersion.LATEST),
-                exec_wrapper=lambda_.AdotLambdaExecWrapper.INSTRUMENT_HANDLER
+        # Shared DynamoDB client and helpers, deployed once as a layer instead of in every handler. orjson is compiled,
+        # so there is a layer per runtime and architecture the functions use, e.g. "CommonLayerPython312Arm64"
+        common_layers = {}
+        for runtime, architecture in sorted({(s["runtime"], s["architecture"]) for s in settings.values()}):
+            default = (DEFAULT_FUNCTION_SETTINGS["runtime"], DEFAULT_FUNCTION_SETTINGS["architecture"])
+            suffix = "" if (runtime, architecture) == default else (
+                runtime.title().replace(".", "") + architecture.title().replace("_", ""))
+            pip_install = shlex.join(["pip"] + pip_install_arguments(
+                runtime, architecture, f"/asset-input/{COMMON_LAYER_REQUIREMENTS}", "/asset-output/python"))
+            common_layers[runtime, architecture] = lambda_.LayerVersion(
+                self, f"CommonLayer{suffix}",
+                code=lambda_.Code.from_asset(COMMON_LAYER_PATH,
+                    bundling=BundlingOptions(
+                        image=lambda_.Runtime(runtime, lambda_.RuntimeFamily.PYTHON).bundling_image,
+                        command=["bash", "-c", f"{pip_install} && cp -r /asset-input /asset-output/python/common "
+                                               f"&& rm /asset-output/python/common/{COMMON_LAYER_REQUIREMENTS}"],
+                        local=CommonLayerBundling(runtime, architecture)
+                    )
+                ),
+                compatible_runtimes=[lambda_.Runtime(runtime, lambda_.RuntimeFamily.PYTHON)],
+                compatible_architectures=[ARCHITECTURES[architecture]],
+                description=f"Shared DynamoDB client, helpers and orjson for the task handlers ({runtime}, {architecture})"
             )
-        )
-        tasks_table.grant_read_data(get_task_lambda)
 
-        get_task_lambda_version = get_task_lambda.current_version
+        # The handlers, without the common package that comes from the layer
+        handlers_code = lambda_.Code.from_asset("lambdas", exclude=["common", "__init__.py", "**/__pycache__"])
+        # API Gateway response cache for GET /tasks/{taskId}, disabled unless a TTL is given with -c apiCacheTtlSeconds=<n>
+        api_cache_ttl_seconds = int(self.node.try_get_context("apiCacheTtlSeconds") or 0)
+        api_cache_size = str(self.node.try_get_context("apiCacheSize") or "0.5")
 
-        # Get Task Lambda Function Alias
-        get_task_lambda_alias = lambda_.Alias(
-            self, "GetTaskFunctionAlias",
-            alias_name="GetTaskFunctionProd",
-            version=get_task_lambda_version
-        )
+        handlers_environment = {
+            "TABLE_NAME": tasks_table.table_name,
+            # Clients may reuse a task as long as the API cache may serve it
+            "CACHE_CONTROL_MAX_AGE": str(api_cache_ttl_seconds),
+            # In-container cache of task items for get_task, disabled unless a TTL is given with -c taskCacheTtlSeconds=<n>
+            "TASK_CACHE_TTL_SECONDS": str(self.node.try_get_context("taskCacheTtlSeconds") or 0),
+            "TASK_CACHE_SIZE": str(self.node.try_get_context("taskCacheSize") or 1000),
+            # Per-request latency, phase timings and consumed capacity as EMF logs, disabled with -c requestMetrics=off
+            "METRICS_MODE": str(self.node.try_get_context("requestMetrics") or "emf"),
+            "IDEMPOTENCY_TABLE_NAME": idempotency_table.table_name,
+            # How long a retry with the same Idempotency-Key gets the original response, -c idempotencyTtlSeconds=<n>
+            "IDEMPOTENCY_TTL_SECONDS": str(self.node.try_get_context("idempotencyTtlSeconds") or 86400)
+        }
 
-        # Update Lambda Function
-        update_task_lambda = lambda_.Function(
-            self, "UpdateTaskFunction",
-            runtime=lambda_.Runtime.PYTHON_3_9,
-            handler="update_task.handler",
-            code=lambda_.Code.from_asset("lambdas"),
-            role=lambda_role,
-            adot_instrumentation=lambda_.AdotInstrumentationConfig(
-                layer_version=lambda_.AdotLayerVersion.from_python_sdk_layer_version(lambda_.AdotLambdaLayerPythonSdkVersion.LATEST),
-                exec_wrapper=lambda_.AdotLambdaExecWrapper.INSTRUMENT_HANDLER
-            )
-        )
-        tasks_table.grant_write_data(update_task_lambda)
-
-        update_task_lambda_version = update_task_lambda.current_version
+        # The API invokes the prod aliases, so it gets their provisioned concurrency
+        aliases = {}
+        for name, module, access, _ in deployed_functions:
+            function, alias = self.add_handler_function(
+                name, f"{module}.handler", handlers_code, common_layers, handlers_environment, lambda_role,
+                settings[name], provisioned_concurrency.get(name))
+            if access == "read":
+                tasks_table.grant_read_data(function)
+            elif access == "write":
+                tasks_table.grant_write_data(function)
+            else:
+                tasks_table.grant_read_write_data(function)
+            if module in ("create_task", "router"):
+                idempotency_table.grant_read_write_data(function)
+            if lambdalith:
+                aliases.update((route[1], alias) for route in HANDLER_FUNCTIONS)
+            else:
+                aliases[module] = alias
 
-        # Update Task Lambda Function Alias
-        update_task_lambda_alias = lambda_.Alias(
-            self, "UpdateTaskFunctionAlias",
-            alias_name="UpdateTaskFunctionProd",
-            version=update_task_lambda_version
+        # Bulk import: the notifications of the files uploaded under imports/ are queued for the ImportTasks function,
+        # which keeps the progress of every file in the import jobs table and writes the failed rows next to the files
+        import_jobs_table = dynamodb_.Table(
+            self,
+            "ImportJobsTable",
+            table_name=IMPORT_JOBS_TABLE_NAME,
+            partition_key=dynamodb_.Attribute(
+                name="jobId", type=dynamodb_.AttributeType.STRING),
+            billing_mode=dynamodb_.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY
         )
-
-        # Delete Lambda Function
-        delete_task_lambda = lambda_.Function(
-            self, "DeleteTaskFunction",
-            runtime=lambda_.Runtime.PYTHON_3_9,
-            handler="delete_task.handler",
-            code=lambda_.Code.from_asset("lambdas"),
-            role=lambda_role,
-            adot_instrumentation=lambda_.AdotInstrumentationConfig(
-                layer_version=lambda_.AdotLayerVersion.from_python_sdk_layer_version(lambda_.AdotLambdaLayerPythonSdkVersion.LATEST),
-                exec_wrapper=lambda_.AdotLambdaExecWrapper.INSTRUMENT_HANDLER
+        import_bucket = s3.Bucket(self, "ImportBucket", removal_policy=RemovalPolicy.DESTROY)
+        import_name, import_module, _, _ = IMPORT_FUNCTION
+        import_queue = sqs_.Queue(
+            self, "ImportQueue",
+            # Six times the function timeout, as Lambda recommends for SQS event sources
+            visibility_timeout=Duration.seconds(6 * int(settings[import_name]["timeout"])),
+            dead_letter_queue=sqs_.DeadLetterQueue(
+                max_receive_count=3,
+                queue=sqs_.Queue(self, "ImportDeadLetterQueue", retention_period=Duration.days(14))
             )
         )
-        tasks_table.grant_write_data(delete_task_lambda)
+        for suffix in IMPORT_SUFFIXES:
+            import_bucket.add_event_notification(
+                s3.EventType.OBJECT_CREATED,
+                s3_notifications.SqsDestination(import_queue),
+                s3.NotificationKeyFilter(prefix=IMPORT_PREFIX, suffix=suffix)
+            )
+        import_environment = dict(handlers_environment,
+                                  IMPORT_JOBS_TABLE_NAME=import_jobs_table.table_name,
+                                  IMPORT_QUEUE_URL=import_queue.queue_url)
+        import_function, import_alias = self.add_handler_function(
+            import_name, f"{import_module}.handler", handlers_code, common_layers, import_environment, lambda_role,
+            settings[import_name])
+        tasks_table.grant_write_data(import_function)
+        import_jobs_table.grant_read_write_data(import_function)
+        import_bucket.grant_read_write(import_function)
+        # The function queues the rest of a file for a new invocation when it runs out of time
+        import_queue.grant_send_messages(import_function)
+        # One file per invocation, a failed one is retried alone
+        import_alias.add_event_source(lambda_event_sources.SqsEventSource(
+            import_queue, batch_size=1, report_batch_item_failures=True))
 
-        delete_task_lambda_version = delete_task_lambda.current_version
+        # Export: a parallel scan of the tasks table written as compressed JSONL or Parquet parts to the export bucket
+        export_bucket = s3.Bucket(self, "ExportBucket", removal_policy=RemovalPolicy.DESTROY)
+        export_name, export_module, _, _ = EXPORT_FUNCTION
+        export_environment = dict(handlers_environment,
+                                  EXPORT_BUCKET_NAME=export_bucket.bucket_name,
+                                  # One connection per scanned segment
+                                  DYNAMODB_MAX_POOL_CONNECTIONS="32")
+        export_function, _ = self.add_handler_function(
+            export_name, f"{export_module}.handler", handlers_code, common_layers, export_environment, lambda_role,
+            settings[export_name])
+        tasks_table.grant_read_data(export_function)
+        export_bucket.grant_write(export_function)
 
-        # Update Task Lambda Function Alias
-        delete_task_lambda_alias = lambda_.Alias(
-            self, "DeleteTaskFunctionAlias",
-            alias_name="DeleteTaskFunctionProd",
-            version=update_task_lambda_version
-        )
+        # Change events: the stream of the tasks table is read in batches by the PublishChanges function, which publishes
+        # a compact event per change to an EventBridge bus or an SNS topic, so consumers do not poll the API
+        change_events = dict(DEFAULT_CHANGE_EVENTS_SETTINGS, **self.get_json_context("changeEvents"))
+        unknown_settings = set(change_events) - set(DEFAULT_CHANGE_EVENTS_SETTINGS)
+        if unknown_settings:
+            raise ValueError(f"Unknown settings in changeEvents: {', '.join(sorted(unknown_settings))}")
+        if change_events["target"] not in CHANGE_EVENTS_TARGETS:
+            raise ValueError(f"Target of changeEvents must be one of {', '.join(CHANGE_EVENTS_TARGETS)}")
+        changes_name, changes_module, _, _ = CHANGES_FUNCTION
+        if change_events["target"] == "sns":
+            changes_topic = sns_.Topic(self, "TaskChangesTopic")
+            changes_environment = dict(handlers_environment, CHANGE_EVENTS_TARGET="sns",
+                                       CHANGES_TOPIC_ARN=changes_topic.topic_arn)
+        else:
+            event_bus = events_.EventBus(self, "TaskEventBus")
+            changes_environment = dict(handlers_environment, CHANGE_EVENTS_TARGET="eventbridge",
+                                       EVENT_BUS_NAME=event_bus.event_bus_name)
+        changes_function, changes_alias = self.add_handler_function(
+            changes_name, f"{changes_module}.handler", handlers_code, common_layers, changes_environment, lambda_role,
+            settings[changes_name])
+        if change_events["target"] == "sns":
+            changes_topic.grant_publish(changes_function)
+        else:
+            event_bus.grant_put_events_to(changes_function)
+        # A failing batch is split in two until the failing record is alone, which ends up here after the retries
+        changes_dead_letter_queue = sqs_.Queue(self, "TaskChangesDeadLetterQueue", retention_period=Duration.days(14))
+        changes_alias.add_event_source(lambda_event_sources.DynamoEventSource(
+            tasks_table,
+            starting_position=lambda_.StartingPosition.LATEST,
+            batch_size=int(change_events["batchSize"]),
+            max_batching_window=Duration.seconds(int(change_events["maxBatchingWindowSeconds"])),
+            parallelization_factor=int(change_events["parallelizationFactor"]),
+            bisect_batch_on_error=True,
+            report_batch_item_failures=True,
+            retry_attempts=int(change_events["retryAttempts"]),
+            max_record_age=Duration.hours(int(change_events["maxRecordAgeHours"])),
+            on_failure=lambda_event_sources.SqsDlq(changes_dead_letter_queue)
+        ))
 
         # Create the S3 bucket for the static web page
         bucket = s3.Bucket(self, 'StaticWebsiteBucket',
@@ -165,49 +419,156 @@ class ServerlessCrudApiStack(Stack):
         )
 
         # Create API Gateway
+        tracing_enabled = any(s["tracing"] != "off" for s in settings.values())
         api = apigw_.RestApi(self, "TasksApi",
             rest_api_name="Tasks Service",
             description="This service serves tasks.",
-            deploy_options=apigw_.StageOptions(tracing_enabled=True)
+            deploy_options=apigw_.StageOptions(
+                # The API makes the sampling decision, the traced functions follow it
+                tracing_enabled=tracing_enabled,
+                cache_cluster_enabled=api_cache_ttl_seconds > 0,
+                cache_cluster_size=api_cache_size if api_cache_ttl_seconds > 0 else None,
+                method_options={
+                    "/tasks/{taskId}/GET": apigw_.MethodDeploymentOptions(
+                        caching_enabled=True,
+                        cache_ttl=Duration.seconds(api_cache_ttl_seconds)
+                    )
+                } if api_cache_ttl_seconds > 0 else None
+            )
         )
 
+        # Share of the requests traced, e.g. -c tracingSampleRate=0.01, instead of the X-Ray default of 1 per second and 5%
+        tracing_sample_rate = self.node.try_get_context("tracingSampleRate")
+        if tracing_enabled and tracing_sample_rate is not None:
+            xray_.CfnSamplingRule(
+                self, "TasksApiSamplingRule",
+                sampling_rule=xray_.CfnSamplingRule.SamplingRuleProperty(
+                    rule_name=f"{self.stack_name}-api"[:32],
+                    priority=1000,
+                    fixed_rate=float(tracing_sample_rate),
+                    # Still trace one request per second, so quiet periods are not invisible
+                    reservoir_size=1,
+                    resource_arn=api.deployment_stage.stage_arn,
+                    service_name="*",
+                    service_type="AWS::ApiGateway::Stage",
+                    host="*",
+                    http_method="*",
+                    url_path="*",
+                    version=1
+                )
+            )
+
         # Create API Gateway Resources
         tasks = api.root.add_resource("tasks")
         task = tasks.add_resource("{taskId}")
+        batch = tasks.add_resource("batch")
+        batch_get = tasks.add_resource("batchGet")
         
+        # Request bodies are checked against the schemas of common.schemas, and the required parameters are checked,
+        # before the functions are invoked. The path parameters are not, API Gateway cannot match them to a pattern.
+        body_validator = api.add_request_validator("BodyValidator",
+            validate_request_body=True, validate_request_parameters=True)
+        parameters_validator = api.add_request_validator("ParametersValidator",
+            validate_request_body=False, validate_request_parameters=True)
+        schemas = load_layer_module("schemas")
+        models = {
+            name: api.add_model(f"{name}Model", content_type="application/json", model_name=name,
+                                schema=model_schema(dict(schema, schema=apigw_.JsonSchemaVersion.DRAFT4)))
+            for name, schema in (("Task", schemas.TASK_SCHEMA), ("TaskPatch", schemas.TASK_PATCH_SCHEMA),
+                                 ("TaskBatch", schemas.BATCH_CREATE_SCHEMA), ("TaskBatchGet", schemas.BATCH_GET_SCHEMA))
+        }
+        # Rejected requests get the same {"error": ...} body as the ones the handlers reject. escapeJavaScript
+        # also escapes single quotes as \', which is not valid JSON, so they are put back
+        error_template = (r'''{"error": "$util.escapeJavaScript($context.error.validationErrorString)'''
+                          r'''.replaceAll("\\'","'")"}''')
+        for name, response_type in (("BadRequestBody", apigw_.ResponseType.BAD_REQUEST_BODY),
+                                    ("BadRequestParameters", apigw_.ResponseType.BAD_REQUEST_PARAMETERS)):
+            api.add_gateway_response(name, type=response_type, templates={"application/json": error_template})
+
         # Create Authorizer
         auth = apigw_.CognitoUserPoolsAuthorizer(self, "TasksAuthorizer", cognito_user_pools=[user_pool])
 
         # Create API Gateway Methods
-        create_method = tasks.add_method("POST", apigw_.LambdaIntegration(create_task_lambda),
-                        request_models={"application/json": apigw_.Model.EMPTY_MODEL},
+        create_method = tasks.add_method("POST", apigw_.LambdaIntegration(aliases["create_task"]),
+                        request_models={"application/json": models["Task"]},
                         method_responses=[apigw_.MethodResponse(status_code="201", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
                                             apigw_.MethodResponse(status_code="400", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
                                             apigw_.MethodResponse(status_code="404", response_models={"application/json": apigw_.Model.EMPTY_MODEL})],
+                        request_validator=body_validator,
                         authorization_type=apigw_.AuthorizationType.COGNITO,
                         authorizer=auth,
                         ),
-        get_method = task.add_method("GET", apigw_.LambdaIntegration(get_task_lambda),
+        list_method = tasks.add_method("GET", apigw_.LambdaIntegration(aliases["list_tasks"]),
+                        request_parameters={"method.request.querystring.status": True,
+                                            "method.request.querystring.limit": False,
+                                            "method.request.querystring.cursor": False},
+                        method_responses=[apigw_.MethodResponse(status_code="200", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
+                                            apigw_.MethodResponse(status_code="400", response_models={"application/json": apigw_.Model.EMPTY_MODEL})],
+                        request_validator=parameters_validator,
+                        authorization_type=apigw_.AuthorizationType.COGNITO,
+                        authorizer=auth,
+                        )
+        batch_create_method = batch.add_method("POST", apigw_.LambdaIntegration(aliases["batch_create_task"]),
+                        request_models={"application/json": models["TaskBatch"]},
+                        method_responses=[apigw_.MethodResponse(status_code="201", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
+                                            apigw_.MethodResponse(status_code="207", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
+                                            apigw_.MethodResponse(status_code="400", response_models={"application/json": apigw_.Model.EMPTY_MODEL})],
+                        request_validator=body_validator,
+                        authorization_type=apigw_.AuthorizationType.COGNITO,
+                        authorizer=auth,
+                        )
+        batch_get_method = batch_get.add_method("POST", apigw_.LambdaIntegration(aliases["batch_get_task"]),
+                        request_models={"application/json": models["TaskBatchGet"]},
+                        method_responses=[apigw_.MethodResponse(status_code="200", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
+                                            apigw_.MethodResponse(status_code="400", response_models={"application/json": apigw_.Model.EMPTY_MODEL})],
+                        request_validator=body_validator,
+                        authorization_type=apigw_.AuthorizationType.COGNITO,
+                        authorizer=auth,
+                        )
+        # Cached responses are keyed on the task and on If-None-Match, so 304s are only served to clients holding the ETag
+        get_method = task.add_method("GET", apigw_.LambdaIntegration(aliases["get_task"],
+                            cache_key_parameters=["method.request.path.taskId", "method.request.header.If-None-Match"]),
                         request_models={"application/json": apigw_.Model.EMPTY_MODEL},
+                        request_parameters={"method.request.path.taskId": True,
+                                            "method.request.header.If-None-Match": False},
                         method_responses=[apigw_.MethodResponse(status_code="200", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
+                                            apigw_.MethodResponse(status_code="304"),
                                             apigw_.MethodResponse(status_code="400", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
                                             apigw_.MethodResponse(status_code="404", response_models={"application/json": apigw_.Model.EMPTY_MODEL})],
+                        request_validator=parameters_validator,
                         authorization_type=apigw_.AuthorizationType.COGNITO,
                         authorizer=auth,
                         ),
-        update_method = task.add_method("PUT", apigw_.LambdaIntegration(update_task_lambda),
-                        request_models={"application/json": apigw_.Model.EMPTY_MODEL},
+        update_method = task.add_method("PUT", apigw_.LambdaIntegration(aliases["update_task"]),
+                        request_models={"application/json": models["Task"]},
+                        request_parameters={"method.request.path.taskId": True},
                         method_responses=[apigw_.MethodResponse(status_code="200", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
                                             apigw_.MethodResponse(status_code="400", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
-                                            apigw_.MethodResponse(status_code="404", response_models={"application/json": apigw_.Model.EMPTY_MODEL})],
+                                            apigw_.MethodResponse(status_code="404", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
+                                            apigw_.MethodResponse(status_code="412", response_models={"application/json": apigw_.Model.EMPTY_MODEL})],
+                        request_validator=body_validator,
                         authorization_type=apigw_.AuthorizationType.COGNITO,
                         authorizer=auth,
                         ),
-        delete_method= task.add_method("DELETE", apigw_.LambdaIntegration(delete_task_lambda),
+        patch_method = task.add_method("PATCH", apigw_.LambdaIntegration(aliases["patch_task"]),
+                        request_models={"application/json": models["TaskPatch"]},
+                        request_parameters={"method.request.path.taskId": True},
+                        method_responses=[apigw_.MethodResponse(status_code="200", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
+                                            apigw_.MethodResponse(status_code="400", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
+                                            apigw_.MethodResponse(status_code="404", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
+                                            apigw_.MethodResponse(status_code="412", response_models={"application/json": apigw_.Model.EMPTY_MODEL})],
+                        request_validator=body_validator,
+                        authorization_type=apigw_.AuthorizationType.COGNITO,
+                        authorizer=auth,
+                        )
+        delete_method= task.add_method("DELETE", apigw_.LambdaIntegration(aliases["delete_task"]),
                         request_models={"application/json": apigw_.Model.EMPTY_MODEL},
+                        request_parameters={"method.request.path.taskId": True},
                         method_responses=[apigw_.MethodResponse(status_code="204", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
                                             apigw_.MethodResponse(status_code="400", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
-                                            apigw_.MethodResponse(status_code="404", response_models={"application/json": apigw_.Model.EMPTY_MODEL})],
+                                            apigw_.MethodResponse(status_code="404", response_models={"application/json": apigw_.Model.EMPTY_MODEL}),
+                                            apigw_.MethodResponse(status_code="412", response_models={"application/json": apigw_.Model.EMPTY_MODEL})],
+                        request_validator=parameters_validator,
                         authorization_type=apigw_.AuthorizationType.COGNITO,
                         authorizer=auth,
                         ),
@@ -246,4 +607,75 @@ class ServerlessCrudApiStack(Stack):
             actions=["s3:GetObject"],
             resources=[f"{bucket.bucket_arn}/*"],
             principals=[iam.ServicePrincipal("apigateway.amazonaws.com")]
-        ))
\ No newline at end of file
+        ))
+
+    def get_json_context(self, key):
+        """
+        Returns an object context value, which is a JSON string when given with -c on the command line.
+        """
+        value = self.node.try_get_context(key) or {}
+        return json.loads(value) if isinstance(value, str) else value
+
+    def add_handler_function(self, name, handler, code, layers, environment, role, settings, provisioned=None):
+        """
+        Creates a handler function and its "<name>FunctionProd" alias on the current version.
+
+        layers are the common layers by runtime and architecture, the function gets the one of its settings.
+
+        settings are the memorySize, architecture, runtime, timeout and tracing of the function (see resolve_function_settings).
+        The "adot" tracing wraps the handler with the OpenTelemetry auto-instrumentation layer, "xray" only enables
+        Lambda active tracing, which records the invocation without adding anything to the init phase.
+
+        provisioned configures the provisioned concurrency of the alias:
+        - min: provisioned concurrent executions, 0 (the default) for none.
+        - max: upper bound for auto scaling, which is enabled when it is above min or there are schedules.
+          It defaults to the highest of min and the max of the schedules.
+        - utilization: target of the share of provisioned concurrency in use, 0.7 by default.
+        - schedules: scheduled scaling windows, each one with a name, an expression
+          ("cron(0 7 ? * MON-FRI *)" or "rate(...)", in UTC) and the min and max it sets.
+        """
+        provisioned = provisioned or {}
+        min_capacity = int(provisioned.get("min", 0))
+        schedules = provisioned.get("schedules", [])
+        max_capacity = int(provisioned.get("max", max([min_capacity] + [int(s.get("max", 0)) for s in schedules])))
+        if max_capacity < min_capacity:
+            raise ValueError(f"Provisioned concurrency of {name}: max must not be below min")
+        if not min_capacity and max_capacity and not schedules:
+            # Target tracking needs a provisioned baseline to measure its utilization, without one it never scales out
+            raise ValueError(f"Provisioned concurrency of {name}: a max without min needs schedules")
+        function = lambda_.Function(
+            self, f"{name}Function",
+            runtime=lambda_.Runtime(settings["runtime"], lambda_.RuntimeFamily.PYTHON),
+            architecture=ARCHITECTURES[settings["architecture"]],
+            memory_size=int(settings["memorySize"]),
+            timeout=Duration.seconds(int(settings["timeout"])),
+            handler=handler,
+            code=code,
+            layers=[layers[settings["runtime"], settings["architecture"]]],
+            environment=environment,
+            role=role,
+            tracing=lambda_.Tracing.ACTIVE if settings["tracing"] == "xray" else None,
+            adot_instrumentation=lambda_.AdotInstrumentationConfig(
+                layer_version=lambda_.AdotLayerVersion.from_python_sdk_layer_version(lambda_.AdotLambdaLayerPythonSdkVersion.LATEST),
+                exec_wrapper=lambda_.AdotLambdaExecWrapper.INSTRUMENT_HANDLER
+            ) if settings["tracing"] == "adot" else None
+        )
+        alias = lambda_.Alias(
+            self, f"{name}FunctionAlias",
+            alias_name=f"{name}FunctionProd",
+            version=function.current_version,
+            provisioned_concurrent_executions=min_capacity or None
+        )
+        # A min of 0 with schedules is a scale from zero in the scheduled windows
+        if max_capacity > min_capacity or schedules:
+            scaling = alias.add_auto_scaling(min_capacity=min_capacity, max_capacity=max_capacity)
+            # Target tracking on ProvisionedConcurrencyUtilization adds environments before requests spill over to cold ones
+            scaling.scale_on_utilization(utilization_target=float(provisioned.get("utilization", 0.7)))
+            for schedule in schedules:
+                scaling.scale_on_schedule(
+                    schedule["name"],
+                    schedule=appscaling_.Schedule.expression(schedule["expression"]),
+                    min_capacity=schedule.get("min"),
+                    max_capacity=schedule.get("max")
+                )
+        return function, alias
@@ -0,0 +1 @@
+import local  # noqa: F401, puts the common layer on sys.path
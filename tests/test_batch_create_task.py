@@ -0,0 +1,44 @@
+import unittest
+import json
+from lambdas.batch_create_task import handler
+from common.dynamodb import BATCH_WRITE_SIZE
+
+class TestBatchCreateTask(unittest.TestCase):
+
+    # Test case to check if all the tasks are created, spanning more than one BatchWriteItem call
+    def test_batch_create_task_success(self):
+        tasks = [{"title": f"Task {i}", "description": f"This is task {i}", "status": "pending"} for i in range(BATCH_WRITE_SIZE + 5)]
+        event = {"body": json.dumps(tasks)}
+        context = {}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 201)
+        response_body = json.loads(response['body'])
+        self.assertEqual(len(response_body['taskIds']), len(tasks))
+        self.assertTrue(all(response_body['taskIds']))
+        self.assertEqual(response_body['errors'], [])
+
+    # Test case to check that invalid tasks are reported per item while the valid ones are created
+    def test_batch_create_task_partial(self):
+        tasks = [
+            {"title": "Task 1", "description": "This is task 1", "status": "pending"},
+            {"description": "This is an invalid task"}
+        ]
+        event = {"body": json.dumps(tasks)}
+        context = {}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 207)
+        response_body = json.loads(response['body'])
+        self.assertIsNotNone(response_body['taskIds'][0])
+        self.assertIsNone(response_body['taskIds'][1])
+        self.assertEqual(response_body['errors'][0]['index'], 1)
+
+    # Test case to check an error is returned when the body is not an array
+    def test_batch_create_task_invalid_body(self):
+        event = {"body": '{"title": "Task 1"}'}
+        context = {}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 400)
+        self.assertIn('error', response['body'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import json
+import uuid
+from lambdas.batch_get_task import handler
+from lambdas import create_task
+
+class TestBatchGetTask(unittest.TestCase):
+    created_task_id = None
+
+    # Create the task to retrieve, this class runs before TestCreateTask in discovery order
+    @classmethod
+    def setUpClass(cls):
+        event = {
+            "body": '{"title": "Task 1", "description": "This is task 1", "status": "pending"}'
+        }
+        context = {}
+        response = create_task.handler(event, context)
+        cls.created_task_id = json.loads(response['body'])['taskId']
+
+    # Test case to check if several tasks are retrieved in request order
+    def test_batch_get_task_success(self):
+        missing_task_id = str(uuid.uuid4())
+        event = {
+            "body": json.dumps({"taskIds": [missing_task_id, TestBatchGetTask.created_task_id]})
+        }
+        context = {}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 200)
+        tasks = json.loads(response['body'])['tasks']
+        self.assertIsNone(tasks[0])
+        self.assertEqual(tasks[1]['taskId'], TestBatchGetTask.created_task_id)
+
+    # Test case to check if only the requested attributes are returned
+    def test_batch_get_task_projection(self):
+        event = {
+            "body": json.dumps({"taskIds": [TestBatchGetTask.created_task_id], "attributes": ["status"]})
+        }
+        context = {}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 200)
+        task = json.loads(response['body'])['tasks'][0]
+        self.assertEqual(set(task), {'taskId', 'status'})
+
+    # Test case to check an error is returned when a task id is not valid
+    def test_batch_get_task_invalid(self):
+        event = {
+            "body": json.dumps({"taskIds": [TestBatchGetTask.created_task_id, "invalid-task-id"]})
+        }
+        context = {}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 400)
+        self.assertIn('error', response['body'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
 import unittest
 import json
+import uuid
 from lambdas.create_task import handler
+from unittest import mock
+from common import idempotency
+from common.idempotency import InMemoryIdempotencyStore, fingerprint, get_idempotency_store, new_lock_token
 
 class TestCreateTask(unittest.TestCase):
     created_task_id = None
@@ -28,5 +32,43 @@ class TestCreateTask(unittest.TestCase):
         self.assertEqual(response['statusCode'], 400)
         self.assertIn('error', response['body'])
 
+    # Test case to check a retry with the same Idempotency-Key returns the original response without a second task
+    def test_create_task_idempotency_key(self):
+        body = '{"title": "Task 2", "description": "This is task 2", "status": "pending"}'
+        event = {"body": body, "headers": {"Idempotency-Key": str(uuid.uuid4())}}
+        first = handler(event, {})
+        retry = handler(event, {})
+        self.assertEqual(first['statusCode'], 201)
+        self.assertEqual(retry['statusCode'], 201)
+        self.assertEqual(json.loads(retry['body']), json.loads(first['body']))
+        self.assertEqual(retry['headers']['ETag'], first['headers']['ETag'])
+        self.assertEqual(retry['headers']['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Idempotent-Replayed', first['headers'])
+        # Another request with the key is rejected
+        event['body'] = '{"title": "Task 3", "description": "This is task 3", "status": "pending"}'
+        self.assertEqual(handler(event, {})['statusCode'], 422)
+
+    # Test case to check a request is rejected while another one with the same Idempotency-Key is in progress
+    def test_create_task_idempotency_in_progress(self):
+        body = '{"title": "Task 4", "description": "This is task 4", "status": "pending"}'
+        key = str(uuid.uuid4())
+        self.assertIsNone(get_idempotency_store().start(key, fingerprint(body), new_lock_token()))
+        response = handler({"body": body, "headers": {"idempotency-key": key}}, {})
+        self.assertEqual(response['statusCode'], 409)
+        self.assertEqual(handler({"body": body, "headers": {"Idempotency-Key": ""}}, {})['statusCode'], 400)
+
+    # Test case to check a request whose key was taken over neither stores its response nor frees the key
+    def test_create_task_idempotency_takeover(self):
+        for store in (get_idempotency_store(), InMemoryIdempotencyStore()):
+            key, first, retry = str(uuid.uuid4()), new_lock_token(), new_lock_token()
+            # The lock of the first request has expired when the retry comes
+            with mock.patch.object(idempotency, 'IDEMPOTENCY_LOCK_SECONDS', -1):
+                self.assertIsNone(store.start(key, 'body', first))
+            self.assertIsNone(store.start(key, 'body', retry))
+            self.assertFalse(store.complete(key, first, '{"statusCode": 201}'))
+            store.release(key, first)
+            self.assertTrue(store.complete(key, retry, '{"statusCode": 201}'))
+            self.assertEqual(store.start(key, 'body', new_lock_token())['status'], idempotency.COMPLETED)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
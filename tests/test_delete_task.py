@@ -5,6 +5,17 @@ from test_create_task import TestCreateTask
 
 class TestDeleteTask(unittest.TestCase):
 
+    # Test case to check a task is not deleted when it was modified since the ETag in If-Match
+    def test_delete_task_precondition_failed(self):
+        event = {
+            "pathParameters": {"taskId": TestCreateTask.created_task_id},
+            "headers": {"If-Match": '"v0"'}
+        }
+        context = {}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 412)
+        self.assertIn('error', response['body'])
+
     # Test case to check if a task is successfully deleted
     def test_delete_task_success(self):
         event = {
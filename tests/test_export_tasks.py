@@ -0,0 +1,51 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from lambdas.export_tasks import DirectorySink, export_tasks
+from common.repository import InMemoryTaskRepository, new_task
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+class TestExportTasks(unittest.TestCase):
+
+    def setUp(self):
+        self.repository = InMemoryTaskRepository()
+        # Random descriptions, so the compressed parts grow with every page
+        self.items = [new_task({'title': f'Task {i}', 'description': os.urandom(200).hex(), 'status': 'pending'},
+                               '2024-01-01T00:00:00+00:00') for i in range(1000)]
+        self.items[0]['priority'] = Decimal('1.5')
+        self.repository.put_many(self.items)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    # Test case to check every task is exported once to compressed JSONL parts listed in the manifest
+    def test_export_jsonl(self):
+        manifest = export_tasks(DirectorySink(self.directory), 'jsonl', 2, self.repository,
+                                max_part_bytes=50_000, page_size=50)
+        self.assertEqual(manifest['items'], 1000)
+        self.assertGreater(len(manifest['parts']), 2)
+        exported = []
+        for part in manifest['parts']:
+            with gzip.open(os.path.join(self.directory, part['name']), 'rt') as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(len(lines), part['items'])
+            exported.extend(lines)
+        self.assertEqual(sorted(item['taskId'] for item in exported), sorted(item['taskId'] for item in self.items))
+        self.assertIn({'priority': 1.5}, [{'priority': item['priority']} for item in exported if 'priority' in item])
+        with open(os.path.join(self.directory, 'manifest.json')) as f:
+            self.assertEqual(json.load(f), manifest)
+
+    # Test case to check the tasks are exported to Parquet parts with a column per attribute
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_export_parquet(self):
+        manifest = export_tasks(DirectorySink(self.directory), 'parquet', 2, self.repository)
+        tables = [pyarrow.parquet.read_table(os.path.join(self.directory, part['name'])) for part in manifest['parts']]
+        self.assertEqual(sum(table.num_rows for table in tables), 1000)
+        self.assertIn('version', tables[0].schema.names)
@@ -1,6 +1,13 @@
+import io
+import json
 import unittest
 import uuid
+from contextlib import redirect_stdout
+from unittest import mock
+from lambdas import get_task, update_task
 from lambdas.get_task import handler
+from common import metrics
+from common.cache import TTLCache
 from test_create_task import TestCreateTask
 
 class TestGetTask(unittest.TestCase):
@@ -15,6 +22,60 @@ class TestGetTask(unittest.TestCase):
         self.assertEqual(response['statusCode'], 200)
         self.assertIn('title', response['body'])
 
+    # Test case to check a 304 without body is returned when the client has the current ETag
+    def test_get_task_not_modified(self):
+        event = {
+            "pathParameters": {"taskId": TestCreateTask.created_task_id}
+        }
+        context = {}
+        headers = handler(event, context)['headers']
+        self.assertEqual(headers['Cache-Control'], 'no-cache')
+        etag = headers['ETag']
+        event['headers'] = {"if-none-match": etag}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 304)
+        self.assertEqual(response['body'], '')
+
+    # Test case to check the cache serves repeated reads and is invalidated by updates in the same container
+    def test_get_task_cache(self):
+        cache = TTLCache(max_size=10, ttl_seconds=60)
+        event = {
+            "pathParameters": {"taskId": TestCreateTask.created_task_id}
+        }
+        context = {}
+        with mock.patch.object(get_task, 'task_cache', cache), mock.patch.object(update_task, 'task_cache', cache):
+            first = handler(event, context)
+            second = handler(event, context)
+            self.assertEqual(second['body'], first['body'])
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            update_task.handler({
+                "pathParameters": {"taskId": TestCreateTask.created_task_id},
+                "body": '{"title": "Cached Task", "description": "Cached description", "status": "pending"}'
+            }, context)
+            third = handler(event, context)
+        self.assertIn('Cached Task', third['body'])
+        self.assertNotEqual(third['headers']['ETag'], first['headers']['ETag'])
+
+    # Test case to check a request logs its latency, phase timings and consumed capacity as an EMF record
+    def test_get_task_metrics(self):
+        event = {
+            "pathParameters": {"taskId": TestCreateTask.created_task_id}
+        }
+        context = mock.Mock(aws_request_id='test-request')
+        output = io.StringIO()
+        with mock.patch.object(metrics, 'METRICS_MODE', 'emf'), redirect_stdout(output):
+            response = metrics.instrument(handler)(event, context)
+        self.assertEqual(response['statusCode'], 200)
+        record = json.loads(output.getvalue().splitlines()[-1])
+        self.assertEqual(record['Handler'], 'get_task')
+        self.assertEqual(record['StatusCode'], 200)
+        self.assertEqual(record['requestId'], 'test-request')
+        names = [metric['Name'] for metric in record['_aws']['CloudWatchMetrics'][0]['Metrics']]
+        for name in ('LatencyMs', 'ConsumedCapacity', 'ValidateMs', 'StoreMs', 'SerializeMs'):
+            self.assertIn(name, names)
+            self.assertGreaterEqual(record[name], 0)
+        self.assertGreaterEqual(record['LatencyMs'], record['StoreMs'])
+
     # Test case to check an error is returned when the task id is not valid
     def test_get_task_invalid(self):
         event = {
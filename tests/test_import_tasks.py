@@ -0,0 +1,57 @@
+import json
+import unittest
+import uuid
+from lambdas.import_tasks import import_lines, iter_lines
+from common.repository import InMemoryTaskRepository
+
+def new_job(file_format):
+    return {'jobId': str(uuid.uuid4()), 'format': file_format, 'lines': 0, 'offset': 0, 'imported': 0, 'failed': 0,
+            'startedAt': '2024-01-01T00:00:00+00:00'}
+
+class TestImportTasks(unittest.TestCase):
+
+    # Test case to check a file is split into lines with the offset after each one, whatever the chunk size
+    def test_iter_lines(self):
+        data = b'first\r\nsecond\n\nlast'
+        for size in (1, 3, len(data)):
+            chunks = [data[i:i + size] for i in range(0, len(data), size)]
+            self.assertEqual(list(iter_lines(chunks)),
+                             [(b'first', 7), (b'second', 14), (b'', 15), (b'last', 19)])
+        self.assertEqual(list(iter_lines([data[7:]], 7))[0], (b'second', 14))
+
+    # Test case to check valid rows are imported and invalid ones reported with their line number
+    def test_import_lines_jsonl(self):
+        repository = InMemoryTaskRepository()
+        rows = [json.dumps({'title': 'Imported', 'description': 'From a file', 'status': 'pending'}),
+                '{"title": "No status", "description": "Missing"}', '[1, 2]', 'not json',
+                '{"title": 1, "description": "Not a string", "status": "pending"}',
+                '{"title": "Extra", "description": "Unknown field", "status": "pending", "owner": "someone"}', '']
+        job = new_job('jsonl')
+        checkpoints = []
+        data = '\n'.join(rows).encode()
+        done = import_lines(iter_lines([data]), job, repository, lambda job, errors: checkpoints.append(errors))
+        self.assertTrue(done)
+        self.assertEqual((job['lines'], job['imported'], job['failed'], job['offset']), (6, 1, 5, len(data)))
+        self.assertEqual([error['line'] for error in checkpoints[-1]], [2, 3, 4, 5, 6])
+        self.assertEqual([error['error'] for error in checkpoints[-1]][:2], ["Missing key: 'status'",
+                                                                            'Row must be of type object'])
+        self.assertEqual([error['error'] for error in checkpoints[-1]][3:],
+                         ['title must be of type string', 'Unknown fields: owner'])
+        task = repository.get(str(uuid.uuid5(uuid.UUID(job['jobId']), '1')))
+        self.assertEqual(task['title'], 'Imported')
+
+    # Test case to check a stopped CSV import resumes from its checkpoint without importing a line twice
+    def test_import_lines_resume(self):
+        repository = InMemoryTaskRepository()
+        data = ('title,description,status\n' + ''.join(f'Task {i},"Row, {i}",pending\n' for i in range(10))).encode()
+        job = new_job('csv')
+        calls = iter(range(100))
+        done = import_lines(iter_lines([data]), job, repository, lambda job, errors: None,
+                            should_stop=lambda: next(calls) == 5)
+        self.assertFalse(done)
+        self.assertEqual((job['lines'], job['imported']), (5, 4))
+        done = import_lines(iter_lines([data[job['offset']:]], job['offset']), job, repository, lambda job, errors: None)
+        self.assertTrue(done)
+        self.assertEqual((job['lines'], job['imported'], job['failed']), (11, 10, 0))
+        page, _ = repository.list_by_status('pending', 100)
+        self.assertEqual(sorted(task['description'] for task in page), sorted(f'Row, {i}' for i in range(10)))
@@ -0,0 +1,55 @@
+import unittest
+import json
+import uuid
+from lambdas.list_tasks import handler
+from lambdas import create_task
+
+class TestListTasks(unittest.TestCase):
+    status = None
+
+    # Create a few tasks with a status that no other test uses
+    @classmethod
+    def setUpClass(cls):
+        cls.status = f"list-{uuid.uuid4()}"
+        for i in range(3):
+            event = {
+                "body": json.dumps({"title": f"Task {i}", "description": f"This is task {i}", "status": cls.status})
+            }
+            create_task.handler(event, {})
+
+    # Test case to check if the tasks are listed one page at a time following the cursor
+    def test_list_tasks_pagination(self):
+        task_ids = []
+        cursor = None
+        while True:
+            params = {"status": TestListTasks.status, "limit": "2"}
+            if cursor:
+                params["cursor"] = cursor
+            response = handler({"queryStringParameters": params}, {})
+            self.assertEqual(response['statusCode'], 200)
+            page = json.loads(response['body'])
+            self.assertLessEqual(len(page['tasks']), 2)
+            task_ids.extend(task['taskId'] for task in page['tasks'])
+            cursor = page['nextCursor']
+            if not cursor:
+                break
+        self.assertEqual(len(task_ids), 3)
+        self.assertEqual(len(set(task_ids)), 3)
+
+    # Test case to check an error is returned when the status is missing
+    def test_list_tasks_missing_status(self):
+        response = handler({"queryStringParameters": None}, {})
+        self.assertEqual(response['statusCode'], 400)
+        self.assertIn('error', response['body'])
+
+    # Test case to check an error is returned when the cursor is not valid
+    def test_list_tasks_invalid_cursor(self):
+        event = {
+            "queryStringParameters": {"status": TestListTasks.status, "cursor": "invalid-cursor"}
+        }
+        response = handler(event, {})
+        self.assertEqual(response['statusCode'], 400)
+        self.assertIn('error', response['body'])
+
+if __name__ == '__main__':
+    unittest.main()
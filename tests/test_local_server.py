@@ -0,0 +1,47 @@
+import json
+import unittest
+import requests
+from local.events import match_route
+from local.server import LocalApi
+
+class TestLocalServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.api = LocalApi().start()
+        cls.tasks_url = cls.api.endpoint_url + '/tasks'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.api.stop()
+
+    # Test case to check requests are routed to the handler of their method and resource
+    def test_match_route(self):
+        self.assertEqual(match_route('GET', '/tasks/batch'), None)
+        self.assertEqual(match_route('POST', '/tasks/batch')[1], 'batch_create_task')
+        self.assertEqual(match_route('GET', '/tasks'), ('/tasks', 'list_tasks', None))
+        self.assertEqual(match_route('PATCH', '/tasks/abc'), ('/tasks/{taskId}', 'patch_task', {'taskId': 'abc'}))
+        self.assertEqual(match_route('GET', '/users'), None)
+
+    # Test case to check a task can be created, read and deleted through the local server
+    def test_task_lifecycle(self):
+        task = {"title": "Local Task", "description": "Served locally", "status": "pending"}
+        response = requests.post(self.tasks_url, data=json.dumps(task))
+        self.assertEqual(response.status_code, 201)
+        task_id = response.json()['taskId']
+
+        response = requests.get(f'{self.tasks_url}/{task_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Local Task')
+        self.assertEqual(response.headers['ETag'], '"v1"')
+
+        response = requests.get(f'{self.tasks_url}/{task_id}', headers={'If-None-Match': '"v1"'})
+        self.assertEqual(response.status_code, 304)
+
+        response = requests.delete(f'{self.tasks_url}/{task_id}')
+        self.assertEqual(response.status_code, 204)
+
+    # Test case to check unknown routes get the API Gateway response
+    def test_unknown_route(self):
+        response = requests.get(self.api.endpoint_url + '/users')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,56 @@
+import unittest
+import json
+import uuid
+from lambdas.patch_task import handler
+from test_create_task import TestCreateTask
+
+class TestPatchTask(unittest.TestCase):
+
+    # Test case to check if only the fields in the body (and the version) are updated and returned
+    def test_patch_task_success(self):
+        event = {
+            "pathParameters": {"taskId": TestCreateTask.created_task_id},
+            "body": '{"status": "in-progress"}'
+        }
+        context = {}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(set(json.loads(response['body'])), {"status", "updatedAt", "version"})
+        self.assertEqual(json.loads(response['body'])['status'], "in-progress")
+
+    # Test case to check if a field set to null is removed from the task
+    def test_patch_task_remove(self):
+        event = {
+            "pathParameters": {"taskId": TestCreateTask.created_task_id},
+            "body": '{"description": null, "title": "Patched Task"}'
+        }
+        context = {}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(set(json.loads(response['body'])), {"title", "updatedAt", "version"})
+
+    # Test case to check an error is returned when the body has unknown fields or removes a required one
+    def test_patch_task_invalid(self):
+        for body in ['{"owner": "someone"}', '{"status": null}', '{}']:
+            event = {
+                "pathParameters": {"taskId": TestCreateTask.created_task_id},
+                "body": body
+            }
+            context = {}
+            response = handler(event, context)
+            self.assertEqual(response['statusCode'], 400)
+            self.assertIn('error', response['body'])
+
+    # Test case to check an error is returned when the task is not found
+    def test_patch_task_not_found(self):
+        event = {
+            "pathParameters": {"taskId": str(uuid.uuid4())},
+            "body": '{"status": "completed"}'
+        }
+        context = {}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 404)
+        self.assertIn('error', response['body'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+from unittest import mock
+from lambdas import publish_changes
+from lambdas.publish_changes import EventBridgePublisher, SnsPublisher, change_event, handler
+from common.dynamodb import serialize
+
+TASK_ID = '3f1c1e0a-0000-4000-8000-000000000001'
+
+def stream_record(sequence_number, event_name, old_image=None, new_image=None):
+    record = {
+        'eventID': f'event-{sequence_number}',
+        'eventName': event_name,
+        'dynamodb': {
+            'ApproximateCreationDateTime': 1704067200,
+            'Keys': serialize({'taskId': TASK_ID}),
+            'SequenceNumber': str(sequence_number)
+        }
+    }
+    if old_image:
+        record['dynamodb']['OldImage'] = serialize(old_image)
+    if new_image:
+        record['dynamodb']['NewImage'] = serialize(new_image)
+    return record
+
+TASK = {'taskId': TASK_ID, 'title': 'Task 1', 'description': 'This is task 1', 'status': 'pending', 'version': 1,
+        'createdAt': '2024-01-01T00:00:00+00:00', 'updatedAt': '2024-01-01T00:00:00+00:00'}
+# The description removed and the status changed
+UPDATED_TASK = dict({name: value for name, value in TASK.items() if name != 'description'},
+                    status='completed', version=2, updatedAt='2024-01-02T00:00:00+00:00')
+
+class FakePublisher:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.published = []
+
+    def publish(self, events):
+        self.published.append(events)
+        return self.failures.pop(0) if self.failures else []
+
+class TestPublishChanges(unittest.TestCase):
+
+    # Test case to check a change event only has the type, version, status and changed fields of the task
+    def test_change_event(self):
+        self.assertEqual(change_event(stream_record(1, 'INSERT', new_image=TASK)), {
+            'eventId': 'event-1', 'type': 'TaskCreated', 'taskId': TASK_ID, 'version': 1, 'status': 'pending',
+            'occurredAt': '2024-01-01T00:00:00+00:00'
+        })
+        event = change_event(stream_record(2, 'MODIFY', TASK, UPDATED_TASK))
+        self.assertEqual(event['type'], 'TaskUpdated')
+        self.assertEqual(event['version'], 2)
+        self.assertEqual(event['changedFields'], ['description', 'status'])
+        self.assertEqual(event['previousStatus'], 'pending')
+        event = change_event(stream_record(3, 'REMOVE', old_image=UPDATED_TASK))
+        self.assertEqual((event['type'], event['status']), ('TaskDeleted', 'completed'))
+
+    # Test case to check the records are published in batches and the first failed one is reported
+    def test_handler_partial_failure(self):
+        records = [stream_record(number, 'INSERT', new_image=TASK) for number in range(1, 26)]
+        publisher = FakePublisher()
+        with mock.patch.object(publish_changes, '_publisher', publisher):
+            self.assertEqual(handler({'Records': records}, {}), {'batchItemFailures': []})
+        self.assertEqual([len(events) for events in publisher.published], [10, 10, 5])
+        # The 14th record fails in the second batch, the third one is left for the retry
+        publisher = FakePublisher([[], [3, 5]])
+        with mock.patch.object(publish_changes, '_publisher', publisher):
+            self.assertEqual(handler({'Records': records}, {}), {'batchItemFailures': [{'itemIdentifier': '14'}]})
+        self.assertEqual(len(publisher.published), 2)
+
+    # Test case to check the failed entries of EventBridge and SNS are mapped back to their events
+    def test_publishers(self):
+        events = [change_event(stream_record(number, 'INSERT', new_image=TASK)) for number in range(3)]
+        client = mock.Mock()
+        client.put_events.return_value = {'FailedEntryCount': 1,
+                                          'Entries': [{'EventId': 'a'}, {'ErrorCode': 'InternalFailure'}, {'EventId': 'c'}]}
+        self.assertEqual(EventBridgePublisher('bus', client=client).publish(events), [1])
+        entry = client.put_events.call_args.kwargs['Entries'][0]
+        self.assertEqual((entry['EventBusName'], entry['DetailType']), ('bus', 'TaskCreated'))
+        self.assertEqual(json.loads(entry['Detail'])['taskId'], TASK_ID)
+        client.publish_batch.return_value = {'Successful': [{'Id': '0'}], 'Failed': [{'Id': '2'}, {'Id': '1'}]}
+        self.assertEqual(SnsPublisher('arn:aws:sns:us-east-1:123456789012:changes', client=client).publish(events), [1, 2])
+        entry = client.publish_batch.call_args.kwargs['PublishBatchRequestEntries'][0]
+        self.assertEqual(entry['MessageAttributes']['status']['StringValue'], 'pending')
+
+if __name__ == '__main__':
+    unittest.main()
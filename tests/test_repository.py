@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+import uuid
+from common.dynamodb import DynamoDBTaskRepository
+from common.repository import InMemoryTaskRepository, TaskNotFound, VersionConflict
+from common.sqlite import SQLiteTaskRepository
+
+def new_item(status, created_at='2024-01-01T00:00:00+00:00'):
+    return {
+        'taskId': str(uuid.uuid4()),
+        'title': 'Repository Task',
+        'description': 'Stored by a repository',
+        'status': status,
+        'createdAt': created_at,
+        'updatedAt': created_at,
+        'version': 1
+    }
+
+class RepositoryContract:
+    """
+    Checks shared by every TaskRepository implementation.
+    """
+
+    def create_repository(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.repository = self.create_repository()
+        # A status of its own keeps the listed tasks apart from the ones of other tests
+        self.status = f'repository-{uuid.uuid4()}'
+
+    # Test case to check a stored task can be read back and a missing one is None
+    def test_put_get(self):
+        item = new_item(self.status)
+        self.repository.put(item)
+        self.assertEqual(self.repository.get(item['taskId']), item)
+        self.assertIsNone(self.repository.get(str(uuid.uuid4())))
+
+    # Test case to check updates set and remove fields, bump the version and check the expected version
+    def test_update(self):
+        item = new_item(self.status)
+        self.repository.put(item)
+        attributes = self.repository.update(item['taskId'], {'title': 'Updated', 'description': None}, 1)
+        self.assertEqual(attributes, {'title': 'Updated', 'version': 2})
+        stored = self.repository.get(item['taskId'])
+        self.assertEqual(stored['title'], 'Updated')
+        self.assertNotIn('description', stored)
+        with self.assertRaises(VersionConflict):
+            self.repository.update(item['taskId'], {'title': 'Stale'}, 1)
+        with self.assertRaises(TaskNotFound):
+            self.repository.update(str(uuid.uuid4()), {'title': 'Missing'})
+
+    # Test case to check deletes check the existence and the expected version
+    def test_delete(self):
+        item = new_item(self.status)
+        self.repository.put(item)
+        with self.assertRaises(VersionConflict):
+            self.repository.delete(item['taskId'], 5)
+        self.repository.delete(item['taskId'], 1)
+        self.assertIsNone(self.repository.get(item['taskId']))
+        with self.assertRaises(TaskNotFound):
+            self.repository.delete(item['taskId'])
+
+    # Test case to check several tasks are stored and read with a projection
+    def test_put_many_get_many(self):
+        items = [new_item(self.status) for _ in range(30)]
+        self.assertEqual(self.repository.put_many(items), [])
+        found = self.repository.get_many([item['taskId'] for item in items], ['taskId', 'title'])
+        self.assertEqual(sorted(found, key=lambda item: item['taskId']),
+                         sorted(({'taskId': item['taskId'], 'title': item['title']} for item in items),
+                                key=lambda item: item['taskId']))
+
+    # Test case to check the tasks with a status are listed newest first, one page at a time
+    def test_list_by_status(self):
+        items = [new_item(self.status, f'2024-01-0{day}T00:00:00+00:00') for day in range(1, 6)]
+        self.repository.put_many(items)
+        listed = []
+        start_key = None
+        while True:
+            page, start_key = self.repository.list_by_status(self.status, 2, start_key)
+            listed.extend(page)
+            if not start_key:
+                break
+        self.assertEqual([item['createdAt'] for item in listed],
+                         [item['createdAt'] for item in reversed(items)])
+
+    # Test case to check the segments of a scan split the tasks, one page at a time
+    def test_scan(self):
+        items = [new_item(self.status) for _ in range(20)]
+        self.repository.put_many(items)
+        scanned = []
+        for segment in range(3):
+            start_key = None
+            while True:
+                page, start_key = self.repository.scan(segment, 3, 4, start_key)
+                scanned.extend(item['taskId'] for item in page if item['status'] == self.status)
+                if not start_key:
+                    break
+        self.assertEqual(sorted(scanned), sorted(item['taskId'] for item in items))
+
+class TestDynamoDBTaskRepository(RepositoryContract, unittest.TestCase):
+
+    def create_repository(self):
+        return DynamoDBTaskRepository()
+
+class TestInMemoryTaskRepository(RepositoryContract, unittest.TestCase):
+
+    def create_repository(self):
+        return InMemoryTaskRepository()
+
+class TestSQLiteTaskRepository(RepositoryContract, unittest.TestCase):
+
+    def create_repository(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return SQLiteTaskRepository(os.path.join(directory.name, 'tasks.db'))
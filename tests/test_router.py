@@ -0,0 +1,37 @@
+import json
+import unittest
+from lambdas.router import handler, ROUTES
+
+class TestRouter(unittest.TestCase):
+
+    # Test case to check a request is served by the handler of its method and resource
+    def test_router_dispatch(self):
+        event = {
+            "httpMethod": "POST",
+            "resource": "/tasks",
+            "body": json.dumps({"title": "Routed Task", "description": "Served by the router", "status": "pending"})
+        }
+        response = handler(event, {})
+        self.assertEqual(response['statusCode'], 201)
+        task_id = json.loads(response['body'])['taskId']
+
+        event = {
+            "httpMethod": "GET",
+            "resource": "/tasks/{taskId}",
+            "pathParameters": {"taskId": task_id}
+        }
+        response = handler(event, {})
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(json.loads(response['body'])['title'], 'Routed Task')
+
+    # Test case to check every route has a handler
+    def test_router_routes(self):
+        for method, resource, module in ROUTES:
+            event = {"httpMethod": method, "resource": resource, "pathParameters": {"taskId": "invalid"}}
+            response = handler(event, {})
+            self.assertNotEqual(response['statusCode'], 404, f'{method} {resource}')
+
+    # Test case to check an error is returned for a route without handler
+    def test_router_not_found(self):
+        response = handler({"httpMethod": "PUT", "resource": "/tasks"}, {})
+        self.assertEqual(response['statusCode'], 404)
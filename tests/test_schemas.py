@@ -0,0 +1,41 @@
+import unittest
+import uuid
+from common.schemas import (BATCH_CREATE_SCHEMA, BATCH_GET_SCHEMA, MAX_BATCH_TASKS, TASK_PATCH_SCHEMA, TASK_SCHEMA,
+                            is_task_id, schema_error)
+
+TASK = {'title': 'Task 1', 'description': 'This is task 1', 'status': 'pending'}
+
+class TestSchemas(unittest.TestCase):
+
+    # Test case to check a valid task passes and an invalid one gets the error of the API
+    def test_task_schema(self):
+        self.assertIsNone(schema_error(TASK, TASK_SCHEMA))
+        self.assertEqual(schema_error({'description': 'x', 'status': 'pending'}, TASK_SCHEMA), "Missing key: 'title'")
+        self.assertEqual(schema_error(dict(TASK, owner='someone'), TASK_SCHEMA), 'Unknown fields: owner')
+        self.assertEqual(schema_error(dict(TASK, title=''), TASK_SCHEMA), 'title must have at least 1 character(s)')
+        self.assertEqual(schema_error(dict(TASK, status=1), TASK_SCHEMA), 'status must be of type string')
+        self.assertEqual(schema_error([TASK], TASK_SCHEMA), 'Body must be of type object')
+
+    # Test case to check a patch can remove the description but not the title
+    def test_task_patch_schema(self):
+        self.assertIsNone(schema_error({'description': None}, TASK_PATCH_SCHEMA))
+        self.assertEqual(schema_error({'title': None}, TASK_PATCH_SCHEMA), 'title must be of type string')
+        self.assertEqual(schema_error({}, TASK_PATCH_SCHEMA), 'Body must have at least 1 field(s)')
+
+    # Test case to check the size of the batches and the format of the task ids
+    def test_batch_schemas(self):
+        self.assertIsNone(schema_error([TASK, 'not a task'], BATCH_CREATE_SCHEMA))
+        self.assertIsNotNone(schema_error([TASK] * (MAX_BATCH_TASKS + 1), BATCH_CREATE_SCHEMA))
+        self.assertIsNone(schema_error({'taskIds': [str(uuid.uuid4())], 'attributes': ['title']}, BATCH_GET_SCHEMA))
+        self.assertEqual(schema_error({'taskIds': [str(uuid.uuid4()), 'x']}, BATCH_GET_SCHEMA),
+                         'taskIds[1] has an invalid format: x')
+
+    # Test case to check the path parameters are checked with the same pattern
+    def test_is_task_id(self):
+        self.assertTrue(is_task_id(str(uuid.uuid4())))
+        self.assertFalse(is_task_id('invalid-task-id'))
+        self.assertFalse(is_task_id(uuid.uuid4().hex))
+        self.assertFalse(is_task_id(None))
+
+if __name__ == '__main__':
+    unittest.main()
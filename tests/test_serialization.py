@@ -0,0 +1,51 @@
+import json
+import unittest
+from decimal import Decimal
+from unittest import mock
+from common import serialization
+from common.serialization import dumps
+
+ITEM = {
+    'taskId': '3f1c1e0a-0000-4000-8000-000000000001',
+    'version': Decimal('3'),
+    'priority': Decimal('2.5'),
+    'title': 'Tâche – ünïcode',
+    'estimate': Decimal('0.12345678901234567890123'),
+    'ratio': Decimal('1.5E-7'),
+    'tags': {'urgent', 'backend'},
+    'attachment': b'\x00\x01',
+    'checksums': {b'b', b'a'}
+}
+
+class TestSerialization(unittest.TestCase):
+
+    # Test case to check DynamoDB numbers, sets and binary values are serialized, numbers always as JSON numbers
+    def test_dumps_dynamodb_types(self):
+        self.assertEqual(json.loads(dumps(ITEM)), {
+            'taskId': '3f1c1e0a-0000-4000-8000-000000000001',
+            'version': 3,
+            'priority': 2.5,
+            'title': 'Tâche – ünïcode',
+            'estimate': 0.12345678901234568,
+            'ratio': 1.5e-07,
+            'tags': ['backend', 'urgent'],
+            'attachment': 'AAE=',
+            'checksums': ['YQ==', 'Yg==']
+        })
+
+    # Test case to check the standard library fallback gives the same body as orjson
+    def test_dumps_stdlib_fallback(self):
+        # Floats that need an exponent are the same number written differently
+        item = {name: value for name, value in ITEM.items() if name != 'ratio'}
+        with mock.patch.object(serialization, 'orjson', None):
+            fallback = dumps(item, sort_keys=True)
+            fallback_values = json.loads(dumps(ITEM))
+        self.assertEqual(dumps(item, sort_keys=True), fallback)
+        self.assertEqual(json.loads(dumps(ITEM)), fallback_values)
+        self.assertEqual(list(json.loads(fallback)), sorted(item))
+        self.assertIn('"title":"Tâche – ünïcode"', fallback)
+
+    # Test case to check an error is raised for a value JSON cannot represent
+    def test_dumps_unsupported(self):
+        with self.assertRaises(TypeError):
+            dumps({'value': object()})
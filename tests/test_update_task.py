@@ -16,6 +16,22 @@ class TestUpdateTask(unittest.TestCase):
         self.assertEqual(response['statusCode'], 200)
         self.assertIn('title', response['body'])
 
+    # Test case to check the update only succeeds with the ETag of the current version in If-Match
+    def test_update_task_if_match(self):
+        event = {
+            "pathParameters": {"taskId": TestCreateTask.created_task_id},
+            "body": '{"title": "Versioned Task", "description": "Versioned description", "status": "pending"}'
+        }
+        context = {}
+        etag = handler(event, context)['headers']['ETag']
+        event['headers'] = {"If-Match": etag}
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 200)
+        self.assertNotEqual(response['headers']['ETag'], etag)
+        response = handler(event, context)
+        self.assertEqual(response['statusCode'], 412)
+        self.assertIn('error', response['body'])
+
     # Test case to check an error is returned when invalid task id is provided
     def test_update_task_invalid(self):
         event = {